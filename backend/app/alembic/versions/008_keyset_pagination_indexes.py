@@ -0,0 +1,65 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: 008_keyset_pagination_indexes
+Revises: 007_add_accountant_role
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "008_keyset_pagination_indexes"
+down_revision = "007_add_accountant_role"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (scope, created_at, id) lets every cursor page start with an index seek
+    op.create_index(
+        "idx_products_organization_created_at_id",
+        "products",
+        ["organization_id", "created_at", "id"],
+    )
+    op.create_index(
+        "idx_customers_organization_created_at_id",
+        "customers",
+        ["organization_id", "created_at", "id"],
+    )
+    op.create_index(
+        "idx_sales_organization_created_at_id",
+        "sales",
+        ["organization_id", "created_at", "id"],
+    )
+    op.create_index(
+        "idx_sales_customer_created_at_id",
+        "sales",
+        ["customer_id", "created_at", "id"],
+    )
+    op.create_index(
+        "idx_inventory_movements_organization_created_at_id",
+        "inventory_movements",
+        ["organization_id", "created_at", "id"],
+    )
+    op.create_index(
+        "idx_inventory_movements_product_created_at_id",
+        "inventory_movements",
+        ["product_id", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "idx_inventory_movements_product_created_at_id",
+        table_name="inventory_movements",
+    )
+    op.drop_index(
+        "idx_inventory_movements_organization_created_at_id",
+        table_name="inventory_movements",
+    )
+    op.drop_index("idx_sales_customer_created_at_id", table_name="sales")
+    op.drop_index("idx_sales_organization_created_at_id", table_name="sales")
+    op.drop_index("idx_customers_organization_created_at_id", table_name="customers")
+    op.drop_index("idx_products_organization_created_at_id", table_name="products")
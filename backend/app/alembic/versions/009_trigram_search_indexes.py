@@ -0,0 +1,54 @@
+"""Add pg_trgm GIN indexes for substring search
+
+Revision ID: 009_trigram_search_indexes
+Revises: 008_keyset_pagination_indexes
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "009_trigram_search_indexes"
+down_revision = "008_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = [
+    ("products", "name"),
+    ("products", "sku"),
+    ("products", "description"),
+    ("customers", "email"),
+    ("customers", "document_number"),
+    ("customers", "phone"),
+    ("sales", "invoice_number"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # ILIKE '%term%' can use these instead of scanning the whole table
+    for table, column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"idx_{table}_{column}_trgm",
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+    op.create_index(
+        "idx_customers_full_name_trgm",
+        "customers",
+        [sa.text("((first_name || ' ') || last_name) gin_trgm_ops")],
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    op.drop_index("idx_customers_full_name_trgm", table_name="customers")
+    for table, column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f"idx_{table}_{column}_trgm", table_name=table)
+    # The pg_trgm extension is left installed; other objects may depend on it
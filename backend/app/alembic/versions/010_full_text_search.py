@@ -0,0 +1,80 @@
+"""Add full-text search vectors to products and customers
+
+Revision ID: 010_full_text_search
+Revises: 009_trigram_search_indexes
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "010_full_text_search"
+down_revision = "009_trigram_search_indexes"
+branch_labels = None
+depends_on = None
+
+PRODUCT_DOCUMENT = (
+    "setweight(to_tsvector('spanish_unaccent', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('spanish_unaccent', coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('spanish_unaccent', coalesce(description, '')), 'B')"
+)
+
+CUSTOMER_DOCUMENT = (
+    "setweight(to_tsvector('spanish_unaccent', "
+    "coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('spanish_unaccent', coalesce(document_number, '')), 'A') || "
+    "setweight(to_tsvector('spanish_unaccent', coalesce(email, '')), 'B') || "
+    "setweight(to_tsvector('spanish_unaccent', coalesce(phone, '')), 'C')"
+)
+
+
+def upgrade():
+    # Spanish stemming with accents stripped first, so "cafe" matches "Café"
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE TEXT SEARCH CONFIGURATION spanish_unaccent (COPY = spanish)")
+    op.execute(
+        "ALTER TEXT SEARCH CONFIGURATION spanish_unaccent "
+        "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem"
+    )
+
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(PRODUCT_DOCUMENT, persisted=True),
+        ),
+    )
+    op.create_index(
+        "idx_products_search_vector",
+        "products",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+    op.add_column(
+        "customers",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(CUSTOMER_DOCUMENT, persisted=True),
+        ),
+    )
+    op.create_index(
+        "idx_customers_search_vector",
+        "customers",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    op.drop_index("idx_customers_search_vector", table_name="customers")
+    op.drop_column("customers", "search_vector")
+    op.drop_index("idx_products_search_vector", table_name="products")
+    op.drop_column("products", "search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION spanish_unaccent")
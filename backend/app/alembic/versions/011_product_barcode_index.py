@@ -0,0 +1,63 @@
+"""Add tenant-scoped unique barcode index on products
+
+Revision ID: 011_product_barcode_index
+Revises: 010_full_text_search
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+import logging
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision = "011_product_barcode_index"
+down_revision = "010_full_text_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Blank barcodes become NULL so they do not collide in the unique index
+    op.execute("UPDATE products SET barcode = NULL WHERE btrim(barcode) = ''")
+    # Barcodes were not unique before this revision. Where live products of
+    # one organization share a barcode, the oldest keeps it and the others
+    # lose it, so the index can be built; the cleared rows are logged
+    cleared = op.get_bind().execute(
+        sa.text(
+            """
+            UPDATE products SET barcode = NULL
+            FROM (
+                SELECT id, barcode, row_number() OVER (
+                    PARTITION BY organization_id, barcode
+                    ORDER BY created_at, id
+                ) AS position
+                FROM products
+                WHERE barcode IS NOT NULL AND deleted_at IS NULL
+            ) AS ranked
+            WHERE products.id = ranked.id AND ranked.position > 1
+            RETURNING products.id, products.organization_id, ranked.barcode
+            """
+        )
+    )
+    for product_id, organization_id, barcode in cleared:
+        logger.warning(
+            "Cleared duplicate barcode %s of product %s in organization %s",
+            barcode,
+            product_id,
+            organization_id,
+        )
+    op.create_index(
+        "idx_products_organization_barcode",
+        "products",
+        ["organization_id", "barcode"],
+        unique=True,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("idx_products_organization_barcode", table_name="products")
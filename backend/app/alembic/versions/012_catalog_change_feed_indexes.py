@@ -0,0 +1,46 @@
+"""Add updated_at indexes for the catalog change feed
+
+Revision ID: 012_catalog_change_feed_indexes
+Revises: 011_product_barcode_index
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "012_catalog_change_feed_indexes"
+down_revision = "011_product_barcode_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Soft deletes now stamp updated_at too, so one (scope, updated_at, id)
+    # index serves every change feed page as a range scan
+    op.execute(
+        "UPDATE products SET updated_at = deleted_at "
+        "WHERE deleted_at IS NOT NULL AND updated_at < deleted_at"
+    )
+    op.execute(
+        "UPDATE categories SET updated_at = deleted_at "
+        "WHERE deleted_at IS NOT NULL AND updated_at < deleted_at"
+    )
+    op.create_index(
+        "idx_products_organization_updated_at_id",
+        "products",
+        ["organization_id", "updated_at", "id"],
+    )
+    op.create_index(
+        "idx_categories_organization_updated_at_id",
+        "categories",
+        ["organization_id", "updated_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "idx_categories_organization_updated_at_id", table_name="categories"
+    )
+    op.drop_index("idx_products_organization_updated_at_id", table_name="products")
@@ -0,0 +1,37 @@
+"""Add users.tokens_revoked_at for access token revocation
+
+Revision ID: 013_user_tokens_revoked_at
+Revises: 012_catalog_change_feed_indexes
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "013_user_tokens_revoked_at"
+down_revision = "012_catalog_change_feed_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("tokens_revoked_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Workers reload recent revocations periodically; the partial index keeps
+    # that scan proportional to the number of revoked users
+    op.create_index(
+        "idx_users_tokens_revoked_at",
+        "users",
+        ["tokens_revoked_at"],
+        postgresql_where=sa.text("tokens_revoked_at IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("idx_users_tokens_revoked_at", table_name="users")
+    op.drop_column("users", "tokens_revoked_at")
@@ -0,0 +1,33 @@
+"""Add login_throttle_buckets for the shared login throttle backend
+
+Revision ID: 014_login_throttle_buckets
+Revises: 013_user_tokens_revoked_at
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "014_login_throttle_buckets"
+down_revision = "013_user_tokens_revoked_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Unlogged: throttle state is disposable and written on every login
+    op.create_table(
+        "login_throttle_buckets",
+        sa.Column("key", sa.Text(), primary_key=True),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("allowed", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade():
+    op.drop_table("login_throttle_buckets")
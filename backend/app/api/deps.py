@@ -1,51 +1,84 @@
 import uuid
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass
 from typing import Annotated, Any
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import security
+from app import crud
+from app.core import security, tracing
 from app.core.config import settings
-from app.core.db import engine
-from app.models import Role, TokenPayload, User
+from app.core.db import async_engine, async_replica_engine, engine, replica_router
+from app.core.request_context import (
+    request_organization_id,
+    request_route,
+    request_statement_timeout,
+    request_user_id,
+)
+from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
+async def track_database_work(request: Request) -> None:
+    """
+    Give the request's transactions the interactive statement timeout and
+    tag its queries with the route for the slow query log. Async so the
+    context variables reach the rest of the request.
+    """
+    route = request.scope.get("route")
+    request_route.set(getattr(route, "path", request.url.path))
+    request_statement_timeout.set(settings.DB_STATEMENT_TIMEOUT_MS)
+
+
+async def allow_long_statements() -> None:
+    """Route dependency for exports, which may scan a whole tenant"""
+    request_statement_timeout.set(settings.DB_EXPORT_STATEMENT_TIMEOUT_MS)
+
+
 def get_db() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
-    """Get current authenticated user from JWT token"""
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
+@dataclass(frozen=True)
+class Principal:
+    """
+    Who is making the request, as far as authorization needs to know.
 
-    # Get user with relationships
+    Built from the signed token claims when AUTH_STATELESS_CLAIMS is on, and
+    from the cached auth record and role otherwise.
+    """
+
+    user_id: uuid.UUID
+    organization_id: uuid.UUID
+    role: str | None
+
+
+def _load_active_user(session: Session, user_id: uuid.UUID) -> User:
     user = session.exec(
-        select(User)
-        .where(User.id == uuid.UUID(token_data.sub))
-        .where(User.deleted_at.is_(None))  # type: ignore[union-attr]
+        select(User).where(User.id == user_id).where(User.deleted_at.is_(None))  # type: ignore[union-attr]
     ).first()
 
     if not user:
@@ -56,12 +89,114 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+async def get_current_principal(session: AsyncSessionDep, token: TokenDep) -> Principal:
+    """Authenticate the JWT token, from its claims alone in stateless mode"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Could not validate credentials",
+    )
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+        )
+        token_data = TokenPayload(**payload)
+        user_id = uuid.UUID(token_data.sub)
+        organization_id = uuid.UUID(token_data.organization_id)
+    except (InvalidTokenError, ValidationError, ValueError):
+        raise credentials_exception
+
+    # Lets sessions remember this user's writes for read-your-writes
+    request_user_id.set(user_id)
+    request_organization_id.set(organization_id)
+    tracing.tag_organization(organization_id)
+
+    if settings.AUTH_STATELESS_CLAIMS:
+        revocations = crud.token_revocations
+        if revocations.is_stale():
+            since = revocations.window_start()
+            revocations.refresh(
+                await crud.get_token_revocations_async(session=session, since=since),
+                since=since,
+            )
+        if revocations.is_revoked(user_id, token_data.iat):
+            raise credentials_exception
+        return Principal(
+            user_id=user_id, organization_id=organization_id, role=token_data.role
+        )
+
+    record = await crud.get_user_auth_record_async(session=session, user_id=user_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not record.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    if record.tokens_revoked_at is not None and (
+        token_data.iat is None or token_data.iat < record.tokens_revoked_at.timestamp()
+    ):
+        raise credentials_exception
+    role = await crud.get_cached_role_async(session=session, role_id=record.role_id)
+    return Principal(
+        user_id=record.id,
+        organization_id=record.organization_id,
+        role=role.name if role else None,
+    )
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+def get_read_db(
+    session: SessionDep, principal: CurrentPrincipal
+) -> Generator[Session, None, None]:
+    """
+    Session for read-only endpoints: on the replica when one is configured,
+    healthy, and the user has not written recently; otherwise the request's
+    primary session.
+    """
+    if replica_router is None:
+        yield session
+        return
+    read_engine = replica_router.engine_for(principal.user_id)
+    if read_engine is replica_router.primary:
+        yield session
+        return
+    with Session(read_engine) as read_session:
+        yield read_session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+
+
+async def get_async_read_db(
+    session: AsyncSessionDep, principal: CurrentPrincipal
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_read_db"""
+    if replica_router is None or async_replica_engine is None:
+        yield session
+        return
+    if replica_router.lag_check_due():
+        # The check may block on an unreachable replica; keep it off the loop
+        await run_in_threadpool(replica_router.check_lag)
+    if not replica_router.use_replica(principal.user_id, check_lag=False):
+        yield session
+        return
+    async with AsyncSession(async_replica_engine) as read_session:
+        yield read_session
+
+
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_db)]
+
+
+def get_current_user(session: SessionDep, principal: CurrentPrincipal) -> User:
+    """Get current authenticated user from JWT token"""
+    return _load_active_user(session, principal.user_id)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_organization(current_user: CurrentUser) -> uuid.UUID:
-    """Extract organization ID from current user"""
-    return current_user.organization_id
+def get_current_organization(principal: CurrentPrincipal) -> uuid.UUID:
+    """Extract organization ID from the authenticated principal"""
+    return principal.organization_id
 
 
 CurrentOrganization = Annotated[uuid.UUID, Depends(get_current_organization)]
@@ -79,31 +214,31 @@ def require_role(*allowed_roles: str) -> Any:
         def seller_route(): ...
     """
 
-    def role_checker(session: SessionDep, current_user: CurrentUser) -> User:
+    def role_checker(principal: CurrentPrincipal) -> Principal:
         # Get user's role
-        role = session.get(Role, current_user.role_id)
-        if not role:
+        if principal.role is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="User role not found",
             )
 
         # Check if user has required role
-        if role.name not in allowed_roles:
+        if principal.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Insufficient permissions. Required roles: {', '.join(allowed_roles)}",
             )
 
-        return current_user
+        return principal
 
     return role_checker
 
 
-def get_current_admin_user(session: SessionDep, current_user: CurrentUser) -> User:
+def get_current_admin_user(
+    principal: CurrentPrincipal, current_user: CurrentUser
+) -> User:
     """Dependency that requires admin role"""
-    role = session.get(Role, current_user.role_id)
-    if not role or role.name != "admin":
+    if principal.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required",
@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.api.deps import track_database_work
 from app.api.routes import (
     categories,
     customers,
@@ -11,12 +12,13 @@ from app.api.routes import (
     products,
     roles,
     sales,
+    search,
     users,
     utils,
 )
 from app.core.config import settings
 
-api_router = APIRouter()
+api_router = APIRouter(dependencies=[Depends(track_database_work)])
 api_router.include_router(login.router)
 api_router.include_router(
     organizations.router, prefix="/organizations", tags=["organizations"]
@@ -31,6 +33,7 @@ api_router.include_router(
 )
 api_router.include_router(sales.router, prefix="/sales", tags=["sales"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(utils.router)
 
 
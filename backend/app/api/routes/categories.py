@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from app import crud
 from app.api.deps import (
     CurrentOrganization,
-    CurrentUser,
+    CurrentPrincipal,
+    ReadSessionDep,
     SessionDep,
     require_role,
 )
@@ -23,8 +24,8 @@ router = APIRouter()
 
 @router.get("/", response_model=CategoriesPublic)
 def read_categories(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
@@ -96,8 +97,8 @@ def create_category(
 @router.get("/{category_id}", response_model=CategoryPublic)
 def read_category(
     category_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
 ) -> Any:
     """
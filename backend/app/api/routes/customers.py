@@ -1,4 +1,6 @@
 import uuid
+from collections.abc import Callable
+from functools import partial
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -6,10 +8,20 @@ from fastapi import APIRouter, Depends, HTTPException
 from app import crud
 from app.api.deps import (
     CurrentOrganization,
-    CurrentUser,
+    CurrentPrincipal,
+    ReadSessionDep,
     SessionDep,
     require_role,
 )
+from app.core.fast_json import FastJSONResponse
+from app.core.fieldsets import InvalidFieldsError, parse_fields, project
+from app.core.pagination import (
+    CountMode,
+    InvalidCursorError,
+    next_cursor,
+    resolve_count_mode,
+)
+from app.core.search import SEARCH_DEFAULT_LIMIT
 from app.models import (
     CustomerCreate,
     CustomerPublic,
@@ -24,8 +36,8 @@ router = APIRouter()
 
 @router.get("/", response_model=CustomersPublic)
 def read_customers(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
@@ -33,6 +45,10 @@ def read_customers(
     sort_by: str | None = None,
     sort_order: str = "asc",
     is_active: bool | None = None,
+    cursor: str | None = None,
+    include_count: bool = True,
+    count_mode: CountMode = "exact",
+    fields: str | None = None,
 ) -> Any:
     """
     Retrieve customers in current organization.
@@ -40,24 +56,55 @@ def read_customers(
     Admin and seller roles can list customers.
     Supports search (name/email/document/phone), sort_by, sort_order (asc/desc),
     and is_active filter.
+    Pass the returned next_cursor as cursor to fetch the following page
+    without OFFSET; skip is ignored when a cursor is given.
+    Set include_count=false to skip counting, count_mode=window to count in
+    the page query, or count_mode=estimated to use the planner estimate on
+    large unfiltered listings (flagged by count_is_estimate).
+    Pass fields (e.g. fields=first_name,last_name,phone) to select and return
+    only those customer fields; id is always included.
     """
-    customers = crud.get_customers_by_organization(
-        session=session,
-        organization_id=current_organization,
-        skip=skip,
-        limit=limit,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        is_active=is_active,
+    try:
+        selected = parse_fields(fields, allowed=crud.CUSTOMER_FIELDS)
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Sparse fieldsets read plain dicts and skip response-model validation
+    get_page: Callable[..., tuple[list[Any], int | None, bool]] = (
+        crud.get_customers_page
+        if selected is None
+        else partial(crud.get_customer_rows_page, fields=selected)
     )
-    count = crud.count_customers_by_organization(
-        session=session,
-        organization_id=current_organization,
-        search=search,
-        is_active=is_active,
-    )
-    return CustomersPublic(data=customers, count=count)
+    try:
+        customers, count, count_is_estimate = get_page(
+            session=session,
+            organization_id=current_organization,
+            skip=skip,
+            limit=limit,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            is_active=is_active,
+            cursor=cursor,
+            count_mode=resolve_count_mode(
+                include_count=include_count, count_mode=count_mode
+            ),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = {
+        "data": customers,
+        "count": count,
+        "count_is_estimate": count_is_estimate,
+        "next_cursor": next_cursor(
+            customers,
+            sort=crud.get_customer_sort(sort_by=sort_by, sort_order=sort_order),
+            limit=limit,
+        ),
+    }
+    if selected is not None:
+        page["data"] = project(customers, selected)
+        return FastJSONResponse(page)
+    return CustomersPublic(**page)
 
 
 @router.post(
@@ -96,18 +143,54 @@ def create_customer(
     return customer
 
 
+@router.get("/search", response_model=CustomersPublic)
+def search_customers(
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    q: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> Any:
+    """
+    Typeahead search over active customers by name, email, document or phone.
+
+    Terms shorter than three characters only match an exact document number.
+    limit is capped at 50.
+    """
+    customers = crud.search_customers(
+        session=session, organization_id=current_organization, term=q, limit=limit
+    )
+    return CustomersPublic(data=customers, count=len(customers))
+
+
 @router.get("/{customer_id}", response_model=CustomerPublic)
 def read_customer(
     customer_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
+    fields: str | None = None,
 ) -> Any:
     """
     Get a specific customer by ID.
 
     Admin and seller roles can view a customer.
+    Pass fields to return only those customer fields; id is always included.
     """
+    try:
+        selected = parse_fields(fields, allowed=crud.CUSTOMER_FIELDS)
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if selected is not None:
+        row = crud.get_customer_row(
+            session=session,
+            customer_id=customer_id,
+            organization_id=current_organization,
+            fields=selected,
+        )
+        if row is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return FastJSONResponse(row)
     customer = crud.get_customer_by_id(
         session=session,
         customer_id=customer_id,
@@ -195,16 +278,21 @@ def delete_customer(
 @router.get("/{customer_id}/sales", response_model=SalesPublic)
 def read_customer_sales(
     customer_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+    count_mode: CountMode = "exact",
 ) -> Any:
     """
     Get sales for a specific customer.
 
     Any authenticated user can view a customer's sales.
+    Supports cursor pagination through next_cursor, and include_count /
+    count_mode like the top-level listing.
     """
     customer = crud.get_customer_by_id(
         session=session,
@@ -214,16 +302,25 @@ def read_customer_sales(
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    sales = crud.get_sales_by_customer(
-        session=session,
-        customer_id=customer_id,
-        organization_id=current_organization,
-        skip=skip,
-        limit=limit,
-    )
-    count = crud.count_sales_by_customer(
-        session=session,
-        customer_id=customer_id,
-        organization_id=current_organization,
+    try:
+        sales, count, count_is_estimate = crud.get_customer_sales_page(
+            session=session,
+            customer_id=customer_id,
+            organization_id=current_organization,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            count_mode=resolve_count_mode(
+                include_count=include_count, count_mode=count_mode
+            ),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return SalesPublic(
+        data=sales,
+        count=count,
+        count_is_estimate=count_is_estimate,
+        next_cursor=next_cursor(
+            sales, sort=crud.get_sale_sort(sort_by=None), limit=limit
+        ),
     )
-    return SalesPublic(data=sales, count=count)
@@ -10,12 +10,17 @@ from sqlmodel import select
 
 from app import crud
 from app.api.deps import (
+    AsyncReadSessionDep,
     CurrentOrganization,
-    CurrentUser,
+    CurrentPrincipal,
+    ReadSessionDep,
     SessionDep,
+    allow_long_statements,
     require_role,
 )
-from app.models import Category, DashboardExportRequest, DashboardStatsPublic, Role
+from app.core import metrics
+from app.core.tracing import traced
+from app.models import Category, DashboardExportRequest, DashboardStatsPublic
 
 router = APIRouter()
 
@@ -55,6 +60,7 @@ def _to_utc_range(
     return start_utc, end_utc
 
 
+@traced
 def _build_xlsx_bytes(*, headers: list[str], rows: list[list[Any]]) -> bytes:
     output = BytesIO()
     import zipfile
@@ -145,6 +151,7 @@ def _column_name(index: int) -> str:
     return result
 
 
+@traced
 def _build_inventory_export(
     *,
     session: SessionDep,
@@ -199,6 +206,7 @@ def _build_inventory_export(
     return headers, rows
 
 
+@traced
 def _build_customers_export(
     *,
     session: SessionDep,
@@ -244,6 +252,7 @@ def _build_customers_export(
     return headers, rows
 
 
+@traced
 def _build_sales_export(
     *,
     session: SessionDep,
@@ -299,9 +308,9 @@ def _build_sales_export(
 
 
 @router.get("/stats", response_model=DashboardStatsPublic)
-def read_dashboard_stats(
-    session: SessionDep,
-    _current_user: CurrentUser,
+async def read_dashboard_stats(
+    session: AsyncReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
 ) -> Any:
     """
@@ -311,28 +320,30 @@ def read_dashboard_stats(
     Returns sales today/month, low stock count, average ticket,
     top products, and sales by day.
     """
-    return crud.get_dashboard_stats(
+    return await crud.get_dashboard_stats_async(
         session=session, organization_id=current_organization
     )
 
 
 @router.post(
     "/export-excel",
-    dependencies=[Depends(require_role("admin", "contador"))],
+    dependencies=[
+        Depends(allow_long_statements),
+        Depends(require_role("admin", "contador")),
+    ],
 )
 def export_dashboard_excel(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: ReadSessionDep,
+    principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     payload: DashboardExportRequest,
 ) -> StreamingResponse:
     """Export dashboard datasets in Excel format (all filtered rows)."""
-    role = session.get(Role, current_user.role_id)
-    if not role:
+    if principal.role is None:
         raise HTTPException(status_code=500, detail="User role not found")
 
-    if role.name not in {"admin", "contador"}:
+    if principal.role not in {"admin", "contador"}:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     try:
@@ -350,23 +361,27 @@ def export_dashboard_excel(
     if builder is None:
         raise HTTPException(status_code=400, detail="Invalid dataset")
 
-    headers, rows = builder(
-        session=session,
-        organization_id=current_organization,
-        payload=payload,
-    )
+    with metrics.EXPORT_DURATION.labels(payload.dataset).time():
+        headers, rows = builder(
+            session=session,
+            organization_id=current_organization,
+            payload=payload,
+        )
 
-    if rows:
-        content = _build_xlsx_bytes(headers=headers, rows=rows)
-        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        suffix = "xlsx"
-    else:
-        csv_buffer = StringIO()
-        writer = csv.writer(csv_buffer)
-        writer.writerow(headers)
-        content = csv_buffer.getvalue().encode("utf-8")
-        media_type = "text/csv"
-        suffix = "csv"
+        if rows:
+            content = _build_xlsx_bytes(headers=headers, rows=rows)
+            media_type = (
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+            suffix = "xlsx"
+        else:
+            csv_buffer = StringIO()
+            writer = csv.writer(csv_buffer)
+            writer.writerow(headers)
+            content = csv_buffer.getvalue().encode("utf-8")
+            media_type = "text/csv"
+            suffix = "csv"
+    metrics.EXPORT_SIZE.labels(payload.dataset).observe(len(content))
 
     timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
     filename = f"{payload.dataset}-export-{timestamp}.{suffix}"
@@ -6,10 +6,18 @@ from fastapi import APIRouter, Depends, HTTPException
 from app import crud
 from app.api.deps import (
     CurrentOrganization,
+    CurrentPrincipal,
     CurrentUser,
+    ReadSessionDep,
     SessionDep,
     require_role,
 )
+from app.core.pagination import (
+    CountMode,
+    InvalidCursorError,
+    next_cursor,
+    resolve_count_mode,
+)
 from app.models import (
     InventoryMovementCreate,
     InventoryMovementPublic,
@@ -21,24 +29,44 @@ router = APIRouter()
 
 @router.get("/", response_model=InventoryMovementsPublic)
 def read_movements(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+    count_mode: CountMode = "exact",
 ) -> Any:
     """
     Retrieve inventory movements in current organization.
 
     Any authenticated user can list movements.
+    Pass the returned next_cursor as cursor to fetch the following page
+    without OFFSET; skip is ignored when a cursor is given.
+    Set include_count=false to skip counting, count_mode=window to count in
+    the page query, or count_mode=estimated to use the planner estimate on
+    large unfiltered listings (flagged by count_is_estimate).
     """
-    movements = crud.get_movements_by_organization(
-        session=session, organization_id=current_organization, skip=skip, limit=limit
-    )
-    count = crud.count_movements_by_organization(
-        session=session, organization_id=current_organization
+    try:
+        movements, count, count_is_estimate = crud.get_movements_page(
+            session=session,
+            organization_id=current_organization,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            count_mode=resolve_count_mode(
+                include_count=include_count, count_mode=count_mode
+            ),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return InventoryMovementsPublic(
+        data=movements,
+        count=count,
+        count_is_estimate=count_is_estimate,
+        next_cursor=next_cursor(movements, sort=crud.MOVEMENT_SORT, limit=limit),
     )
-    return InventoryMovementsPublic(data=movements, count=count)
 
 
 @router.post(
@@ -107,8 +135,8 @@ def create_movement(
 @router.get("/{movement_id}", response_model=InventoryMovementPublic)
 def read_movement(
     movement_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
 ) -> Any:
     """
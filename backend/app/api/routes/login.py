@@ -1,18 +1,35 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel import Session
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentPrincipal,
+    CurrentUser,
+    SessionDep,
+)
 from app.core import security
+from app.core.config import settings
+from app.core.db import engine
+from app.core.networks import ip_in_networks
+from app.core.throttle import (
+    MemoryTokenBucketStore,
+    PostgresTokenBucketStore,
+    ThrottledError,
+    TokenBucketStore,
+)
 from app.models import (
     LoginResponse,
     Message,
     NewPassword,
     OrganizationPublic,
     RolePublic,
+    User,
     UserPublic,
     UserPublicWithRelations,
     UserUpdate,
@@ -26,26 +43,89 @@ from app.utils import (
 
 router = APIRouter(tags=["login"])
 
+login_throttle: TokenBucketStore = (
+    PostgresTokenBucketStore(engine)
+    if settings.LOGIN_THROTTLE_BACKEND == "postgres"
+    else MemoryTokenBucketStore()
+)
+
+
+def _too_many_attempts(exc: ThrottledError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    return ip_in_networks(host, settings.TRUSTED_PROXIES)
+
+
+def _client_ip(request: Request) -> str:
+    """
+    The address the request came from. Behind TRUSTED_PROXIES, it is the
+    rightmost X-Forwarded-For entry that is not itself a trusted proxy;
+    entries left of it were written by the client and cannot be trusted.
+    """
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(host):
+        return host
+    forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+    for hop in reversed([h.strip() for h in forwarded.split(",") if h.strip()]):
+        host = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return host
+
+
+def _check_login_throttle(request: Request, email: str) -> None:
+    """Reject the attempt if the client IP or the email is over its rate"""
+    client_ip = _client_ip(request)
+    buckets = [
+        (f"ip:{client_ip}", settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE),
+        (
+            f"email:{email.strip().lower()}",
+            settings.LOGIN_EMAIL_BURST,
+            settings.LOGIN_EMAIL_PER_MINUTE,
+        ),
+    ]
+    for key, burst, per_minute in buckets:
+        retry_after = login_throttle.take(
+            key, capacity=burst, per_second=per_minute / 60
+        )
+        if retry_after:
+            raise _too_many_attempts(ThrottledError(retry_after))
+
 
 @router.post("/login/access-token", response_model=LoginResponse)
-def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+async def login_access_token(
+    request: Request,
+    session: AsyncSessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
 
     Returns user data with organization and role information.
     """
-    user = crud.authenticate(
+    # The postgres throttle backend does blocking I/O
+    await run_in_threadpool(_check_login_throttle, request, form_data.username)
+    user = await crud.authenticate_async(
         session=session, email=form_data.username, password=form_data.password
     )
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # The sync session run_sync passes is SQLModel's (sync_session_class)
+    return await session.run_sync(_login_response, user=user)  # type: ignore[arg-type]
+
 
+def _login_response(session: Session, /, *, user: User) -> LoginResponse:
+    # Runs inside AsyncSession.run_sync: sync ORM code, async driver
     # Get user's role
-    role = session.get(crud.Role, user.role_id)
+    role = crud.get_cached_role(session=session, role_id=user.role_id)
     if not role:
         raise HTTPException(status_code=500, detail="User role not found")
 
@@ -140,24 +220,38 @@ def recover_password(email: str, session: SessionDep) -> Message:
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+async def reset_password(session: SessionDep, body: NewPassword) -> Message:
     """
     Reset password
     """
     email = verify_password_reset_token(token=body.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
+    hashed_password = await security.get_password_hash_async(body.new_password)
+    return await run_in_threadpool(
+        _reset_password,
+        session,
+        email=email,
+        new_password=body.new_password,
+        hashed_password=hashed_password,
+    )
+
+
+def _reset_password(
+    session: Session, /, *, email: str, new_password: str, hashed_password: str
+) -> Message:
     user = crud.get_user_by_email(session=session, email=email)
     if not user:
         # Don't reveal that the user doesn't exist - use same error as invalid token
         raise HTTPException(status_code=400, detail="Invalid token")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    user_in_update = UserUpdate(password=body.new_password)
+    user_in_update = UserUpdate(password=new_password)
     crud.update_user(
         session=session,
         db_user=user,
         user_in=user_in_update,
+        hashed_password=hashed_password,
     )
     return Message(message="Password updated successfully")
 
@@ -167,7 +261,7 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
     response_class=HTMLResponse,
 )
 def recover_password_html_content(
-    email: str, session: SessionDep, _current_user: CurrentUser
+    email: str, session: SessionDep, _principal: CurrentPrincipal
 ) -> Any:
     """
     HTML Content for Password Recovery
@@ -1,10 +1,12 @@
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
 
 from app import crud
 from app.api.deps import CurrentUser, SessionDep
-from app.core.security import create_access_token
+from app.core.security import create_access_token, get_password_hash_async
 from app.models import (
     LoginResponse,
     OrganizationPublic,
@@ -17,7 +19,7 @@ router = APIRouter()
 
 
 @router.post("/signup", response_model=LoginResponse, status_code=201)
-def signup_organization(
+async def signup_organization(
     *, session: SessionDep, organization_signup: OrganizationSignup
 ) -> Any:
     """
@@ -29,6 +31,22 @@ def signup_organization(
     2. An admin user for that organization
     3. Returns a login token for the new admin user
     """
+    hashed_password = await get_password_hash_async(organization_signup.admin_password)
+    return await run_in_threadpool(
+        _signup_organization,
+        session,
+        organization_signup=organization_signup,
+        hashed_password=hashed_password,
+    )
+
+
+def _signup_organization(
+    session: Session,
+    /,
+    *,
+    organization_signup: OrganizationSignup,
+    hashed_password: str,
+) -> LoginResponse:
     # Check if organization slug is already taken
     existing_org = crud.get_organization_by_slug(
         session=session, slug=organization_signup.organization_slug
@@ -83,6 +101,7 @@ def signup_organization(
             role_id=admin_role.id,
         ),
         organization_id=organization.id,
+        hashed_password=hashed_password,
     )
 
     # Refresh to load relationships
@@ -173,7 +192,7 @@ def update_my_organization(
         raise HTTPException(status_code=404, detail="Organization not found")
 
     # Check if user is admin
-    role = session.get(crud.Role, current_user.role_id)
+    role = crud.get_cached_role(session=session, role_id=current_user.role_id)
     if not role or role.name != "admin":
         raise HTTPException(
             status_code=403,
@@ -1,20 +1,48 @@
 import uuid
-from typing import Any
+from collections.abc import Callable
+from functools import partial
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app import crud
 from app.api.deps import (
+    AsyncSessionDep,
     CurrentOrganization,
+    CurrentPrincipal,
     CurrentUser,
+    ReadSessionDep,
     SessionDep,
     require_role,
 )
+from app.core.config import settings
+from app.core.fast_json import FastJSONResponse
+from app.core.fieldsets import InvalidFieldsError, parse_fields, project
+from app.core.pagination import (
+    CountMode,
+    InvalidCursorError,
+    next_cursor,
+    resolve_count_mode,
+)
+from app.core.search import SEARCH_DEFAULT_LIMIT
+from app.core.sync import (
+    SYNC_MAX_LIMIT,
+    InvalidChangeTokenError,
+    decode_change_token,
+    encode_change_token,
+)
 from app.models import (
+    PRODUCT_BATCH_MAX_IDS,
+    CatalogChangesPublic,
+    CategoryPublic,
     InventoryMovementCreate,
     InventoryMovementsPublic,
     Message,
+    ProductBatchPublic,
+    ProductBatchRequest,
     ProductCreate,
+    ProductLookupPublic,
+    ProductLookupRequest,
     ProductPublic,
     ProductsPublic,
     ProductUpdate,
@@ -26,8 +54,8 @@ router = APIRouter()
 
 @router.get("/", response_model=ProductsPublic)
 def read_products(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
@@ -36,6 +64,10 @@ def read_products(
     sort_order: str = "asc",
     is_active: bool | None = None,
     category_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    include_count: bool = True,
+    count_mode: CountMode = "exact",
+    fields: str | None = None,
 ) -> Any:
     """
     Retrieve products in current organization.
@@ -43,26 +75,58 @@ def read_products(
     Any authenticated user can list products.
     Supports search (name/sku/description), sort_by, sort_order (asc/desc),
     is_active filter, and category_id filter.
+    Pass the returned next_cursor as cursor to fetch the following page
+    without OFFSET; skip is ignored when a cursor is given.
+    Set include_count=false to skip counting, count_mode=window to count in
+    the page query, or count_mode=estimated to use the planner estimate on
+    large unfiltered listings (flagged by count_is_estimate).
+    Pass fields (e.g. fields=name,sku,sale_price) to select and return only
+    those product fields; id is always included.
     """
-    products = crud.get_products_by_organization(
-        session=session,
-        organization_id=current_organization,
-        skip=skip,
-        limit=limit,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        is_active=is_active,
-        category_id=category_id,
-    )
-    count = crud.count_products_by_organization(
-        session=session,
-        organization_id=current_organization,
-        search=search,
-        is_active=is_active,
-        category_id=category_id,
+    try:
+        selected = parse_fields(fields, allowed=crud.PRODUCT_FIELDS)
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # The fast path and sparse fieldsets return plain dicts for FastJSONResponse
+    fast = settings.FAST_JSON_LIST_ENDPOINTS or selected is not None
+    get_page: Callable[..., tuple[list[Any], int | None, bool]] = (
+        partial(crud.get_product_rows_page, fields=selected)
+        if fast
+        else crud.get_products_page
     )
-    return ProductsPublic(data=products, count=count)
+    try:
+        products, count, count_is_estimate = get_page(
+            session=session,
+            organization_id=current_organization,
+            skip=skip,
+            limit=limit,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            is_active=is_active,
+            category_id=category_id,
+            cursor=cursor,
+            count_mode=resolve_count_mode(
+                include_count=include_count, count_mode=count_mode
+            ),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = {
+        "data": products,
+        "count": count,
+        "count_is_estimate": count_is_estimate,
+        "next_cursor": next_cursor(
+            products,
+            sort=crud.get_product_sort(sort_by=sort_by, sort_order=sort_order),
+            limit=limit,
+        ),
+    }
+    if selected is not None:
+        page["data"] = project(products, selected)
+    if fast:
+        return FastJSONResponse(page)
+    return ProductsPublic(**page)
 
 
 @router.post(
@@ -105,6 +169,15 @@ def create_product(
             status_code=409,
             detail="A product with this SKU already exists in the organization",
         )
+    if product_in.barcode is not None and crud.get_product_by_barcode(
+        session=session,
+        barcode=product_in.barcode,
+        organization_id=current_organization,
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail="A product with this barcode already exists in the organization",
+        )
 
     product = crud.create_product(
         session=session,
@@ -116,8 +189,8 @@ def create_product(
 
 @router.get("/low-stock", response_model=ProductsPublic)
 def read_low_stock_products(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
@@ -136,18 +209,189 @@ def read_low_stock_products(
     return ProductsPublic(data=products, count=count)
 
 
+@router.get("/search", response_model=ProductsPublic)
+def search_products(
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    q: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> Any:
+    """
+    Typeahead search over active products by name, SKU or description.
+
+    Terms shorter than three characters only match an exact SKU.
+    limit is capped at 50.
+    """
+    products = crud.search_products(
+        session=session, organization_id=current_organization, term=q, limit=limit
+    )
+    return ProductsPublic(data=products, count=len(products))
+
+
+@router.get("/changes", response_model=CatalogChangesPublic)
+def read_catalog_changes(
+    session: SessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    since: str | None = None,
+    limit: int = SYNC_MAX_LIMIT,
+) -> Any:
+    """
+    Delta-sync feed of products (including prices) and categories.
+
+    Omit since for a full initial sync, then pass the returned next_token on
+    every poll. Soft-deleted rows come back as deleted_*_ids. Keep calling
+    while has_more is true. Changes from the last second, or made after a
+    write transaction that is still open began, are delivered on a later poll.
+    """
+    try:
+        token = decode_change_token(since)
+    except InvalidChangeTokenError:
+        raise HTTPException(status_code=400, detail="Invalid change token")
+    products, categories, next_token, has_more = crud.get_catalog_changes(
+        session=session,
+        organization_id=current_organization,
+        since=token,
+        limit=limit,
+    )
+    return CatalogChangesPublic(
+        products=[
+            ProductPublic.model_validate(p) for p in products if p.deleted_at is None
+        ],
+        deleted_product_ids=[p.id for p in products if p.deleted_at is not None],
+        categories=[
+            CategoryPublic.model_validate(c) for c in categories if c.deleted_at is None
+        ],
+        deleted_category_ids=[c.id for c in categories if c.deleted_at is not None],
+        next_token=encode_change_token(next_token),
+        has_more=has_more,
+    )
+
+
+def _read_products_batch(
+    session: SessionDep, organization_id: uuid.UUID, ids: list[uuid.UUID]
+) -> ProductBatchPublic:
+    products = crud.get_products_by_ids(
+        session=session, product_ids=ids, organization_id=organization_id
+    )
+    found = {product.id for product in products}
+    missing = [pid for pid in dict.fromkeys(ids) if pid not in found]
+    return ProductBatchPublic(
+        data=[ProductPublic.model_validate(product) for product in products],
+        missing=missing,
+    )
+
+
+@router.get("/batch", response_model=ProductBatchPublic)
+def read_products_batch(
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    ids: Annotated[
+        list[uuid.UUID], Query(min_length=1, max_length=PRODUCT_BATCH_MAX_IDS)
+    ],
+) -> Any:
+    """
+    Retrieve many products by ID in one request (?ids=...&ids=...).
+
+    Products come back in request order; unknown IDs are listed in missing.
+    """
+    return _read_products_batch(session, current_organization, ids)
+
+
+@router.post("/batch", response_model=ProductBatchPublic)
+def read_products_batch_post(
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    batch_in: ProductBatchRequest,
+) -> Any:
+    """
+    Retrieve many products by ID, for lists too long for a query string.
+    """
+    return _read_products_batch(session, current_organization, batch_in.ids)
+
+
+@router.get("/lookup", response_model=ProductPublic)
+async def lookup_product(
+    session: AsyncSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    barcode: str | None = None,
+    sku: str | None = None,
+) -> Any:
+    """
+    Resolve a scanned barcode or an exact SKU to a product.
+
+    Exactly one of barcode or sku must be given. Repeat scans are served
+    from a short-lived per-worker cache, filled from the primary so that
+    replica lag cannot outlive an invalidation.
+    """
+    if (barcode is None) == (sku is None):
+        raise HTTPException(
+            status_code=400, detail="Provide exactly one of barcode or sku"
+        )
+    product = await crud.lookup_product_async(
+        session=session,
+        organization_id=current_organization,
+        barcode=barcode,
+        sku=sku,
+    )
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
+@router.post("/lookup", response_model=ProductLookupPublic)
+def lookup_products(
+    session: SessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    lookup_in: ProductLookupRequest,
+) -> Any:
+    """
+    Resolve a batch of scanned codes (up to 500) in one request.
+
+    Each code is matched by barcode first, then by SKU.
+    """
+    found = crud.lookup_products(
+        session=session,
+        organization_id=current_organization,
+        codes=lookup_in.codes,
+    )
+    missing = [code for code in dict.fromkeys(lookup_in.codes) if code not in found]
+    return ProductLookupPublic(data=found, missing=missing)
+
+
 @router.get("/{product_id}", response_model=ProductPublic)
 def read_product(
     product_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
+    fields: str | None = None,
 ) -> Any:
     """
     Get a specific product by ID.
 
     Any authenticated user can view a product.
+    Pass fields to return only those product fields; id is always included.
     """
+    try:
+        selected = parse_fields(fields, allowed=crud.PRODUCT_FIELDS)
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if selected is not None:
+        row = crud.get_product_row(
+            session=session,
+            product_id=product_id,
+            organization_id=current_organization,
+            fields=selected,
+        )
+        if row is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return FastJSONResponse(row)
     product = crud.get_product_by_id(
         session=session,
         product_id=product_id,
@@ -209,6 +453,19 @@ def update_product(
                 detail="A product with this SKU already exists in the organization",
             )
 
+    # Check for duplicate barcode if barcode is being changed
+    if product_in.barcode is not None and product_in.barcode != db_product.barcode:
+        existing = crud.get_product_by_barcode(
+            session=session,
+            barcode=product_in.barcode,
+            organization_id=current_organization,
+        )
+        if existing:
+            raise HTTPException(
+                status_code=409,
+                detail="A product with this barcode already exists in the organization",
+            )
+
     product = crud.update_product(
         session=session, db_product=db_product, product_in=product_in
     )
@@ -306,16 +563,21 @@ def adjust_stock(
 @router.get("/{product_id}/movements", response_model=InventoryMovementsPublic)
 def read_product_movements(
     product_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+    count_mode: CountMode = "exact",
 ) -> Any:
     """
     Retrieve inventory movements for a specific product.
 
     Any authenticated user can view product movements.
+    Supports cursor pagination through next_cursor, and include_count /
+    count_mode like the top-level listing.
     """
     # Validate product exists
     product = crud.get_product_by_id(
@@ -326,16 +588,23 @@ def read_product_movements(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    movements = crud.get_movements_by_product(
-        session=session,
-        product_id=product_id,
-        organization_id=current_organization,
-        skip=skip,
-        limit=limit,
-    )
-    count = crud.count_movements_by_product(
-        session=session,
-        product_id=product_id,
-        organization_id=current_organization,
+    try:
+        movements, count, count_is_estimate = crud.get_movements_page(
+            session=session,
+            product_id=product_id,
+            organization_id=current_organization,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            count_mode=resolve_count_mode(
+                include_count=include_count, count_mode=count_mode
+            ),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return InventoryMovementsPublic(
+        data=movements,
+        count=count,
+        count_is_estimate=count_is_estimate,
+        next_cursor=next_cursor(movements, sort=crud.MOVEMENT_SORT, limit=limit),
     )
-    return InventoryMovementsPublic(data=movements, count=count)
@@ -3,14 +3,14 @@ from typing import Any
 from fastapi import APIRouter
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentPrincipal, SessionDep
 from app.models import RolesPublic
 
 router = APIRouter()
 
 
 @router.get("/", response_model=RolesPublic)
-def list_roles(*, session: SessionDep, _current_user: CurrentUser) -> Any:
+def list_roles(*, session: SessionDep, _principal: CurrentPrincipal) -> Any:
     """
     Get all available roles in the system.
 
@@ -3,14 +3,29 @@ from decimal import Decimal
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
 
 from app import crud
 from app.api.deps import (
+    AsyncSessionDep,
     CurrentOrganization,
+    CurrentPrincipal,
     CurrentUser,
+    ReadSessionDep,
     SessionDep,
     require_role,
 )
+from app.core import metrics
+from app.core.config import settings
+from app.core.fast_json import FastJSONResponse
+from app.core.pagination import (
+    CountMode,
+    InvalidCursorError,
+    next_cursor,
+    resolve_count_mode,
+)
+from app.core.search import SEARCH_DEFAULT_LIMIT
+from app.core.tracing import traced
 from app.models import (
     InventoryMovementCreate,
     SaleCancelRequest,
@@ -25,8 +40,8 @@ router = APIRouter()
 
 @router.get("/", response_model=SalesPublic)
 def read_sales(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
@@ -35,6 +50,9 @@ def read_sales(
     sort_order: str = "asc",
     status: str | None = None,
     payment_method: str | None = None,
+    cursor: str | None = None,
+    include_count: bool = True,
+    count_mode: CountMode = "exact",
 ) -> Any:
     """
     Retrieve sales in current organization.
@@ -42,26 +60,49 @@ def read_sales(
     Any authenticated user can list sales.
     Supports search (invoice number), sort_by, sort_order (asc/desc),
     status filter, and payment_method filter.
+    Pass the returned next_cursor as cursor to fetch the following page
+    without OFFSET; skip is ignored when a cursor is given.
+    Set include_count=false to skip counting, count_mode=window to count in
+    the page query, or count_mode=estimated to use the planner estimate on
+    large unfiltered listings (flagged by count_is_estimate).
     """
-    sales = crud.get_sales_by_organization(
-        session=session,
-        organization_id=current_organization,
-        skip=skip,
-        limit=limit,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        status=status,
-        payment_method=payment_method,
-    )
-    count = crud.count_sales_by_organization(
-        session=session,
-        organization_id=current_organization,
-        search=search,
-        status=status,
-        payment_method=payment_method,
+    # The fast path returns the same page as plain dicts for FastJSONResponse
+    get_page = (
+        crud.get_sale_rows_page
+        if settings.FAST_JSON_LIST_ENDPOINTS
+        else crud.get_sales_page
     )
-    return SalesPublic(data=sales, count=count)
+    try:
+        sales, count, count_is_estimate = get_page(
+            session=session,
+            organization_id=current_organization,
+            skip=skip,
+            limit=limit,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            status=status,
+            payment_method=payment_method,
+            cursor=cursor,
+            count_mode=resolve_count_mode(
+                include_count=include_count, count_mode=count_mode
+            ),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = {
+        "data": sales,
+        "count": count,
+        "count_is_estimate": count_is_estimate,
+        "next_cursor": next_cursor(
+            sales,
+            sort=crud.get_sale_sort(sort_by=sort_by, sort_order=sort_order),
+            limit=limit,
+        ),
+    }
+    if settings.FAST_JSON_LIST_ENDPOINTS:
+        return FastJSONResponse(page)
+    return SalesPublic(**page)
 
 
 @router.post(
@@ -69,10 +110,10 @@ def read_sales(
     response_model=SalePublic,
     dependencies=[Depends(require_role("admin", "seller"))],
 )
-def create_sale(
+async def create_sale(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     sale_in: SaleCreate,
 ) -> Any:
@@ -88,25 +129,49 @@ def create_sale(
     - Updates customer purchase stats if customer_id is provided
     - Generates a unique invoice number
     """
+    # The sync session run_sync passes is SQLModel's (sync_session_class)
+    sale = await session.run_sync(
+        _create_sale,  # type: ignore[arg-type]
+        organization_id=current_organization,
+        user_id=principal.user_id,
+        sale_in=sale_in,
+    )
+    metrics.SALES_CREATED.inc()
+    return sale
+
+
+@traced
+def _create_sale(
+    session: Session,
+    /,
+    *,
+    organization_id: uuid.UUID,
+    user_id: uuid.UUID,
+    sale_in: SaleCreate,
+) -> SalePublic:
+    # Runs inside AsyncSession.run_sync: sync ORM code, async driver
     # Validate customer if provided
     db_customer = None
     if sale_in.customer_id is not None:
         db_customer = crud.get_customer_by_id(
             session=session,
             customer_id=sale_in.customer_id,
-            organization_id=current_organization,
+            organization_id=organization_id,
         )
         if not db_customer:
             raise HTTPException(status_code=404, detail="Customer not found")
 
-    # Validate all products and check stock
-    product_map: dict[uuid.UUID, Any] = {}
-    for item in sale_in.items:
-        product = crud.get_product_by_id(
+    # Validate all products and check stock; one query for the whole cart
+    product_map: dict[uuid.UUID, Any] = {
+        product.id: product
+        for product in crud.get_products_by_ids(
             session=session,
-            product_id=item.product_id,
-            organization_id=current_organization,
+            product_ids=[item.product_id for item in sale_in.items],
+            organization_id=organization_id,
         )
+    }
+    for item in sale_in.items:
+        product = product_map.get(item.product_id)
         if not product:
             raise HTTPException(
                 status_code=404,
@@ -123,7 +188,6 @@ def create_sale(
                 detail=f"Insufficient stock for '{product.name}'. "
                 f"Available: {product.stock_quantity}, Requested: {item.quantity}",
             )
-        product_map[item.product_id] = product
 
     # Calculate subtotal from items
     subtotal = Decimal("0")
@@ -139,14 +203,14 @@ def create_sale(
 
     # Generate invoice number
     invoice_number = crud.generate_invoice_number(
-        session=session, organization_id=current_organization
+        session=session, organization_id=organization_id
     )
 
-    # Create the sale
+    # Create the sale; its rows are committed together at the end
     sale = crud.create_sale(
         session=session,
-        organization_id=current_organization,
-        user_id=current_user.id,
+        organization_id=organization_id,
+        user_id=user_id,
         customer_id=sale_in.customer_id,
         invoice_number=invoice_number,
         subtotal=subtotal,
@@ -155,6 +219,7 @@ def create_sale(
         total=total,
         payment_method=sale_in.payment_method,
         notes=sale_in.notes,
+        commit=False,
     )
 
     # Create sale items, deduct stock, and create inventory movements
@@ -172,12 +237,13 @@ def create_sale(
             quantity=item.quantity,
             unit_price=product.sale_price,
             subtotal=item_subtotal,
+            commit=False,
         )
 
         # Deduct stock
         previous_stock = product.stock_quantity
         crud.adjust_product_stock(
-            session=session, db_product=product, quantity=-item.quantity
+            session=session, db_product=product, quantity=-item.quantity, commit=False
         )
         new_stock = product.stock_quantity
 
@@ -193,27 +259,31 @@ def create_sale(
         crud.create_inventory_movement(
             session=session,
             movement_create=movement_create,
-            organization_id=current_organization,
-            user_id=current_user.id,
+            organization_id=organization_id,
+            user_id=user_id,
             previous_stock=previous_stock,
             new_stock=new_stock,
+            commit=False,
         )
 
     # Update customer purchase stats
     if db_customer is not None:
         crud.update_customer_purchase_stats(
-            session=session, db_customer=db_customer, sale_total=total
+            session=session, db_customer=db_customer, sale_total=total, commit=False
         )
 
-    # Refresh sale to include items
+    session.commit()
+
+    # Refresh sale to include items; serialize before leaving run_sync,
+    # where lazy loads are still possible
     session.refresh(sale)
-    return sale
+    return SalePublic.model_validate(sale)
 
 
 @router.get("/today", response_model=SalesPublic)
 def read_sales_today(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
     skip: int = 0,
     limit: int = 100,
@@ -232,10 +302,30 @@ def read_sales_today(
     return SalesPublic(data=sales, count=count)
 
 
+@router.get("/search", response_model=SalesPublic)
+def search_sales(
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    q: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> Any:
+    """
+    Typeahead search over invoice numbers.
+
+    Terms shorter than three characters only match an exact invoice number.
+    limit is capped at 50.
+    """
+    sales = crud.search_sales(
+        session=session, organization_id=current_organization, term=q, limit=limit
+    )
+    return SalesPublic(data=sales, count=len(sales))
+
+
 @router.get("/stats", response_model=SaleStatsPublic)
 def read_sales_stats(
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
 ) -> Any:
     """
@@ -250,8 +340,8 @@ def read_sales_stats(
 @router.get("/{sale_id}", response_model=SalePublic)
 def read_sale(
     sale_id: uuid.UUID,
-    session: SessionDep,
-    _current_user: CurrentUser,
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
     current_organization: CurrentOrganization,
 ) -> Any:
     """
@@ -306,20 +396,28 @@ def cancel_sale(
             detail="Sale is already cancelled",
         )
 
-    # Get sale items to restore stock
+    # Get sale items to restore stock, and their products in one query
     sale_items = crud.get_sale_items(session=session, sale_id=sale.id)
-
-    for item in sale_items:
-        # Restore stock
-        product = crud.get_product_by_id(
+    products = {
+        product.id: product
+        for product in crud.get_products_by_ids(
             session=session,
-            product_id=item.product_id,
+            product_ids=[item.product_id for item in sale_items],
             organization_id=current_organization,
         )
+    }
+
+    # Everything below is committed together by crud.cancel_sale
+    for item in sale_items:
+        # Restore stock
+        product = products.get(item.product_id)
         if product:
             previous_stock = product.stock_quantity
             crud.adjust_product_stock(
-                session=session, db_product=product, quantity=item.quantity
+                session=session,
+                db_product=product,
+                quantity=item.quantity,
+                commit=False,
             )
             new_stock = product.stock_quantity
 
@@ -339,6 +437,7 @@ def cancel_sale(
                 user_id=current_user.id,
                 previous_stock=previous_stock,
                 new_stock=new_stock,
+                commit=False,
             )
 
     # Revert customer purchase stats
@@ -350,7 +449,10 @@ def cancel_sale(
         )
         if db_customer:
             crud.revert_customer_purchase_stats(
-                session=session, db_customer=db_customer, sale_total=sale.total
+                session=session,
+                db_customer=db_customer,
+                sale_total=sale.total,
+                commit=False,
             )
 
     # Cancel the sale
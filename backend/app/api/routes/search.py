@@ -0,0 +1,51 @@
+from typing import Any, Literal
+
+from fastapi import APIRouter
+
+from app import crud
+from app.api.deps import CurrentOrganization, CurrentPrincipal, ReadSessionDep
+from app.core.search import SEARCH_DEFAULT_LIMIT
+from app.models import CustomerSearchHit, ProductSearchHit, SearchResultsPublic
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResultsPublic)
+def search(
+    session: ReadSessionDep,
+    _principal: CurrentPrincipal,
+    current_organization: CurrentOrganization,
+    q: str,
+    entity_type: Literal["product", "customer"] | None = None,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> Any:
+    """
+    Ranked full-text search across products and customers.
+
+    Uses Spanish stemming with accents ignored, so "cafe" finds "Café molido".
+    q accepts web search syntax ("quoted phrases", -excluded, or).
+    Hits are grouped by entity type; entity_type restricts the search to one
+    of them. limit applies per entity type and is capped at 50.
+    """
+    results = SearchResultsPublic()
+    if entity_type in (None, "product"):
+        results.products = [
+            ProductSearchHit.model_validate(product, update={"rank": rank})
+            for product, rank in crud.full_text_search_products(
+                session=session,
+                organization_id=current_organization,
+                query=q,
+                limit=limit,
+            )
+        ]
+    if entity_type in (None, "customer"):
+        results.customers = [
+            CustomerSearchHit.model_validate(customer, update={"rank": rank})
+            for customer, rank in crud.full_text_search_customers(
+                session=session,
+                organization_id=current_organization,
+                query=q,
+                limit=limit,
+            )
+        ]
+    return results
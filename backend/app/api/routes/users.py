@@ -3,7 +3,8 @@ from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
-from sqlmodel import select
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
 
 from app import crud
 from app.api.deps import (
@@ -12,7 +13,7 @@ from app.api.deps import (
     SessionDep,
 )
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models import (
     Message,
     UpdatePassword,
@@ -42,7 +43,7 @@ def read_users(
     Only admin users can list all users.
     """
     # Check if user is admin
-    role = session.get(crud.Role, current_user.role_id)
+    role = crud.get_cached_role(session=session, role_id=current_user.role_id)
     if not role or role.name != "admin":
         raise HTTPException(
             status_code=403,
@@ -60,7 +61,7 @@ def read_users(
 
 
 @router.post("/", response_model=UserPublic)
-def create_user(
+async def create_user(
     *,
     session: SessionDep,
     current_user: CurrentUser,
@@ -72,8 +73,28 @@ def create_user(
 
     Only admin users can create users.
     """
+    hashed_password = await get_password_hash_async(user_in.password)
+    return await run_in_threadpool(
+        _create_user,
+        session,
+        current_user=current_user,
+        current_organization=current_organization,
+        user_in=user_in,
+        hashed_password=hashed_password,
+    )
+
+
+def _create_user(
+    session: Session,
+    /,
+    *,
+    current_user: User,
+    current_organization: uuid.UUID,
+    user_in: UserCreate,
+    hashed_password: str,
+) -> User:
     # Check if user is admin
-    role = session.get(crud.Role, current_user.role_id)
+    role = crud.get_cached_role(session=session, role_id=current_user.role_id)
     if not role or role.name != "admin":
         raise HTTPException(
             status_code=403,
@@ -91,7 +112,7 @@ def create_user(
         )
 
     # Validate role_id
-    requested_role = session.get(crud.Role, user_in.role_id)
+    requested_role = crud.get_cached_role(session=session, role_id=user_in.role_id)
     if not requested_role:
         raise HTTPException(
             status_code=400,
@@ -99,7 +120,10 @@ def create_user(
         )
 
     user = crud.create_user(
-        session=session, user_create=user_in, organization_id=current_organization
+        session=session,
+        user_create=user_in,
+        organization_id=current_organization,
+        hashed_password=hashed_password,
     )
 
     if settings.emails_enabled and user_in.email:
@@ -150,34 +174,40 @@ def update_user_me(
 
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
+async def update_password_me(
     *, session: SessionDep, body: UpdatePassword, current_user: CurrentUser
 ) -> Any:
     """
     Update own password.
     """
-    verified, _ = verify_password(body.current_password, current_user.hashed_password)
+    verified, _ = await verify_password_async(
+        body.current_password, current_user.hashed_password
+    )
     if not verified:
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
+    hashed_password = await get_password_hash_async(body.new_password)
     current_user.hashed_password = hashed_password
     current_user.updated_at = datetime.now(timezone.utc)
-    session.add(current_user)
-    session.commit()
+    await run_in_threadpool(_save_user, session, current_user)
     return Message(message="Password updated successfully")
 
 
+def _save_user(session: Session, user: User) -> None:
+    session.add(user)
+    session.commit()
+
+
 @router.delete("/me", response_model=Message)
 def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
     """
     Delete own user (soft delete).
     """
     # Check if user is the only admin
-    role = session.get(crud.Role, current_user.role_id)
+    role = crud.get_cached_role(session=session, role_id=current_user.role_id)
     if role and role.name == "admin":
         # Count other active admins in the organization
         from sqlalchemy import func
@@ -198,11 +228,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
                 detail="Cannot delete the only admin user in the organization",
             )
 
-    # Soft delete
-    current_user.deleted_at = datetime.now(timezone.utc)
-    current_user.is_active = False
-    session.add(current_user)
-    session.commit()
+    crud.soft_delete_user(session=session, db_user=current_user)
     return Message(message="User deleted successfully")
 
 
@@ -225,7 +251,7 @@ def read_user_by_id(
 
     # Users can only see themselves unless they're admin
     if user.id != current_user.id:
-        role = session.get(crud.Role, current_user.role_id)
+        role = crud.get_cached_role(session=session, role_id=current_user.role_id)
         if not role or role.name != "admin":
             raise HTTPException(
                 status_code=403,
@@ -236,7 +262,7 @@ def read_user_by_id(
 
 
 @router.patch("/{user_id}", response_model=UserPublic)
-def update_user(
+async def update_user(
     *,
     session: SessionDep,
     current_user: CurrentUser,
@@ -249,8 +275,32 @@ def update_user(
 
     Only admin users can update other users.
     """
+    hashed_password = (
+        await get_password_hash_async(user_in.password) if user_in.password else None
+    )
+    return await run_in_threadpool(
+        _update_user,
+        session,
+        current_user=current_user,
+        current_organization=current_organization,
+        user_id=user_id,
+        user_in=user_in,
+        hashed_password=hashed_password,
+    )
+
+
+def _update_user(
+    session: Session,
+    /,
+    *,
+    current_user: User,
+    current_organization: uuid.UUID,
+    user_id: uuid.UUID,
+    user_in: UserUpdate,
+    hashed_password: str | None,
+) -> Any:
     # Check if current user is admin
-    role = session.get(crud.Role, current_user.role_id)
+    role = crud.get_cached_role(session=session, role_id=current_user.role_id)
     if not role or role.name != "admin":
         raise HTTPException(
             status_code=403,
@@ -279,14 +329,19 @@ def update_user(
 
     # Validate role_id if provided
     if user_in.role_id:
-        requested_role = session.get(crud.Role, user_in.role_id)
+        requested_role = crud.get_cached_role(session=session, role_id=user_in.role_id)
         if not requested_role:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid role_id",
             )
 
-    db_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
+    db_user = crud.update_user(
+        session=session,
+        db_user=db_user,
+        user_in=user_in,
+        hashed_password=hashed_password,
+    )
     return db_user
 
 
@@ -303,7 +358,7 @@ def delete_user(
     Only admin users can delete users.
     """
     # Check if current user is admin
-    role = session.get(crud.Role, current_user.role_id)
+    role = crud.get_cached_role(session=session, role_id=current_user.role_id)
     if not role or role.name != "admin":
         raise HTTPException(
             status_code=403,
@@ -323,7 +378,7 @@ def delete_user(
         )
 
     # Check if this is the only admin
-    user_role = session.get(crud.Role, user.role_id)
+    user_role = crud.get_cached_role(session=session, role_id=user.role_id)
     if user_role and user_role.name == "admin":
         from sqlalchemy import func
 
@@ -342,9 +397,5 @@ def delete_user(
                 detail="Cannot delete the only admin user in the organization",
             )
 
-    # Soft delete
-    user.deleted_at = datetime.now(timezone.utc)
-    user.is_active = False
-    session.add(user)
-    session.commit()
+    crud.soft_delete_user(session=session, db_user=user)
     return Message(message="User deleted successfully")
@@ -1,8 +1,13 @@
-from fastapi import APIRouter
+import uuid
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic.networks import EmailStr
 
 from app.api.deps import CurrentAdminUser
-from app.models import Message
+from app.core.db import async_pool_metrics, pool_metrics
+from app.core.profiling import load_profile
+from app.models import DbPoolStats, Message, RequestProfilePublic
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -27,6 +32,47 @@ def test_email(email_to: EmailStr, _current_user: CurrentAdminUser) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get("/db-pool/", response_model=DbPoolStats)
+def read_db_pool_stats(_current_user: CurrentAdminUser) -> DbPoolStats:
+    """
+    Connection pool usage of the worker that serves this request: the sync
+    pool, with the async pool under async_pool.
+    """
+    stats = pool_metrics.snapshot()
+    stats.async_pool = async_pool_metrics.snapshot()
+    return stats
+
+
+def _get_profile(
+    profile_id: uuid.UUID, admin: CurrentAdminUser
+) -> RequestProfilePublic:
+    profile = load_profile(profile_id)
+    if profile is None or profile.organization_id != admin.organization_id:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles/{profile_id}", response_model=RequestProfilePublic)
+def read_profile(
+    profile_id: uuid.UUID, current_user: CurrentAdminUser
+) -> RequestProfilePublic:
+    """
+    Profile of a request sent with X-Profile: 1, named by its X-Profile-Id
+    response header. Only admins of the organization that made it can read it.
+    """
+    return _get_profile(profile_id, current_user)
+
+
+@router.get("/profiles/{profile_id}/flamegraph", response_class=PlainTextResponse)
+def read_profile_flamegraph(
+    profile_id: uuid.UUID, current_user: CurrentAdminUser
+) -> str:
+    """
+    The profile's stacks in collapsed format, for flamegraph.pl or speedscope.
+    """
+    return "\n".join(_get_profile(profile_id, current_user).stacks) + "\n"
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
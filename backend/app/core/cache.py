@@ -0,0 +1,89 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe in-process LRU map whose entries expire after ``ttl`` seconds.
+
+    Each worker process holds its own copy; nothing is shared across workers.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TenantCache(Generic[K, V]):
+    """One TTLCache per organization, so a busy tenant cannot evict the others."""
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._tenants: dict[uuid.UUID, TTLCache[K, V]] = {}
+        self._lock = threading.Lock()
+
+    def for_tenant(self, organization_id: uuid.UUID) -> TTLCache[K, V]:
+        cache = self._tenants.get(organization_id)
+        if cache is None:
+            with self._lock:
+                cache = self._tenants.setdefault(
+                    organization_id, TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+                )
+        return cache
+
+    def invalidate(self, organization_id: uuid.UUID) -> None:
+        with self._lock:
+            self._tenants.pop(organization_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tenants.clear()
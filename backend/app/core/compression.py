@@ -0,0 +1,188 @@
+import gzip
+import zlib
+from collections.abc import Sequence
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - brotli is optional at runtime
+    brotli = None
+
+# Statuses whose responses carry no body
+_NO_BODY_STATUSES = {204, 304}
+
+
+def choose_encoding(accept_encoding: str, *, brotli_enabled: bool) -> str | None:
+    """Pick br or gzip from an Accept-Encoding header, preferring br."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli_enabled and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # Sync flush so each streamed chunk reaches the client decodable
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return bytes(self._compressor.process(data))
+
+    def flush(self) -> bytes:
+        return bytes(self._compressor.flush())
+
+    def finish(self) -> bytes:
+        return bytes(self._compressor.finish())
+
+
+def compress_bytes(data: bytes, *, encoding: str, level: int) -> bytes:
+    """One-shot compression, used by the compression benchmark."""
+    if encoding == "br":
+        return bytes(brotli.compress(data, quality=level))
+    return gzip.compress(data, compresslevel=level)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip according to Accept-Encoding.
+
+    Only responses whose content type starts with one of ``content_types`` are
+    compressed. Single-body responses smaller than ``minimum_size`` are sent
+    as is. Streaming responses are compressed chunk by chunk and flushed after
+    each chunk, so clients keep receiving data as it is produced.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        content_types: Sequence[str] = ("application/json", "text/"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled and brotli is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            brotli_enabled=self.brotli_enabled,
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(self.content_types)
+
+    def encoder(self, encoding: str) -> Any:
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: str, send: Send
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Message | None = None
+        self.encoder: Any = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = message[
+                "status"
+            ] in _NO_BODY_STATUSES or not self.middleware.should_compress(headers)
+            return
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.start_message is not None:
+            # First body message: decide now, before the headers go out
+            start, self.start_message = self.start_message, None
+            if self.passthrough or (
+                not more_body and len(body) < self.middleware.minimum_size
+            ):
+                self.passthrough = True
+                await self.downstream(start)
+                await self.downstream(message)
+                return
+            self.encoder = self.middleware.encoder(self.encoding)
+            chunk = self._encode(body, more_body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(chunk))
+            await self.downstream(start)
+        elif self.passthrough:
+            await self.downstream(message)
+            return
+        else:
+            chunk = self._encode(body, more_body)
+
+        await self.downstream(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _encode(self, body: bytes, more_body: bool) -> bytes:
+        if more_body:
+            return bytes(self.encoder.compress(body) + self.encoder.flush())
+        return bytes(self.encoder.compress(body) + self.encoder.finish())
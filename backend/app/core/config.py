@@ -68,6 +68,99 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pools, per worker process: one for sync routes and one for
+    # async routes and authentication (DB_ASYNC_*). Size them so that
+    #   workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW
+    #              + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW)
+    #     + other clients
+    #     <= Postgres max_connections - superuser_reserved_connections
+    # (4 * (10 + 5 + 3 + 2) = 80 of the default 100 - 3 with the image's 4
+    # workers; a replica counts against its own server). DB_POOL_SIZE should
+    # cover the requests a worker has in the database at once in steady
+    # state (request rate * mean DB time per request per worker); overflow
+    # absorbs bursts. An async checkout is held only while a query awaits,
+    # so its pool can be small. scripts/benchmark_pool.py measures
+    # throughput and checkout waits for a given configuration.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_ASYNC_POOL_SIZE: int = 3
+    DB_ASYNC_MAX_OVERFLOW: int = 2
+    DB_POOL_TIMEOUT_SECONDS: float = 10
+    # Recycle before server or proxy idle timeouts close connections, and
+    # test connections on checkout so a failover does not surface as errors
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Compiled SQL cached per engine, and executions after which psycopg
+    # prepares a statement server side (None disables; needed behind
+    # PgBouncer in transaction mode)
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_PREPARE_THRESHOLD: int | None = 5
+    DB_APPLICATION_NAME: str = "orbit-engine"
+    # statement_timeout (SET LOCAL per transaction) for API requests, so one
+    # tenant's runaway search cannot hold a connection; exports get longer.
+    # 0 disables. Statements slower than DB_SLOW_QUERY_MS are logged with
+    # their route and organization (None disables).
+    DB_STATEMENT_TIMEOUT_MS: int = 5_000
+    DB_EXPORT_STATEMENT_TIMEOUT_MS: int = 120_000
+    DB_SLOW_QUERY_MS: float | None = 500
+    # Outside production each response carries X-Query-Count, and a warning
+    # is logged when one statement repeats this often in a request (N+1)
+    QUERY_REPEAT_WARNING_THRESHOLD: int | None = 10
+    # Prometheus metrics at /metrics; see app/core/metrics.py for running
+    # several workers (PROMETHEUS_MULTIPROC_DIR)
+    METRICS_ENABLED: bool = True
+    # /metrics answers peers in METRICS_ALLOWED_IPS (comma separated IPs or
+    # networks) and scrapers sending "Authorization: Bearer <METRICS_TOKEN>";
+    # anyone else gets a 404. Never list the reverse proxy's network here:
+    # public requests reach the backend from it.
+    METRICS_TOKEN: str | None = None
+    METRICS_ALLOWED_IPS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = [
+        "127.0.0.1",
+        "::1",
+    ]
+    # Once enabled, admins can profile a single request with X-Profile: 1;
+    # see app/core/profiling.py. Profiles are files in PROFILE_DIR, which
+    # the workers of one host share.
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = "/tmp/orbit-profiles"
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5
+    PROFILE_MAX_SECONDS: float = 30
+    PROFILE_KEEP: int = 50
+    # OpenTelemetry spans for requests, @traced crud operations and SQL; see
+    # app/core/tracing.py. "otlp" posts them to TRACING_OTLP_ENDPOINT (an
+    # OTLP/HTTP collector), "file" appends JSON lines to TRACING_FILE.
+    # TRACING_SAMPLE_RATIO is the share of requests traced.
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal["otlp", "file"] = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE: str = "/tmp/orbit-traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
+    TRACING_SERVICE_NAME: str = "orbit-engine"
+
+    # Optional streaming replica (same credentials and database) that
+    # read-only endpoints use. Users read from the primary for
+    # READ_YOUR_WRITES_SECONDS after committing a write, and everyone does
+    # while the replica lags more than REPLICA_MAX_LAG_SECONDS.
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_LAG_CHECK_SECONDS: float = 2
+    READ_YOUR_WRITES_SECONDS: float = 5
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URI(self) -> PostgresDsn | None:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return PostgresDsn.build(
+            scheme="postgresql+psycopg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_REPLICA_SERVER,
+            port=self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
     EMAILS_FROM_EMAIL: EmailStr | None = None
     EMAILS_FROM_NAME: str | None = None
     RESEND_API_KEY: str | None = None
@@ -105,6 +198,74 @@ class Settings(BaseSettings):
             self.S3_ACCESS_KEY_ID and self.S3_SECRET_ACCESS_KEY and self.S3_BUCKET_NAME
         )
 
+    # Per-worker cache of barcode/SKU scanner lookups, sized per organization.
+    # Writes are broadcast to the other workers with Postgres NOTIFY; the TTL
+    # bounds staleness if a worker's listener is disconnected.
+    PRODUCT_LOOKUP_CACHE_SIZE: int = 5000
+    PRODUCT_LOOKUP_CACHE_TTL_SECONDS: int = 30
+    PRODUCT_LOOKUP_CACHE_LISTEN: bool = True
+
+    # Response compression. Bodies under COMPRESSION_MINIMUM_SIZE bytes cost
+    # more CPU to compress than they save on the wire; streamed responses are
+    # always compressed when their content type is allowed.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Content-type prefixes eligible for compression (JSON list in env)
+    COMPRESSION_CONTENT_TYPES: list[str] = ["application/json", "text/"]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Serve the product and sale listings from column tuples encoded with
+    # orjson instead of validating ORM objects into response models.
+    FAST_JSON_LIST_ENDPOINTS: bool = False
+
+    # Trust the organization and role claims of signed access tokens instead
+    # of loading the user (and role) on every request. Deactivated, deleted
+    # and re-roled users are rejected through a per-worker revocation list
+    # reloaded every AUTH_REVOCATION_REFRESH_SECONDS; other workers may
+    # accept a revoked token for up to that long.
+    AUTH_STATELESS_CLAIMS: bool = False
+    AUTH_REVOCATION_REFRESH_SECONDS: int = 30
+
+    # Per-worker caches of roles and active users' auth records. Writes are
+    # broadcast to the other workers with Postgres NOTIFY; the TTL bounds
+    # staleness if a worker's listener is disconnected.
+    AUTH_CACHE_LISTEN: bool = True
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_ROLE_CACHE_TTL_SECONDS: int = 3600
+
+    # Argon2 cost for new hashes; existing hashes are upgraded on next login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    # Password hashing runs in a pool of this many processes per worker
+    # (0 hashes in a threadpool thread), each using up to ARGON2_PARALLELISM
+    # cores. Past PASSWORD_HASH_MAX_PENDING
+    # queued or running hashes, requests wait up to
+    # PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS and then get a 503.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # Login throttling, checked before any password hashing. Token buckets
+    # per client IP and per email hold *_BURST attempts and refill at
+    # *_PER_MINUTE. "memory" keeps them per worker; "postgres" shares them
+    # through the login_throttle_buckets table at the cost of a round trip.
+    LOGIN_THROTTLE_BACKEND: Literal["memory", "postgres"] = "memory"
+    # Addresses or networks of reverse proxies (e.g. Traefik's Docker
+    # network), as a comma separated list. Behind one of them the client IP
+    # comes from X-Forwarded-For; otherwise every login would share the
+    # proxy's bucket. Empty trusts no one and uses the peer address.
+    TRUSTED_PROXIES: Annotated[list[str] | str, BeforeValidator(parse_cors)] = []
+    LOGIN_IP_BURST: int = 30
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_EMAIL_BURST: int = 10
+    LOGIN_EMAIL_PER_MINUTE: float = 2
+    # Consecutive wrong passwords before an account is locked, and for how long
+    LOGIN_LOCKOUT_THRESHOLD: int = 5
+    LOGIN_LOCKOUT_MINUTES: int = 15
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = (
@@ -1,10 +1,331 @@
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+from typing import Any
+
+from psycopg.errors import QueryCanceled
+from sqlalchemy import Connection, Engine, event, func
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
+from app.core import metrics
 from app.core.config import settings
-from app.models import OrganizationCreate, User, UserCreate
+from app.core.profiling import request_profile
+from app.core.query_count import record_query
+from app.core.replica import ReplicaRouter
+from app.core.request_context import (
+    request_organization_id,
+    request_route,
+    request_statement_timeout,
+    request_user_id,
+)
+from app.models import DbPoolStats, OrganizationCreate, User, UserCreate
+
+logger = logging.getLogger(__name__)
+
+
+def _engine_options(*, pool_size: int, max_overflow: int) -> dict[str, Any]:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+        "connect_args": {
+            "application_name": settings.DB_APPLICATION_NAME,
+            "prepare_threshold": settings.DB_PREPARE_THRESHOLD,
+        },
+    }
+
+
+def make_engine(url: str) -> Engine:
+    """Create an engine with the pool and driver settings from Settings"""
+    return create_engine(
+        url,
+        **_engine_options(
+            pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW
+        ),
+    )
+
+
+def make_async_engine(url: str) -> AsyncEngine:
+    """
+    Async (psycopg) counterpart of make_engine, with its own pool sized by
+    DB_ASYNC_POOL_SIZE and DB_ASYNC_MAX_OVERFLOW
+    """
+    return create_async_engine(
+        url,
+        **_engine_options(
+            pool_size=settings.DB_ASYNC_POOL_SIZE,
+            max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+        ),
+    )
+
+
+class PoolMetrics:
+    """
+    Saturation counters for an engine's pool, fed by pool events.
+
+    ``timeouts`` is counted by the API's pool timeout handler, since the
+    pool raises before any event fires.
+    """
+
+    def __init__(self, engine: Engine, *, max_overflow: int | None = None) -> None:
+        self.engine = engine
+        # The pool does not expose its overflow limit; DB_MAX_OVERFLOW is
+        # what make_engine uses
+        self.max_overflow = (
+            settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow
+        )
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, *_args: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *_args: Any) -> None:
+        pool = self.engine.pool
+        checked_out = pool.checkedout() if isinstance(pool, QueuePool) else 0
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def _on_invalidate(self, *_args: Any) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> DbPoolStats:
+        pool = self.engine.pool
+        assert isinstance(pool, QueuePool)
+        capacity = pool.size() + self.max_overflow
+        return DbPoolStats(
+            pool_size=pool.size(),
+            max_overflow=self.max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            saturation=pool.checkedout() / capacity if capacity else 1.0,
+            peak_checked_out=self.peak_checked_out,
+            connects=self.connects,
+            checkouts=self.checkouts,
+            invalidations=self.invalidations,
+            timeouts=self.timeouts,
+        )
+
+
+engine = make_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+pool_metrics = PoolMetrics(engine)
+
+# Used by async routes, which keep their database waits off the threadpool
+async_engine = make_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+async_pool_metrics = PoolMetrics(
+    async_engine.sync_engine, max_overflow=settings.DB_ASYNC_MAX_OVERFLOW
+)
+
+replica_router: ReplicaRouter | None = None
+async_replica_engine: AsyncEngine | None = None
+if settings.SQLALCHEMY_REPLICA_DATABASE_URI:
+    async_replica_engine = make_async_engine(
+        str(settings.SQLALCHEMY_REPLICA_DATABASE_URI)
+    )
+    replica_router = ReplicaRouter(
+        primary=engine,
+        replica=make_engine(str(settings.SQLALCHEMY_REPLICA_DATABASE_URI)),
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        read_your_writes=settings.READ_YOUR_WRITES_SECONDS,
+        lag_check_interval=settings.REPLICA_LAG_CHECK_SECONDS,
+    )
+
+if settings.METRICS_ENABLED:
+    metrics.instrument_pool(engine, "primary")
+    metrics.instrument_pool(async_engine.sync_engine, "primary_async")
+    if replica_router is not None and async_replica_engine is not None:
+        metrics.instrument_pool(replica_router.replica, "replica")
+        metrics.instrument_pool(async_replica_engine.sync_engine, "replica_async")
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Commits made for request_user_id are announced here, so every worker
+# sends that user's reads to the primary for a while
+RECENT_WRITES_CHANNEL = "recent_writes"
+
+
+# Listening on the base class covers the sync sessions behind AsyncSession
+@event.listens_for(OrmSession, "after_flush")
+def _flag_write(session: OrmSession, _flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _announce_write(session: OrmSession) -> None:
+    user_id = request_user_id.get()
+    if replica_router is not None and user_id and session.info.get("wrote"):
+        session.execute(select(func.pg_notify(RECENT_WRITES_CHANNEL, str(user_id))))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _remember_write(session: OrmSession) -> None:
+    user_id = request_user_id.get()
+    if replica_router is not None and user_id and session.info.pop("wrote", False):
+        replica_router.mark_write(user_id)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_write(session: OrmSession) -> None:
+    session.info.pop("wrote", None)
+
+
+def handle_recent_write_notification(payload: str) -> None:
+    """Apply a RECENT_WRITES_CHANNEL message sent by another worker"""
+    if replica_router is not None:
+        replica_router.mark_write(uuid.UUID(payload))
+
+
+@event.listens_for(OrmSession, "after_begin")
+def _set_statement_timeout(
+    _session: OrmSession, _transaction: Any, connection: Connection
+) -> None:
+    # Not in the engine "begin" event, which fires before the transaction
+    # exists; SET LOCAL ends with it, so pooled connections come back clean
+    timeout_ms = request_statement_timeout.get()
+    if timeout_ms is not None:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Names and types of a statement's parameters, leaving out the values"""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else None}"
+    if isinstance(parameters, Mapping):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _log_slow_query(
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    duration_ms: float,
+    *,
+    canceled: bool = False,
+) -> None:
+    route = request_route.get()
+    organization_id = request_organization_id.get()
+    shape = parameter_shape(parameters, executemany)
+    sql = " ".join(statement.split())
+    logger.warning(
+        "Slow query%s: %.0f ms route=%s organization_id=%s params=%s sql=%s",
+        " (canceled by statement_timeout)" if canceled else "",
+        duration_ms,
+        route,
+        organization_id,
+        shape,
+        sql,
+        extra={
+            "duration_ms": duration_ms,
+            "canceled": canceled,
+            "route": route,
+            "organization_id": organization_id,
+            "parameters": shape,
+            "sql": sql,
+        },
+    )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(_conn: Connection, _cursor: Any, statement: str, *_args: Any) -> None:
+    record_query(statement)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn: Connection, *_args: Any) -> None:
+    if (
+        settings.METRICS_ENABLED
+        or settings.DB_SLOW_QUERY_MS is not None
+        or request_profile.get() is not None
+    ):
+        conn.info["query_started_at"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _check_query_duration(
+    conn: Connection,
+    _cursor: Any,
+    statement: str,
+    parameters: Any,
+    _context: Any,
+    executemany: bool,
+) -> None:
+    started_at = conn.info.pop("query_started_at", None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    if settings.METRICS_ENABLED:
+        metrics.observe_query(request_route.get(), duration)
+    threshold = settings.DB_SLOW_QUERY_MS
+    duration_ms = duration * 1000
+    if threshold is not None and duration_ms >= threshold:
+        _log_slow_query(statement, parameters, executemany, duration_ms)
+    profile = request_profile.get()
+    if profile is not None:
+        profile.add_query(
+            statement, parameter_shape(parameters, executemany), started_at, duration
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _log_canceled_query(context: ExceptionContext) -> None:
+    # Failed statements never reach after_cursor_execute; the ones stopped by
+    # statement_timeout are logged
+    conn = context.connection
+    if conn is None:
+        return
+    started_at = conn.info.pop("query_started_at", None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    statement = context.statement or ""
+    executemany = bool(
+        context.execution_context and context.execution_context.executemany
+    )
+    canceled = isinstance(context.original_exception, QueryCanceled)
+    profile = request_profile.get()
+    if profile is not None:
+        profile.add_query(
+            statement,
+            parameter_shape(context.parameters, executemany),
+            started_at,
+            duration,
+            canceled=canceled,
+        )
+    if canceled:
+        _log_slow_query(
+            statement,
+            context.parameters,
+            executemany,
+            duration * 1000,
+            canceled=True,
+        )
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
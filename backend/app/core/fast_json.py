@@ -0,0 +1,42 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from sqlmodel import SQLModel
+from starlette.responses import JSONResponse
+
+
+def public_columns(
+    table_model: type[SQLModel],
+    public_model: type[SQLModel],
+    *,
+    exclude: frozenset[str] = frozenset(),
+) -> list[Any]:
+    """Table columns backing the fields of a *Public model, in field order."""
+    table = table_model.__table__  # type: ignore[attr-defined]
+    return [table.c[name] for name in public_model.model_fields if name not in exclude]
+
+
+def _default(value: Any) -> Any:
+    # Same representation pydantic uses for Decimal in JSON mode
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode with orjson, matching the JSON pydantic produces for our models."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for payloads already shaped like the response model.
+
+    Used by list endpoints when FAST_JSON_LIST_ENDPOINTS is on: rows come
+    straight from column tuples, so pydantic validation and FastAPI's
+    response_model serialization are skipped and orjson does the encoding.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
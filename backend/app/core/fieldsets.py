@@ -0,0 +1,29 @@
+from collections.abc import Collection, Mapping, Sequence
+from typing import Any
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fields= value names a field outside the allow-list."""
+
+
+def parse_fields(fields: str | None, *, allowed: Collection[str]) -> list[str] | None:
+    """
+    Parse a comma separated fields= value against an allow-list.
+
+    Returns None when no fields were requested. id is always included, first,
+    so clients can keep addressing the rows they receive.
+    """
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names:
+        raise InvalidFieldsError("fields must name at least one field")
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", *names]))
+
+
+def project(rows: Sequence[Mapping[str, Any]], fields: Sequence[str]) -> list[Any]:
+    """Keep only the requested fields of each row, in request order."""
+    return [{name: row[name] for name in fields} for row in rows]
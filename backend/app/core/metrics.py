@@ -0,0 +1,174 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Each worker process records its own samples. With several workers, point
+PROMETHEUS_MULTIPROC_DIR at a directory the workers share and that is
+emptied before they start (the Docker image does this); every worker then
+writes its samples there and /metrics on any of them reports the totals.
+Without it, /metrics reports the process that answers.
+
+Average queries per request for a route is
+db_query_duration_seconds_count / http_request_duration_seconds_count.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _MULTIPROC_DIR:
+    os.makedirs(_MULTIPROC_DIR, exist_ok=True)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency until the response is fully sent",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being served",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond DB_POOL_SIZE",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts",
+    "Requests that gave up waiting for a pooled connection",
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Statement execution time, by the route that ran it",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 hash or verify time, including the wait for a hashing process",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PROCESS_POOL_QUEUE_DURATION = Histogram(
+    "process_pool_queue_duration_seconds",
+    "Time a task waited for a worker process, from submit to start",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PROCESS_POOL_RUN_DURATION = Histogram(
+    "process_pool_run_duration_seconds",
+    "Time a task ran in a worker process",
+    ["pool"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PROCESS_POOL_REJECTED = Counter(
+    "process_pool_rejected",
+    "Tasks turned away because the pool had too many pending",
+    ["pool"],
+)
+EXPORT_DURATION = Histogram(
+    "export_duration_seconds",
+    "Time to build a dashboard export",
+    ["dataset"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+EXPORT_SIZE = Histogram(
+    "export_size_bytes",
+    "Size of dashboard exports",
+    ["dataset"],
+    buckets=tuple(float(2**n) for n in range(10, 28, 2)),
+)
+SALES_CREATED = Counter("sales_created", "Sales recorded")
+
+# Queries run outside a request, e.g. by startup or listener code
+NO_ROUTE = "none"
+
+
+def observe_query(route: str | None, seconds: float) -> None:
+    DB_QUERY_DURATION.labels(route or NO_ROUTE).observe(seconds)
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Keep the pool gauges for ``engine`` current, labelled ``name``"""
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+
+    def update(*_args: object) -> None:
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            checked_out.set(pool.checkedout())
+            overflow.set(max(pool.overflow(), 0))
+
+    event.listen(engine, "checkout", update)
+    event.listen(engine, "checkin", update)
+
+
+def render() -> tuple[bytes, str]:
+    """The exposition text for /metrics and its content type"""
+    if _MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=_MULTIPROC_DIR)  # type: ignore[no-untyped-call]
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped() -> None:
+    """Drop this process's live gauges from the shared totals"""
+    if _MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid(), path=_MULTIPROC_DIR)  # type: ignore[no-untyped-call]
+
+
+class MetricsMiddleware:
+    """
+    Record request latency by method, route template and status, and the
+    number of requests in flight. Unmatched paths share one route label so
+    scanners cannot blow up the label set.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(
+                time.perf_counter() - started_at
+            )
@@ -0,0 +1,17 @@
+from collections.abc import Sequence
+from functools import lru_cache
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+
+
+@lru_cache(maxsize=8)
+def _parse(networks: tuple[str, ...]) -> list[IPv4Network | IPv6Network]:
+    return [ip_network(network, strict=False) for network in networks]
+
+
+def ip_in_networks(host: str, networks: Sequence[str]) -> bool:
+    """Whether ``host`` is an IP address inside one of ``networks`` (CIDR or bare IPs)"""
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _parse(tuple(networks)))
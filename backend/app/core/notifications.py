@@ -0,0 +1,77 @@
+import logging
+import threading
+from collections.abc import Callable
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import func, select
+from sqlalchemy.engine import URL
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+
+def notify(session: Session, channel: str, payload: str) -> None:
+    """Queue a Postgres NOTIFY, delivered when the session's transaction commits"""
+    session.execute(select(func.pg_notify(channel, payload)))
+
+
+class NotificationListener:
+    """
+    Background thread that LISTENs on a Postgres channel.
+
+    ``on_message`` runs for every payload received. ``on_connect`` runs after
+    each (re)connection, once listening, since messages sent while the
+    listener was disconnected are lost; callers use it to drop whatever the
+    missed messages would have invalidated.
+    """
+
+    def __init__(
+        self,
+        url: URL,
+        channel: str,
+        *,
+        on_message: Callable[[str], None],
+        on_connect: Callable[[], None] | None = None,
+        poll_timeout: float = 1.0,
+        reconnect_delay: float = 5.0,
+    ) -> None:
+        self.conninfo = url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.channel = channel
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.poll_timeout = poll_timeout
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"listen-{self.channel}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.poll_timeout + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as conn:
+                    conn.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                    )
+                    if self.on_connect is not None:
+                        self.on_connect()
+                    while not self._stop.is_set():
+                        for message in conn.notifies(timeout=self.poll_timeout):
+                            self.on_message(message.payload)
+            except Exception:
+                logger.exception("Listener on %s failed, reconnecting", self.channel)
+                self._stop.wait(self.reconnect_delay)
@@ -0,0 +1,249 @@
+import base64
+import json
+import uuid
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Literal, TypeVar
+
+from sqlalchemy import DateTime, Numeric, and_, func, literal, or_, tuple_
+from sqlmodel import Session
+
+T = TypeVar("T")
+
+# exact: separate COUNT(*) query; window: count(*) OVER () on the page query;
+# estimated: planner row estimate (exact below ESTIMATE_EXACT_THRESHOLD);
+# none: skip counting altogether.
+CountMode = Literal["exact", "window", "estimated", "none"]
+
+# Planner estimates are coarse for small result sets, which are cheap to count anyway
+ESTIMATE_EXACT_THRESHOLD = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the sort."""
+
+
+@dataclass(frozen=True)
+class SortSpec:
+    """Resolved ORDER BY for a list query: attribute name, column and direction."""
+
+    key: str
+    column: Any
+    descending: bool
+
+
+def resolve_sort(
+    columns: dict[str, Any],
+    *,
+    sort_by: str | None,
+    sort_order: str,
+    default_key: str = "created_at",
+    default_descending: bool = False,
+) -> SortSpec:
+    """Resolve user supplied sort parameters against an allow-list of columns."""
+    if sort_by is not None and sort_by in columns:
+        return SortSpec(
+            key=sort_by, column=columns[sort_by], descending=sort_order == "desc"
+        )
+    return SortSpec(
+        key=default_key,
+        column=columns[default_key],
+        descending=default_descending,
+    )
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(column: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    column_type = column.expression.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Numeric):
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(*, sort: SortSpec, value: Any, row_id: uuid.UUID) -> str:
+    """Build an opaque cursor pointing right after the given row."""
+    payload = {
+        "k": sort.key,
+        "d": sort.descending,
+        "v": _encode_value(value),
+        "id": str(row_id),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *, sort: SortSpec) -> tuple[Any, uuid.UUID]:
+    """Decode a cursor into (sort value, row id), validating it against the sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["k"] != sort.key or payload["d"] != sort.descending:
+            raise InvalidCursorError("Cursor does not match the requested sort")
+        return _decode_value(sort.column, payload["v"]), uuid.UUID(payload["id"])
+    except InvalidCursorError:
+        raise
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def apply_keyset(
+    statement: Any, *, sort: SortSpec, id_column: Any, cursor: str | None
+) -> Any:
+    """
+    Order a statement by (sort column, id) and, when a cursor is given, seek
+    past the row it points to instead of using OFFSET.
+
+    Postgres sorts NULLs last ascending and first descending, so nullable
+    sort columns get an explicit NULL branch.
+    """
+    column = sort.column
+    if sort.descending:
+        statement = statement.order_by(column.desc(), id_column.desc())
+    else:
+        statement = statement.order_by(column.asc(), id_column.asc())
+    if cursor is None:
+        return statement
+
+    value, last_id = decode_cursor(cursor, sort=sort)
+    nullable = bool(column.expression.nullable)
+    seek = tuple_(
+        literal(value, type_=column.expression.type),
+        literal(last_id, type_=id_column.expression.type),
+    )
+    if sort.descending:
+        if value is None:
+            condition = or_(
+                and_(column.is_(None), id_column < last_id),
+                column.is_not(None),
+            )
+        else:
+            condition = tuple_(column, id_column) < seek
+    else:
+        if value is None:
+            condition = and_(column.is_(None), id_column > last_id)
+        else:
+            condition = tuple_(column, id_column) > seek
+            if nullable:
+                condition = or_(condition, column.is_(None))
+    return statement.where(condition)
+
+
+def next_cursor(items: Sequence[T], *, sort: SortSpec, limit: int) -> str | None:
+    """Return the cursor for the page after ``items``, or None on the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    if isinstance(last, Mapping):
+        return encode_cursor(sort=sort, value=last[sort.key], row_id=last["id"])
+    return encode_cursor(
+        sort=sort,
+        value=getattr(last, sort.key),
+        row_id=last.id,  # type: ignore[attr-defined]
+    )
+
+
+def count_rows(session: Session, statement: Any) -> int:
+    """Run an exact COUNT(*) over the filters of a SELECT statement."""
+    count_statement = statement.with_only_columns(
+        func.count(), maintain_column_froms=True
+    ).order_by(None)
+    return int(session.exec(count_statement).one())
+
+
+def estimate_rows(session: Session, statement: Any) -> int:
+    """Return the planner's row estimate for a SELECT statement without running it."""
+    bind = session.get_bind()
+    compiled = statement.compile(dialect=bind.dialect)
+    plan: Any = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar_one()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def resolve_count_mode(*, include_count: bool, count_mode: CountMode) -> CountMode:
+    """Combine the include_count switch with the requested count mode."""
+    return count_mode if include_count else "none"
+
+
+def fetch_page(
+    session: Session,
+    statement: Any,
+    *,
+    sort: SortSpec,
+    id_column: Any,
+    skip: int,
+    limit: int,
+    cursor: str | None,
+    count_mode: CountMode = "exact",
+    estimable: bool = True,
+    columns: Sequence[Any] | None = None,
+) -> tuple[list[Any], int | None, bool]:
+    """
+    Fetch one page of a filtered SELECT plus its total according to count_mode.
+
+    Returns (items, count, count_is_estimate). count is None for "none".
+    Filtered listings (estimable=False) and cursor pages fall back to an
+    exact count where the requested mode cannot give a correct total.
+    With ``columns``, only those columns (plus the id and sort columns the
+    cursor needs) are selected and items are plain dicts keyed by column key
+    instead of ORM instances.
+    """
+    page_statement = apply_keyset(
+        statement, sort=sort, id_column=id_column, cursor=cursor
+    )
+    if cursor is None:
+        page_statement = page_statement.offset(skip)
+    page_statement = page_statement.limit(limit)
+    if columns is not None:
+        keys = [column.key for column in columns]
+        columns = [
+            *columns,
+            *(c for c in (id_column, sort.column) if c.key not in keys),
+        ]
+        keys = [column.key for column in columns]
+        page_statement = page_statement.with_only_columns(
+            *columns, maintain_column_froms=True
+        )
+
+    if count_mode == "window" and cursor is None:
+        rows = session.execute(page_statement.add_columns(func.count().over())).all()
+        if columns is None:
+            items = [row[0] for row in rows]
+        else:
+            items = [dict(zip(keys, row, strict=False)) for row in rows]
+        if rows:
+            return items, int(rows[0][-1]), False
+        # An empty page past the end carries no window total
+        count = count_rows(session, statement) if skip else 0
+        return items, count, False
+
+    if columns is None:
+        items = list(session.exec(page_statement).all())
+    else:
+        items = [
+            dict(zip(keys, row, strict=True)) for row in session.execute(page_statement)
+        ]
+    if count_mode == "none":
+        return items, None, False
+    if count_mode == "estimated" and estimable:
+        estimate = estimate_rows(session, statement)
+        if estimate >= ESTIMATE_EXACT_THRESHOLD:
+            return items, estimate, True
+    return items, count_rows(session, statement), False
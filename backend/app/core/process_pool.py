@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.core import metrics
+
+T = TypeVar("T")
+
+# How often run_async retries for a free slot while the pool is full
+SLOT_POLL_SECONDS = 0.01
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when a task waited too long for a free slot in a BoundedProcessPool."""
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> tuple[float, float, T]:
+    # time.monotonic is system wide, so the parent can compare started_at
+    started_at = time.monotonic()
+    result = fn(*args)
+    return started_at, time.monotonic() - started_at, result
+
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU heavy calls that admits at most ``max_pending`` tasks.
+
+    Callers beyond that wait up to ``queue_timeout`` seconds for a slot and
+    then get PoolBusyError, so a burst cannot queue unbounded work. Queue
+    time (submit to start in a worker), run time and rejections go to the
+    process_pool_* metrics, labelled ``name``. Worker processes are spawned
+    on first use.
+    """
+
+    def __init__(
+        self, *, name: str, max_workers: int, max_pending: int, queue_timeout: float
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Tasks admitted and not finished yet, queued or running"""
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs threads is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _rejected(self) -> PoolBusyError:
+        metrics.PROCESS_POOL_REJECTED.labels(self.name).inc()
+        return PoolBusyError(f"{self.max_pending} tasks already pending")
+
+    def _submit(
+        self, fn: Callable[..., T], *args: Any
+    ) -> tuple[ProcessPoolExecutor, Future[tuple[float, float, T]]]:
+        # Call with a slot held; _release gives it back
+        with self._lock:
+            self._pending += 1
+        executor = self._get_executor()
+        return executor, executor.submit(_timed, fn, *args)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # A worker died (e.g. out of memory); start fresh next time
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _observe(self, submitted_at: float, timed: tuple[float, float, T]) -> T:
+        started_at, run_seconds, result = timed
+        metrics.PROCESS_POOL_QUEUE_DURATION.labels(self.name).observe(
+            max(started_at - submitted_at, 0.0)
+        )
+        metrics.PROCESS_POOL_RUN_DURATION.labels(self.name).observe(run_seconds)
+        return result
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in a worker process and wait for its result."""
+        submitted_at = time.monotonic()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise self._rejected()
+        try:
+            executor, future = self._submit(fn, *args)
+            try:
+                timed = future.result()
+            except BrokenProcessPool:
+                self._discard(executor)
+                raise
+        finally:
+            self._release()
+        return self._observe(submitted_at, timed)
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Like run, for the event loop: waiting for a slot and for the result
+        suspends the calling task instead of holding a thread.
+        """
+        submitted_at = time.monotonic()
+        deadline = submitted_at + self.queue_timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                raise self._rejected()
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+        try:
+            executor, future = self._submit(fn, *args)
+            try:
+                timed = await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                self._discard(executor)
+                raise
+        finally:
+            self._release()
+        return self._observe(submitted_at, timed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
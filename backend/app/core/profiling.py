@@ -0,0 +1,354 @@
+"""
+On-demand profiling of a single request, for admins.
+
+An admin adds ``X-Profile: 1`` (or ``?profile=1``) to a request. While it
+runs, a sampling thread records where the request spends its time: on the
+event loop, in threadpool workers running its sync code, or waiting on an
+await. Its SQL statements are timed as well. Once the request finishes the
+profile is written to PROFILE_DIR, and the response's X-Profile-Id header
+names it for GET /utils/profiles/{id}.
+
+Stacks are in the collapsed format ("root;caller;callee count") that
+flamegraph.pl and speedscope read. Statements carry parameter shapes, never
+values.
+
+It is off unless PROFILING_ENABLED is set. Guards that make it safe to
+enable in production: only tokens with the admin role claim are profiled
+(other requests ignore the flag), one request per worker is profiled at a
+time, sampling stops after PROFILE_MAX_SECONDS, and only the last
+PROFILE_KEEP profiles are kept.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import Context, ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+import anyio
+import jwt
+from jwt.exceptions import InvalidTokenError
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import ALGORITHM
+from app.models import ProfileQuery, RequestProfilePublic
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# A threadpool worker runs each call in a copy of the caller's context,
+# held as a local by one of the frames at the bottom of its stack
+_WORKER_CONTEXT_DEPTH = 8
+# Stack entry for time spent awaiting with no thread running request code
+_AWAIT = "[await]"
+# Stack entry above code the async engine runs in a greenlet, whose frames do
+# not lead back to the request's
+_GREENLET = "[greenlet]"
+
+# Directories left off frame file names: the project, stdlib and packages
+_PATH_PREFIXES = sorted(
+    {str(Path(__file__).parents[2]), *sysconfig.get_paths().values()},
+    key=len,
+    reverse=True,
+)
+_frame_names: dict[CodeType, str] = {}
+
+
+def _frame_name(code: CodeType) -> str:
+    name = _frame_names.get(code)
+    if name is None:
+        path = code.co_filename
+        for prefix in _PATH_PREFIXES:
+            if path.startswith(prefix + os.sep):
+                path = path[len(prefix) + 1 :]
+                break
+        # co_qualname is new in Python 3.11
+        qualname = getattr(code, "co_qualname", code.co_name)
+        name = f"{qualname} ({path}:{code.co_firstlineno})".replace(";", ",")
+        _frame_names[code] = name
+    return name
+
+
+class RequestProfile:
+    """Samples and SQL timeline of one request."""
+
+    def __init__(self, *, method: str, path: str, organization_id: str) -> None:
+        self.id = uuid.uuid4()
+        self.method = method
+        self.path = path
+        self.organization_id = organization_id
+        self.route: str | None = None
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self.queries: list[ProfileQuery] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_query(
+        self,
+        statement: str,
+        parameters: Any,
+        started_at: float,
+        duration: float,
+        *,
+        canceled: bool = False,
+    ) -> None:
+        """Record a statement; times are time.perf_counter() values"""
+        query = ProfileQuery(
+            start_ms=(started_at - self._start) * 1000,
+            duration_ms=duration * 1000,
+            thread=threading.current_thread().name,
+            statement=" ".join(statement.split()),
+            parameters=parameters,
+            canceled=canceled,
+        )
+        with self._lock:
+            self.queries.append(query)
+
+    def finish(self, *, route: str | None) -> None:
+        self.route = route
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_public(self) -> RequestProfilePublic:
+        with self._lock:
+            queries = sorted(self.queries, key=lambda q: q.start_ms)
+        return RequestProfilePublic(
+            id=self.id,
+            method=self.method,
+            path=self.path,
+            route=self.route,
+            organization_id=uuid.UUID(self.organization_id),
+            started_at=self.started_at,
+            duration_ms=self.duration_ms,
+            sample_interval_ms=settings.PROFILE_SAMPLE_INTERVAL_MS,
+            samples=self.samples,
+            stacks=[f"{stack} {n}" for stack, n in self.stacks.most_common()],
+            queries=queries,
+        )
+
+
+# Profile of the request being served. The object is shared, so queries run
+# in the threadpool (which copies the context) are recorded too.
+request_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "request_profile", default=None
+)
+
+# One profiled request per worker process
+_profiling = threading.Lock()
+
+
+def _awaited_stack(coro: Any, root: FrameType) -> list[str]:
+    """Where a suspended request is waiting, from its middleware frame down"""
+    names: list[str] = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        if frame is root or names:
+            names.append(_frame_name(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return names
+
+
+def _running_stack(frame: FrameType | None, root: FrameType) -> tuple[list[str], bool]:
+    """Stack of a running thread, root first, and whether ``root`` is in it"""
+    names: list[str] = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        if frame is root:
+            break
+        frame = frame.f_back
+    names.reverse()
+    return names, frame is not None
+
+
+def _worker_stack(frame: FrameType | None, profile: RequestProfile) -> list[str] | None:
+    """Stack of a threadpool worker running the profiled request's code"""
+    frames: list[FrameType] = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    # Innermost frame first; look for the context from the thread's entry up
+    for depth in range(len(frames) - 1, -1, -1)[:_WORKER_CONTEXT_DEPTH]:
+        contexts = [
+            value
+            for value in frames[depth].f_locals.values()
+            if isinstance(value, Context)
+        ]
+        if contexts:
+            if not any(c.get(request_profile) is profile for c in contexts):
+                return None
+            return [_frame_name(f.f_code) for f in reversed(frames[:depth])]
+    return None
+
+
+class _Sampler(threading.Thread):
+    def __init__(
+        self,
+        profile: RequestProfile,
+        *,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread: int,
+        task: "asyncio.Task[Any]",
+        root: FrameType,
+    ) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.profile = profile
+        self.loop = loop
+        self.loop_thread = loop_thread
+        self.task = task
+        self.root = root
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        deadline = time.monotonic() + settings.PROFILE_MAX_SECONDS
+        while not self.stopped.wait(interval) and time.monotonic() < deadline:
+            self.sample()
+
+    def sample(self) -> None:
+        me = threading.get_ident()
+        stacks: list[list[str]] = []
+        awaited: list[str] | None = None
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            if thread_id == self.loop_thread:
+                running, from_root = _running_stack(frame, self.root)
+                if from_root:
+                    stacks.append(running)
+                elif asyncio.current_task(self.loop) is self.task:
+                    root = _frame_name(self.root.f_code)
+                    stacks.append([root, _GREENLET, *running])
+                continue
+            worker = _worker_stack(frame, self.profile)
+            if worker is not None:
+                if awaited is None:
+                    awaited = _awaited_stack(self.task.get_coro(), self.root)
+                stacks.append(awaited + worker)
+        if not stacks:
+            stacks.append(_awaited_stack(self.task.get_coro(), self.root) + [_AWAIT])
+        self.profile.samples += 1
+        for stack in stacks:
+            self.profile.stacks[";".join(stack)] += 1
+
+
+def _profile_path(profile_id: uuid.UUID) -> Path:
+    return Path(settings.PROFILE_DIR) / f"{profile_id}.json"
+
+
+def save_profile(profile: RequestProfile) -> None:
+    """Write a finished profile, keeping only the newest PROFILE_KEEP"""
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    _profile_path(profile.id).write_text(profile.to_public().model_dump_json())
+    saved = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in saved[: -settings.PROFILE_KEEP]:
+        old.unlink(missing_ok=True)
+
+
+def load_profile(profile_id: uuid.UUID) -> RequestProfilePublic | None:
+    try:
+        content = _profile_path(profile_id).read_text()
+    except FileNotFoundError:
+        return None
+    return RequestProfilePublic.model_validate_json(content)
+
+
+def _admin_organization(headers: Headers) -> str | None:
+    """Organization of an admin bearer token, None for anyone else"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    except InvalidTokenError:
+        return None
+    if payload.get("role") != "admin":
+        return None
+    organization_id = payload.get("organization_id")
+    return str(organization_id) if organization_id else None
+
+
+def _wants_profile(scope: Scope) -> bool:
+    flag = Headers(scope=scope).get(PROFILE_HEADER) or QueryParams(
+        scope.get("query_string", b"")
+    ).get("profile")
+    return flag in ("1", "true")
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that ask for it, see the module docstring. The token
+    is only checked for its admin claim here; the request is authenticated
+    as usual, and no profile is kept if that fails.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        organization_id = _admin_organization(Headers(scope=scope))
+        if organization_id is None or not _profiling.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send, organization_id)
+        finally:
+            _profiling.release()
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, organization_id: str
+    ) -> None:
+        profile = RequestProfile(
+            method=scope["method"], path=scope["path"], organization_id=organization_id
+        )
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = str(profile.id)
+            await send(message)
+
+        task = asyncio.current_task()
+        assert task is not None
+        sampler = _Sampler(
+            profile,
+            loop=asyncio.get_running_loop(),
+            loop_thread=threading.get_ident(),
+            task=task,
+            root=sys._getframe(),
+        )
+        token = request_profile.set(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stopped.set()
+            request_profile.reset(token)
+            await anyio.to_thread.run_sync(sampler.join)
+            profile.finish(route=getattr(scope.get("route"), "path", None))
+            if status in (401, 403):
+                logger.info("Discarding profile of unauthorized request")
+            else:
+                await anyio.to_thread.run_sync(save_profile, profile)
@@ -0,0 +1,113 @@
+import logging
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+class QueryCounter:
+    """Counts queries, and how often each distinct statement ran."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.statements: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, statement: str) -> None:
+        with self._lock:
+            self.count += 1
+            self.statements[statement] += 1
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        with self._lock:
+            top = self.statements.most_common(1)
+        return top[0] if top else None
+
+
+# Counter of the request being served. The object is shared, so queries
+# run in the threadpool (which copies the context) count towards it.
+request_query_counter: ContextVar[QueryCounter | None] = ContextVar(
+    "request_query_counter", default=None
+)
+# Counters that see every query in the process, see count_queries
+_process_counters: list[QueryCounter] = []
+
+
+def record_query(statement: str) -> None:
+    """Called by the engine for every statement it executes"""
+    counter = request_query_counter.get()
+    if counter is not None:
+        counter.add(statement)
+    for counter in _process_counters:
+        counter.add(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count every query the process runs inside the block, whichever thread or
+    request runs it. Meant for tests and scripts.
+    """
+    counter = QueryCounter()
+    _process_counters.append(counter)
+    try:
+        yield counter
+    finally:
+        _process_counters.remove(counter)
+
+
+class QueryCountMiddleware:
+    """
+    Count each request's queries and report them in the X-Query-Count
+    response header. Queries run after the headers are sent (streamed
+    bodies, background tasks) are not included.
+
+    When one statement runs ``repeat_threshold`` times or more in a request,
+    which usually means a query in a loop (N+1), a warning is logged.
+    """
+
+    def __init__(self, app: ASGIApp, *, repeat_threshold: int | None = None) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter()
+        token = request_query_counter.set(counter)
+
+        async def send_with_count(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(counter.count)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            request_query_counter.reset(token)
+            self._check_repeats(scope, counter)
+
+    def _check_repeats(self, scope: Scope, counter: QueryCounter) -> None:
+        if self.repeat_threshold is None:
+            return
+        top = counter.most_repeated()
+        if top is not None and top[1] >= self.repeat_threshold:
+            statement, times = top
+            logger.warning(
+                "Possible N+1: statement ran %d times in %s %s: %s",
+                times,
+                scope["method"],
+                scope["path"],
+                " ".join(statement.split()),
+            )
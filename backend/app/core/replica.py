@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import Engine, text
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed
+# everything it received, so an idle primary does not read as lag
+_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine read-only requests use.
+
+    Reads go to the replica unless the user committed a write in the last
+    ``read_your_writes`` seconds (``mark_write``), or the replica lags more
+    than ``max_lag`` seconds or cannot be reached. Lag is measured at most
+    every ``lag_check_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: Engine,
+        replica: Engine,
+        max_lag: float,
+        read_your_writes: float,
+        lag_check_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self._clock = clock
+        self._recent_writers: TTLCache[uuid.UUID, bool] = TTLCache(
+            maxsize=100_000, ttl=read_your_writes, clock=clock
+        )
+        self._lock = threading.Lock()
+        self._lag: float | None = None
+        self._lag_checked_at: float | None = None
+
+    def mark_write(self, user_id: uuid.UUID) -> None:
+        self._recent_writers.set(user_id, True)
+
+    def measure_lag(self) -> float | None:
+        """Replica lag in seconds, or None if the replica is unreachable"""
+        try:
+            with self.replica.connect() as conn:
+                return float(conn.execute(_LAG_SQL).scalar_one())
+        except Exception:
+            logger.warning("Replica lag check failed", exc_info=True)
+            return None
+
+    def lag_check_due(self) -> bool:
+        checked_at = self._lag_checked_at
+        return (
+            checked_at is None or self._clock() - checked_at >= self.lag_check_interval
+        )
+
+    def check_lag(self) -> None:
+        """Measure lag unless another thread just did; may block on the replica"""
+        with self._lock:
+            if not self.lag_check_due():
+                return
+            # Other threads keep the last reading meanwhile
+            self._lag_checked_at = self._clock()
+        self._lag = self.measure_lag()
+
+    def use_replica(self, user_id: uuid.UUID | None, *, check_lag: bool = True) -> bool:
+        """
+        Whether this user's reads can go to the replica. With check_lag=False
+        the last lag reading is used as is, for callers that cannot block.
+        """
+        if user_id is not None and self._recent_writers.get(user_id):
+            return False
+        if check_lag and self.lag_check_due():
+            self.check_lag()
+        lag = self._lag
+        return lag is not None and lag <= self.max_lag
+
+    def engine_for(self, user_id: uuid.UUID | None) -> Engine:
+        return self.replica if self.use_replica(user_id) else self.primary
@@ -0,0 +1,24 @@
+"""
+Per-request state set by the API dependencies and read by the database and
+tracing hooks. Kept free of app imports so any module can use it.
+"""
+
+import uuid
+from contextvars import ContextVar
+
+# Authenticated user of the current request. When a session commits a
+# write for them, they read from the primary for a while; other workers
+# learn about it through NOTIFY on RECENT_WRITES_CHANNEL.
+request_user_id: ContextVar[uuid.UUID | None] = ContextVar(
+    "request_user_id", default=None
+)
+
+# Route and organization of the current request, for the slow query log,
+# and the statement timeout its transactions run with (None outside the API)
+request_route: ContextVar[str | None] = ContextVar("request_route", default=None)
+request_organization_id: ContextVar[uuid.UUID | None] = ContextVar(
+    "request_organization_id", default=None
+)
+request_statement_timeout: ContextVar[int | None] = ContextVar(
+    "request_statement_timeout", default=None
+)
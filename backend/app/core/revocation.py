@@ -0,0 +1,80 @@
+import threading
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta, timezone
+
+
+class RevocationList:
+    """
+    Per-worker copy of recent access token revocations.
+
+    Maps user IDs to the instant before which their tokens are invalid. The
+    copy is replaced with revocations loaded from the database since
+    ``window_start()`` at most every ``refresh_interval`` seconds;
+    revocations made by this worker apply immediately. Entries older than ``window`` (the token lifetime) are
+    dropped, since every token they could reject has expired anyway.
+    """
+
+    def __init__(
+        self,
+        *,
+        refresh_interval: float,
+        window: timedelta,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.refresh_interval = refresh_interval
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._revoked: dict[uuid.UUID, datetime] = {}
+        self._loaded_at: float | None = None
+
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or self._clock() - self._loaded_at >= self.refresh_interval
+        )
+
+    def window_start(self) -> datetime:
+        """Oldest revocation that can still reject an unexpired token."""
+        return datetime.now(timezone.utc) - self.window
+
+    def refresh(
+        self, revocations: Mapping[uuid.UUID, datetime], *, since: datetime
+    ) -> None:
+        """Replace with revocations loaded since ``since``, keeping local ones."""
+        loaded = dict(revocations)
+        with self._lock:
+            # A local revocation may not be committed or visible to load yet
+            for user_id, revoked_at in self._revoked.items():
+                if user_id not in loaded or revoked_at > loaded[user_id]:
+                    loaded[user_id] = revoked_at
+            self._revoked = {
+                user_id: revoked_at
+                for user_id, revoked_at in loaded.items()
+                if revoked_at >= since
+            }
+            self._loaded_at = self._clock()
+
+    def revoke(self, user_id: uuid.UUID, revoked_at: datetime) -> None:
+        with self._lock:
+            current = self._revoked.get(user_id)
+            if current is None or revoked_at > current:
+                self._revoked[user_id] = revoked_at
+
+    def is_revoked(self, user_id: uuid.UUID, issued_at: float | None) -> bool:
+        """Whether a token issued at ``issued_at`` (Unix time) was revoked."""
+        revoked_at = self._revoked.get(user_id)
+        if revoked_at is None:
+            return False
+        # Tokens without iat predate revocation support; reject them
+        return issued_at is None or issued_at < revoked_at.timestamp()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._loaded_at = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
@@ -0,0 +1,53 @@
+from typing import Any
+
+from sqlalchemy import or_
+
+# pg_trgm GIN indexes can only serve patterns containing at least one full
+# trigram; shorter terms fall back to exact matches on unique keys.
+SEARCH_MIN_LENGTH = 3
+
+# Upper bound for typeahead result sets
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+# Typeahead ranks at most this many substring matches (plus exact key hits),
+# so broad terms never sort a whole catalog
+SEARCH_CANDIDATE_LIMIT = 200
+
+# Text search configuration created in migration 010: spanish stemming over
+# unaccented words, so "cafe" matches "Café molido"
+SEARCH_TEXT_CONFIG = "spanish_unaccent"
+
+# ts_rank_cd normalization flag 32 scales ranks into 0..1 as rank / (rank + 1)
+RANK_NORMALIZATION = 32
+
+
+def normalize_term(term: str | None) -> str:
+    """Trim and collapse whitespace in a user supplied search term."""
+    if not term:
+        return ""
+    return " ".join(term.split())
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def clamp_limit(limit: int) -> int:
+    """Keep a typeahead limit within 1..SEARCH_MAX_LIMIT."""
+    return max(1, min(limit, SEARCH_MAX_LIMIT))
+
+
+def search_condition(term: str, *, columns: list[Any], exact_columns: list[Any]) -> Any:
+    """
+    Build the WHERE clause for a search term.
+
+    Terms of SEARCH_MIN_LENGTH or more are matched as case-insensitive
+    substrings of ``columns`` (served by trigram indexes); shorter terms only
+    match ``exact_columns`` by equality so they never trigger a full scan.
+    """
+    if len(term) >= SEARCH_MIN_LENGTH:
+        pattern = f"%{escape_like(term)}%"
+        return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+    return or_(*(column == term for column in exact_columns))
@@ -1,20 +1,42 @@
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import anyio
 import jwt
 from pwdlib import PasswordHash
 from pwdlib.hashers.argon2 import Argon2Hasher
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from app.core import metrics
 from app.core.config import settings
+from app.core.process_pool import BoundedProcessPool
 
 password_hash = PasswordHash(
     (
-        Argon2Hasher(),
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
         BcryptHasher(),
     )
 )
 
+# Argon2 runs here instead of in request threads, so a login burst cannot
+# starve the rest of the API. Each hash runs ARGON2_PARALLELISM lanes, so the
+# pool can keep up to PASSWORD_HASH_WORKERS * ARGON2_PARALLELISM cores busy.
+# Routes await it with the *_async functions below, which hold no thread
+hash_pool: BoundedProcessPool | None = (
+    BoundedProcessPool(
+        name="password_hash",
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+        queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+    )
+    if settings.PASSWORD_HASH_WORKERS > 0
+    else None
+)
+
 
 ALGORITHM = "HS256"
 
@@ -27,9 +49,13 @@ def create_access_token(
 ) -> str:
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    expire = datetime.now(timezone.utc) + expires_delta
+    now = datetime.now(timezone.utc)
+    expire = now + expires_delta
     to_encode = {
         "exp": expire,
+        # Sub-second precision so a token issued right after a revocation
+        # is not mistaken for one issued before it
+        "iat": now.timestamp(),
         "sub": str(subject),
         "organization_id": str(organization_id),
         "role": role,
@@ -38,11 +64,49 @@ def create_access_token(
     return encoded_jwt
 
 
-def verify_password(
+def _verify_and_update(
     plain_password: str, hashed_password: str
 ) -> tuple[bool, str | None]:
     return password_hash.verify_and_update(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return password_hash.hash(password)
+
+
+def verify_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    with metrics.PASSWORD_HASH_DURATION.labels("verify").time():
+        if hash_pool is None:
+            return _verify_and_update(plain_password, hashed_password)
+        return hash_pool.run(_verify_and_update, plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    with metrics.PASSWORD_HASH_DURATION.labels("hash").time():
+        if hash_pool is None:
+            return _hash(password)
+        return hash_pool.run(_hash, password)
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """verify_password for async routes; the caller's thread is not held"""
+    with metrics.PASSWORD_HASH_DURATION.labels("verify").time():
+        if hash_pool is None:
+            return await anyio.to_thread.run_sync(
+                _verify_and_update, plain_password, hashed_password
+            )
+        return await hash_pool.run_async(
+            _verify_and_update, plain_password, hashed_password
+        )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async routes; the caller's thread is not held"""
+    with metrics.PASSWORD_HASH_DURATION.labels("hash").time():
+        if hash_pool is None:
+            return await anyio.to_thread.run_sync(_hash, password)
+        return await hash_pool.run_async(_hash, password)
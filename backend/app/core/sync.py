@@ -0,0 +1,82 @@
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# The change feed only hands out rows stamped before every write transaction
+# still open began, so one that commits later cannot be skipped by a token
+# issued in the meantime. updated_at is stamped by the app, while transaction
+# start times come from Postgres's clock, so the feed holds back this much
+# more. It covers clock skew between the app and database hosts, and the gap
+# between stamping a row and the first write of its transaction. Before that
+# first write, Postgres does not count the transaction as a writer. A larger
+# skew or gap can still let a row be skipped.
+# pg_stat_activity shows other sessions' transactions only to the same role
+# (or pg_read_all_stats), so all workers must connect as one role.
+SYNC_COMMIT_GRACE = timedelta(seconds=1)
+
+# Upper bound on rows per entity in one change feed response
+SYNC_MAX_LIMIT = 1000
+
+
+class InvalidChangeTokenError(ValueError):
+    """Raised when a change token cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class SyncPosition:
+    """Last (updated_at, id) delivered for one entity; None means the beginning."""
+
+    updated_at: datetime | None = None
+    row_id: uuid.UUID | None = None
+
+
+@dataclass(frozen=True)
+class ChangeToken:
+    """Per-entity positions in the change feed, opaque to clients."""
+
+    products: SyncPosition = SyncPosition()
+    categories: SyncPosition = SyncPosition()
+
+
+def _encode_position(position: SyncPosition) -> list[str] | None:
+    if position.updated_at is None or position.row_id is None:
+        return None
+    return [position.updated_at.isoformat(), str(position.row_id)]
+
+
+def _decode_position(value: object) -> SyncPosition:
+    if value is None:
+        return SyncPosition()
+    if not isinstance(value, list) or len(value) != 2:
+        raise InvalidChangeTokenError("Invalid change token")
+    return SyncPosition(
+        updated_at=datetime.fromisoformat(value[0]), row_id=uuid.UUID(value[1])
+    )
+
+
+def encode_change_token(token: ChangeToken) -> str:
+    payload = {
+        "p": _encode_position(token.products),
+        "c": _encode_position(token.categories),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_change_token(token: str | None) -> ChangeToken:
+    """Decode a change token; an empty token starts from the beginning."""
+    if not token:
+        return ChangeToken()
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return ChangeToken(
+            products=_decode_position(payload["p"]),
+            categories=_decode_position(payload["c"]),
+        )
+    except InvalidChangeTokenError:
+        raise
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidChangeTokenError("Invalid change token") from exc
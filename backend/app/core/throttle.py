@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Protocol
+
+from sqlalchemy import Engine, text
+
+
+class ThrottledError(Exception):
+    """Raised when a request must wait ``retry_after`` seconds before retrying."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucketStore(Protocol):
+    def take(self, key: str, *, capacity: float, per_second: float) -> float:
+        """
+        Take one token from the bucket at ``key``.
+
+        Returns 0 when a token was available, otherwise the seconds until
+        one will be. Buckets start full and refill at ``per_second``.
+        """
+        ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryTokenBucketStore:
+    """Per-worker token buckets; the least recently used beyond maxsize are dropped."""
+
+    def __init__(
+        self, *, maxsize: int = 100_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.maxsize = maxsize
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, *, capacity: float, per_second: float) -> float:
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / per_second
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# Refilled token count of an existing bucket; SET expressions all see the
+# old row, so it can be repeated. now() is fixed for the statement.
+_REFILLED = (
+    "LEAST(:capacity, b.tokens"
+    " + EXTRACT(EPOCH FROM now() - b.updated_at) * :per_second)"
+)
+
+# One statement per take so concurrent workers cannot both spend the last token
+_TAKE_SQL = text(
+    f"""
+    INSERT INTO login_throttle_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (:key, :capacity - 1, true, now())
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE WHEN {_REFILLED} >= 1
+            THEN {_REFILLED} - 1 ELSE {_REFILLED} END,
+        allowed = {_REFILLED} >= 1,
+        updated_at = now()
+    RETURNING tokens, allowed
+    """
+)
+
+
+class PostgresTokenBucketStore:
+    """Token buckets in an unlogged table, shared by every worker and host."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+    def take(self, key: str, *, capacity: float, per_second: float) -> float:
+        with self.engine.begin() as conn:
+            tokens, allowed = conn.execute(
+                _TAKE_SQL,
+                {"key": key, "capacity": capacity, "per_second": per_second},
+            ).one()
+        return 0.0 if allowed else (1 - tokens) / per_second
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text("TRUNCATE login_throttle_buckets"))
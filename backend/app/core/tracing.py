@@ -0,0 +1,209 @@
+"""
+OpenTelemetry tracing of requests, crud operations and SQL statements.
+
+With TRACING_ENABLED every sampled request gets a server span. The crud
+operations decorated with @traced and each SQL statement run on its behalf
+become child spans, and all of them carry the request's organization id.
+Work outside a sampled request (startup, listeners, scripts) is not traced,
+so the hooks cost one context lookup when tracing is off.
+
+TRACING_SAMPLE_RATIO is the share of traces kept. A request that arrives
+with a W3C traceparent header follows the caller's sampling decision, so
+a trace can cross services. Spans go to an OTLP/HTTP collector
+(TRACING_OTLP_ENDPOINT) or, for local use, to TRACING_FILE as JSON lines.
+"""
+
+import functools
+import re
+import threading
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+from opentelemetry import propagate, trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import Connection, ExceptionContext
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_context import request_organization_id
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+ORGANIZATION_ID = "organization.id"
+
+# Swapped for the SDK's once configure_tracing() installs a provider
+tracer = trace.get_tracer(__name__)
+
+# Statement text kept on a span; long IN lists add nothing past this
+_MAX_STATEMENT_LENGTH = 2048
+_STATEMENT_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)')
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line"""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        # One write per batch, so workers appending to one file do not
+        # interleave their lines
+        with self._lock, self.path.open("a") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+def configure_tracing() -> None:
+    """Install the SDK with the configured sampler and exporter"""
+    exporter: SpanExporter
+    if settings.TRACING_EXPORTER == "file":
+        exporter = JsonLinesSpanExporter(settings.TRACING_FILE)
+    else:
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def shutdown_tracing() -> None:
+    """Export the spans still queued"""
+    provider = trace.get_tracer_provider()
+    if isinstance(provider, TracerProvider):
+        provider.shutdown()
+
+
+def _organization_attributes() -> dict[str, str]:
+    organization_id = request_organization_id.get()
+    return {ORGANIZATION_ID: str(organization_id)} if organization_id else {}
+
+
+def tag_organization(organization_id: Any) -> None:
+    """Tag the request's span once authentication has found its organization"""
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attribute(ORGANIZATION_ID, str(organization_id))
+
+
+def traced(fn: Callable[P, R]) -> Callable[P, R]:
+    """
+    Record calls to ``fn`` as "<module>.<name>" spans, e.g. crud.create_sale,
+    when they run inside a traced request.
+    """
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__.lstrip('_')}"
+
+    @functools.wraps(fn)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if not trace.get_current_span().is_recording():
+            return fn(*args, **kwargs)
+        with tracer.start_as_current_span(name, attributes=_organization_attributes()):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=1024)
+def _statement_name(statement: str) -> tuple[str, str, str | None]:
+    """Span name, operation and table of a statement, e.g. "SELECT products" """
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else "SQL"
+    match = _STATEMENT_TABLE.search(statement)
+    table = match.group(1) if match else None
+    return (f"{operation} {table}" if table else operation), operation, table
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_span(
+    conn: Connection, _cursor: Any, statement: str, *_args: Any
+) -> None:
+    if not trace.get_current_span().is_recording():
+        return
+    name, operation, table = _statement_name(statement)
+    attributes = {
+        "db.system.name": "postgresql",
+        "db.operation.name": operation,
+        "db.query.text": statement[:_MAX_STATEMENT_LENGTH],
+        **_organization_attributes(),
+    }
+    if table:
+        attributes["db.collection.name"] = table
+    conn.info["query_span"] = tracer.start_span(
+        name, kind=SpanKind.CLIENT, attributes=attributes
+    )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query_span(conn: Connection, *_args: Any) -> None:
+    span = conn.info.pop("query_span", None)
+    if span is not None:
+        span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_query_span(context: ExceptionContext) -> None:
+    conn = context.connection
+    span = conn.info.pop("query_span", None) if conn is not None else None
+    if span is None:
+        return
+    exc = context.original_exception
+    span.record_exception(exc)
+    span.set_status(Status(StatusCode.ERROR, type(exc).__name__))
+    span.end()
+
+
+class TracingMiddleware:
+    """
+    Open the request's server span, continuing the caller's trace when the
+    request carries a traceparent header. The span is named after the
+    route template once routing has matched one.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            method,
+            context=propagate.extract(Headers(scope=scope)),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
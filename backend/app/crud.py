@@ -1,16 +1,76 @@
+import json
+import logging
+import secrets
 import uuid
-from typing import Any
-
-from sqlalchemy import or_
-from sqlmodel import Session, select
-
-from app.core.security import get_password_hash, verify_password
+from collections.abc import Callable, Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, TypeVar
+
+import anyio
+from sqlalchemy import (
+    DateTime,
+    Uuid,
+    any_,
+    case,
+    event,
+    func,
+    literal,
+    or_,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TenantCache, TTLCache
+from app.core.config import settings
+from app.core.fast_json import public_columns
+from app.core.notifications import notify
+from app.core.pagination import (
+    CountMode,
+    SortSpec,
+    count_rows,
+    fetch_page,
+    resolve_sort,
+)
+from app.core.revocation import RevocationList
+from app.core.search import (
+    RANK_NORMALIZATION,
+    SEARCH_CANDIDATE_LIMIT,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_TEXT_CONFIG,
+    clamp_limit,
+    escape_like,
+    normalize_term,
+    search_condition,
+)
+from app.core.security import (
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+from app.core.sync import (
+    SYNC_COMMIT_GRACE,
+    SYNC_MAX_LIMIT,
+    ChangeToken,
+    SyncPosition,
+)
+from app.core.tracing import traced
 from app.models import (
+    CUSTOMER_FULL_NAME,
+    CUSTOMER_SEARCH_VECTOR,
+    PRODUCT_SEARCH_VECTOR,
     Category,
     CategoryCreate,
     CategoryUpdate,
     Customer,
     CustomerCreate,
+    CustomerPublic,
     CustomerUpdate,
     InventoryMovement,
     InventoryMovementCreate,
@@ -19,17 +79,51 @@ from app.models import (
     OrganizationUpdate,
     Product,
     ProductCreate,
+    ProductPublic,
     ProductUpdate,
     Role,
     Sale,
     SaleItem,
+    SaleItemPublic,
+    SalePublic,
     User,
+    UserAuthRecord,
     UserCreate,
     UserUpdate,
 )
 
 __all__ = ["Organization", "Role"]
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _run_sync(fn: Callable[..., T], **kwargs: Any) -> Callable[[OrmSession], T]:
+    """
+    Adapt a sync CRUD function for AsyncSession.run_sync, which runs it on
+    the event loop with the async driver. The async variants below reuse the
+    sync queries this way instead of duplicating them.
+    """
+
+    def call(session: OrmSession) -> T:
+        return fn(session=session, **kwargs)
+
+    return call
+
+
+def _save(session: Session, obj: Any, *, commit: bool) -> None:
+    """
+    Add ``obj`` to the session; with ``commit``, also commit and reload it.
+    Callers writing several rows pass commit=False and commit once, so the
+    rows land in one transaction without a reload after each.
+    """
+    session.add(obj)
+    if commit:
+        session.commit()
+        session.refresh(obj)
+
+
 # ============================================================================
 # ORGANIZATION CRUD
 # ============================================================================
@@ -79,11 +173,44 @@ def update_organization(
 # ============================================================================
 
 
+# Per-worker copy of the roles table, which only migrations change
+role_cache: TTLCache[int, Role] = TTLCache(
+    maxsize=256, ttl=settings.AUTH_ROLE_CACHE_TTL_SECONDS
+)
+
+
 def get_role_by_id(*, session: Session, role_id: int) -> Role | None:
     """Get role by ID"""
     return session.get(Role, role_id)
 
 
+def get_cached_role(*, session: Session, role_id: int) -> Role | None:
+    """Get role by ID from the per-worker cache, detached from any session"""
+    role = role_cache.get(role_id)
+    if role is None:
+        db_role = session.get(Role, role_id)
+        if db_role is None:
+            return None
+        # Copy columns only, so the cached role never links to session objects
+        role = Role.model_validate(db_role.model_dump())
+        role_cache.set(role_id, role)
+    return role
+
+
+async def get_cached_role_async(*, session: AsyncSession, role_id: int) -> Role | None:
+    """Async get_cached_role; cache hits never touch the database"""
+    role = role_cache.get(role_id)
+    if role is not None:
+        return role
+    return await session.run_sync(_run_sync(get_cached_role, role_id=role_id))
+
+
+def preload_roles(*, session: Session) -> None:
+    """Fill the role cache so requests never have to read roles"""
+    for role in get_roles(session=session):
+        role_cache.set(role.id, Role.model_validate(role.model_dump()))
+
+
 def get_role_by_name(*, session: Session, name: str) -> Role | None:
     """Get role by name"""
     statement = select(Role).where(Role.name == name)
@@ -102,13 +229,22 @@ def get_roles(*, session: Session) -> list[Role]:
 
 
 def create_user(
-    *, session: Session, user_create: UserCreate, organization_id: uuid.UUID
+    *,
+    session: Session,
+    user_create: UserCreate,
+    organization_id: uuid.UUID,
+    hashed_password: str | None = None,
 ) -> User:
-    """Create a new user within an organization"""
+    """
+    Create a new user within an organization. Async routes pass
+    ``hashed_password`` from get_password_hash_async so no hashing runs here.
+    """
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_create.password)
     db_obj = User.model_validate(
         user_create,
         update={
-            "hashed_password": get_password_hash(user_create.password),
+            "hashed_password": hashed_password,
             "organization_id": organization_id,
         },
     )
@@ -118,22 +254,138 @@ def create_user(
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
-    """Update a user"""
+# Per-worker copy of users.tokens_revoked_at, checked by stateless auth
+token_revocations = RevocationList(
+    refresh_interval=settings.AUTH_REVOCATION_REFRESH_SECONDS,
+    window=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+)
+
+
+# Per-worker cache of active users' auth records, kept coherent across
+# workers by notifying USER_AUTH_CHANNEL on every write
+USER_AUTH_CHANNEL = "user_auth_changed"
+user_auth_cache: TTLCache[uuid.UUID, UserAuthRecord] = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+def get_user_auth_record(
+    *, session: Session, user_id: uuid.UUID
+) -> UserAuthRecord | None:
+    """
+    Get the auth record of a user that is not soft deleted.
+
+    Only active users are cached; inactive ones are read every time so the
+    caller can reject them.
+    """
+    record = user_auth_cache.get(user_id)
+    if record is not None:
+        return record
+    statement = (
+        select(User).where(User.id == user_id).where(col(User.deleted_at).is_(None))
+    )
+    user = session.exec(statement).first()
+    if user is None:
+        return None
+    record = UserAuthRecord.model_validate(user)
+    if record.is_active:
+        user_auth_cache.set(user_id, record)
+    return record
+
+
+async def get_user_auth_record_async(
+    *, session: AsyncSession, user_id: uuid.UUID
+) -> UserAuthRecord | None:
+    """Async get_user_auth_record; cache hits never touch the database"""
+    record = user_auth_cache.get(user_id)
+    if record is not None:
+        return record
+    return await session.run_sync(_run_sync(get_user_auth_record, user_id=user_id))
+
+
+def invalidate_user_auth(*, session: Session, user_id: uuid.UUID) -> None:
+    """Drop a user's cached auth record here and, on commit, in other workers"""
+    user_auth_cache.pop(user_id)
+    notify(session, USER_AUTH_CHANNEL, str(user_id))
+
+
+def handle_user_auth_notification(payload: str) -> None:
+    """Apply a USER_AUTH_CHANNEL message sent by another worker"""
+    user_auth_cache.pop(uuid.UUID(payload))
+
+
+def revoke_user_tokens(*, user: User) -> None:
+    """Invalidate every access token issued to a user so far"""
+    revoked_at = datetime.now(timezone.utc)
+    user.tokens_revoked_at = revoked_at
+    token_revocations.revoke(user.id, revoked_at)
+
+
+def get_token_revocations(
+    *, session: Session, since: datetime
+) -> dict[uuid.UUID, datetime]:
+    """Get users whose tokens were revoked after since"""
+    statement = select(User.id, User.tokens_revoked_at).where(
+        col(User.tokens_revoked_at) > since
+    )
+    return {
+        user_id: revoked_at
+        for user_id, revoked_at in session.exec(statement).all()
+        if revoked_at is not None
+    }
+
+
+async def get_token_revocations_async(
+    *, session: AsyncSession, since: datetime
+) -> dict[uuid.UUID, datetime]:
+    """Async get_token_revocations"""
+    return await session.run_sync(_run_sync(get_token_revocations, since=since))
+
+
+def update_user(
+    *,
+    session: Session,
+    db_user: User,
+    user_in: UserUpdate,
+    hashed_password: str | None = None,
+) -> Any:
+    """
+    Update a user. ``hashed_password``, if given, is the hash of
+    ``user_in.password`` made by the caller.
+    """
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
         password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        if hashed_password is None:
+            hashed_password = get_password_hash(password)
         extra_data["hashed_password"] = hashed_password
         del user_data["password"]
+    # Claims in outstanding tokens no longer hold after these changes
+    if user_data.get("is_active") is False or user_data.get("role_id") not in (
+        None,
+        db_user.role_id,
+    ):
+        revoke_user_tokens(user=db_user)
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
+    invalidate_user_auth(session=session, user_id=db_user.id)
     session.commit()
     session.refresh(db_user)
     return db_user
 
 
+def soft_delete_user(*, session: Session, db_user: User) -> None:
+    """Soft delete a user and revoke their access tokens"""
+    db_user.deleted_at = datetime.now(timezone.utc)
+    db_user.is_active = False
+    revoke_user_tokens(user=db_user)
+    session.add(db_user)
+    invalidate_user_auth(session=session, user_id=db_user.id)
+    session.commit()
+
+
 def get_user_by_email(
     *, session: Session, email: str, organization_id: uuid.UUID | None = None
 ) -> User | None:
@@ -293,6 +545,7 @@ def soft_delete_category(*, session: Session, db_category: Category) -> Category
     from datetime import datetime, timezone
 
     db_category.deleted_at = datetime.now(timezone.utc)
+    db_category.updated_at = db_category.deleted_at
     db_category.is_active = False
     session.add(db_category)
     session.commit()
@@ -305,6 +558,61 @@ def soft_delete_category(*, session: Session, db_category: Category) -> Category
 # ============================================================================
 
 
+# Per-worker hot cache of scanner lookups: (kind, code) -> product snapshot.
+# Product writes queue their codes in the session; on commit they are dropped
+# here and announced once per organization on PRODUCT_LOOKUP_CHANNEL, so the
+# other workers drop them too.
+PRODUCT_LOOKUP_CHANNEL = "product_lookup_changed"
+product_lookup_cache: TenantCache[tuple[str, str], ProductPublic] = TenantCache(
+    maxsize=settings.PRODUCT_LOOKUP_CACHE_SIZE,
+    ttl=settings.PRODUCT_LOOKUP_CACHE_TTL_SECONDS,
+)
+_PENDING_LOOKUP_CODES = "product_lookup_codes"
+
+
+def _forget_product_lookups(session: Session, product: Product) -> None:
+    """Invalidate cached lookups of this product's codes when the session commits"""
+    pending: dict[uuid.UUID, set[str]] = session.info.setdefault(
+        _PENDING_LOOKUP_CODES, {}
+    )
+    pending.setdefault(product.organization_id, set()).update(
+        code for code in (product.barcode, product.sku) if code
+    )
+
+
+def _drop_product_lookups(organization_id: uuid.UUID, codes: Iterable[str]) -> None:
+    cache = product_lookup_cache.for_tenant(organization_id)
+    for code in codes:
+        for kind in ("barcode", "sku", "code"):
+            cache.pop((kind, code))
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _announce_product_lookups(session: Session) -> None:
+    for organization_id, codes in session.info.get(_PENDING_LOOKUP_CODES, {}).items():
+        if codes:
+            message = {"organization_id": str(organization_id), "codes": sorted(codes)}
+            notify(session, PRODUCT_LOOKUP_CHANNEL, json.dumps(message))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _drop_committed_product_lookups(session: Session) -> None:
+    # Also drops what this worker cached from the old rows before the commit
+    for organization_id, codes in session.info.pop(_PENDING_LOOKUP_CODES, {}).items():
+        _drop_product_lookups(organization_id, codes)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_product_lookups(session: Session) -> None:
+    session.info.pop(_PENDING_LOOKUP_CODES, None)
+
+
+def handle_product_lookup_notification(payload: str) -> None:
+    """Apply a PRODUCT_LOOKUP_CHANNEL message sent by another worker"""
+    message = json.loads(payload)
+    _drop_product_lookups(uuid.UUID(message["organization_id"]), message["codes"])
+
+
 def create_product(
     *, session: Session, product_create: ProductCreate, organization_id: uuid.UUID
 ) -> Product:
@@ -314,11 +622,13 @@ def create_product(
         update={"organization_id": organization_id},
     )
     session.add(db_obj)
+    _forget_product_lookups(session, db_obj)
     session.commit()
     session.refresh(db_obj)
     return db_obj
 
 
+@traced
 def get_product_by_id(
     *, session: Session, product_id: uuid.UUID, organization_id: uuid.UUID
 ) -> Product | None:
@@ -342,44 +652,204 @@ _PRODUCT_SORT_COLUMNS: dict[str, Any] = {
 }
 
 
-def get_products_by_organization(
+def get_products_by_ids(
     *,
     session: Session,
+    product_ids: list[uuid.UUID],
+    organization_id: uuid.UUID,
+) -> list[Product]:
+    """
+    Get many products by ID in one query, in the order the IDs were given.
+
+    Unknown, deleted or foreign IDs are left out.
+    """
+    if not product_ids:
+        return []
+    statement = (
+        select(Product)
+        .where(col(Product.id) == any_(literal(product_ids, ARRAY(Uuid()))))
+        .where(Product.organization_id == organization_id)
+        .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
+    )
+    by_id = {product.id: product for product in session.exec(statement)}
+    return [by_id[pid] for pid in dict.fromkeys(product_ids) if pid in by_id]
+
+
+def get_product_sort(*, sort_by: str | None, sort_order: str = "asc") -> SortSpec:
+    """Resolve the ordering used by product listings (defaults to created_at asc)"""
+    return resolve_sort(_PRODUCT_SORT_COLUMNS, sort_by=sort_by, sort_order=sort_order)
+
+
+def _product_search_condition(term: str) -> Any:
+    return search_condition(
+        term,
+        columns=[Product.name, Product.sku, Product.description],
+        exact_columns=[Product.sku],
+    )
+
+
+def _products_query(
+    *,
     organization_id: uuid.UUID,
-    skip: int = 0,
-    limit: int = 100,
     search: str | None = None,
-    sort_by: str | None = None,
-    sort_order: str = "asc",
     is_active: bool | None = None,
     category_id: uuid.UUID | None = None,
-) -> list[Product]:
-    """Get all products for an organization"""
+) -> Any:
+    """Build the filtered product SELECT shared by listing and counting"""
     statement = (
         select(Product)
         .where(Product.organization_id == organization_id)
         .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
     )
-    if search:
-        term = f"%{search}%"
-        statement = statement.where(
-            or_(
-                Product.name.ilike(term),  # type: ignore[attr-defined]
-                Product.sku.ilike(term),  # type: ignore[attr-defined]
-                Product.description.ilike(term),  # type: ignore[union-attr]
-            )
-        )
+    term = normalize_term(search)
+    if term:
+        statement = statement.where(_product_search_condition(term))
     if is_active is not None:
         statement = statement.where(Product.is_active == is_active)
     if category_id is not None:
         statement = statement.where(Product.category_id == category_id)
-    sort_col = _PRODUCT_SORT_COLUMNS.get(sort_by or "")
-    if sort_col is not None:
-        statement = statement.order_by(
-            sort_col.asc() if sort_order == "asc" else sort_col.desc()
-        )
-    statement = statement.offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    return statement
+
+
+def get_products_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    is_active: bool | None = None,
+    category_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> tuple[list[Product], int | None, bool]:
+    """
+    Get a page of products and its total, counted according to count_mode.
+
+    Returns (products, count, count_is_estimate).
+    """
+    return fetch_page(
+        session,
+        _products_query(
+            organization_id=organization_id,
+            search=search,
+            is_active=is_active,
+            category_id=category_id,
+        ),
+        sort=get_product_sort(sort_by=sort_by, sort_order=sort_order),
+        id_column=Product.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        estimable=not search,
+    )
+
+
+# Columns selected by the fast JSON path, one per ProductPublic field; their
+# keys are also the allow-list for sparse fieldsets (fields=)
+PRODUCT_PUBLIC_COLUMNS = public_columns(Product, ProductPublic)
+PRODUCT_FIELDS: dict[str, Any] = {c.key: c for c in PRODUCT_PUBLIC_COLUMNS}
+
+
+def get_product_row(
+    *,
+    session: Session,
+    product_id: uuid.UUID,
+    organization_id: uuid.UUID,
+    fields: Sequence[str],
+) -> dict[str, Any] | None:
+    """Get only the given ProductPublic fields of a product by ID"""
+    statement = (
+        select(*[PRODUCT_FIELDS[name] for name in fields])
+        .where(Product.id == product_id)
+        .where(Product.organization_id == organization_id)
+        .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
+    )
+    row = session.execute(statement).first()
+    return None if row is None else dict(zip(fields, row, strict=True))
+
+
+def get_product_rows_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    is_active: bool | None = None,
+    category_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+    fields: Sequence[str] | None = None,
+) -> tuple[list[dict[str, Any]], int | None, bool]:
+    """
+    Same page as get_products_page, as ProductPublic-shaped dicts read from
+    column tuples instead of ORM instances.
+
+    With ``fields``, only those columns are selected; rows also carry the
+    id and sort key columns, which the caller strips after paginating.
+    """
+    return fetch_page(
+        session,
+        _products_query(
+            organization_id=organization_id,
+            search=search,
+            is_active=is_active,
+            category_id=category_id,
+        ),
+        sort=get_product_sort(sort_by=sort_by, sort_order=sort_order),
+        id_column=Product.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        estimable=not search,
+        columns=(
+            PRODUCT_PUBLIC_COLUMNS
+            if fields is None
+            else [PRODUCT_FIELDS[name] for name in fields]
+        ),
+    )
+
+
+@traced
+def get_products_by_organization(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    is_active: bool | None = None,
+    category_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+) -> list[Product]:
+    """
+    Get all products for an organization.
+
+    When a cursor is given the page is fetched with a keyset seek and skip is ignored.
+    """
+    products, _, _ = get_products_page(
+        session=session,
+        organization_id=organization_id,
+        skip=skip,
+        limit=limit,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        is_active=is_active,
+        category_id=category_id,
+        cursor=cursor,
+        count_mode="none",
+    )
+    return products
 
 
 def count_products_by_organization(
@@ -391,28 +861,79 @@ def count_products_by_organization(
     category_id: uuid.UUID | None = None,
 ) -> int:
     """Count products in an organization"""
-    from sqlalchemy import func
+    return count_rows(
+        session,
+        _products_query(
+            organization_id=organization_id,
+            search=search,
+            is_active=is_active,
+            category_id=category_id,
+        ),
+    )
+
+
+def search_products(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    term: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> list[Product]:
+    """
+    Typeahead search over active products.
 
+    Exact SKU matches come first, then name prefix matches, then any other
+    substring match.
+    """
+    term = normalize_term(term)
+    if not term:
+        return []
+    scope = (
+        select(Product.id)
+        .where(Product.organization_id == organization_id)
+        .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
+        .where(Product.is_active == True)  # noqa: E712
+    )
+    candidates = scope.where(_product_search_condition(term)).limit(
+        SEARCH_CANDIDATE_LIMIT
+    )
+    exact = scope.where(Product.sku == term)
+    rank = case(
+        (col(Product.sku) == term, 0),
+        (col(Product.name).ilike(f"{escape_like(term)}%", escape="\\"), 1),
+        else_=2,
+    )
     statement = (
-        select(func.count())
-        .select_from(Product)
+        select(Product)
+        .where(col(Product.id).in_(candidates.union(exact)))
+        .order_by(rank, col(Product.name), col(Product.id))
+        .limit(clamp_limit(limit))
+    )
+    return list(session.exec(statement).all())
+
+
+def full_text_search_products(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    query: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> list[tuple[Product, float]]:
+    """Rank products against a web-style full-text query, best match first"""
+    query = normalize_term(query)
+    if not query:
+        return []
+    tsquery = func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, query)
+    rank = func.ts_rank_cd(PRODUCT_SEARCH_VECTOR, tsquery, RANK_NORMALIZATION)
+    statement = (
+        select(Product, rank)
         .where(Product.organization_id == organization_id)
         .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
+        .where(PRODUCT_SEARCH_VECTOR.bool_op("@@")(tsquery))
+        .order_by(rank.desc(), col(Product.name), col(Product.id))
+        .limit(clamp_limit(limit))
     )
-    if search:
-        term = f"%{search}%"
-        statement = statement.where(
-            or_(
-                Product.name.ilike(term),  # type: ignore[attr-defined]
-                Product.sku.ilike(term),  # type: ignore[attr-defined]
-                Product.description.ilike(term),  # type: ignore[union-attr]
-            )
-        )
-    if is_active is not None:
-        statement = statement.where(Product.is_active == is_active)
-    if category_id is not None:
-        statement = statement.where(Product.category_id == category_id)
-    return session.exec(statement).one()
+    return [(product, float(score)) for product, score in session.exec(statement)]
 
 
 def get_product_by_sku(
@@ -428,6 +949,121 @@ def get_product_by_sku(
     return session.exec(statement).first()
 
 
+def get_product_by_barcode(
+    *, session: Session, barcode: str, organization_id: uuid.UUID
+) -> Product | None:
+    """Get a product by barcode within an organization"""
+    statement = (
+        select(Product)
+        .where(Product.barcode == barcode)
+        .where(Product.organization_id == organization_id)
+        .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
+    )
+    return session.exec(statement).first()
+
+
+def lookup_product(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    barcode: str | None = None,
+    sku: str | None = None,
+) -> ProductPublic | None:
+    """
+    Resolve a scanned barcode or SKU, serving repeat scans from the
+    per-tenant hot cache. Misses are not cached.
+
+    Use a primary session: a snapshot read from a lagging replica would be
+    cached after the NOTIFY that should have dropped it.
+    """
+    cache = product_lookup_cache.for_tenant(organization_id)
+    if barcode is not None:
+        key = ("barcode", barcode)
+    elif sku is not None:
+        key = ("sku", sku)
+    else:
+        return None
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    if barcode is not None:
+        product = get_product_by_barcode(
+            session=session, barcode=barcode, organization_id=organization_id
+        )
+    else:
+        product = get_product_by_sku(
+            session=session, sku=key[1], organization_id=organization_id
+        )
+    if product is None:
+        return None
+    snapshot = ProductPublic.model_validate(product)
+    cache.set(key, snapshot)
+    return snapshot
+
+
+async def lookup_product_async(
+    *,
+    session: AsyncSession,
+    organization_id: uuid.UUID,
+    barcode: str | None = None,
+    sku: str | None = None,
+) -> ProductPublic | None:
+    """Async lookup_product; cache hits never touch the database"""
+    kind, code = ("barcode", barcode) if barcode is not None else ("sku", sku)
+    if code is None:
+        return None
+    cached = product_lookup_cache.for_tenant(organization_id).get((kind, code))
+    if cached is not None:
+        return cached
+    return await session.run_sync(
+        _run_sync(
+            lookup_product, organization_id=organization_id, barcode=barcode, sku=sku
+        )
+    )
+
+
+def lookup_products(
+    *, session: Session, organization_id: uuid.UUID, codes: list[str]
+) -> dict[str, ProductPublic]:
+    """
+    Resolve a batch of scanned codes, each matched by barcode first and then
+    by SKU. Codes missing from the hot cache are resolved in one query, which
+    like lookup_product's must run on the primary.
+    """
+    cache = product_lookup_cache.for_tenant(organization_id)
+    found: dict[str, ProductPublic] = {}
+    pending: list[str] = []
+    for code in dict.fromkeys(codes):
+        cached = cache.get(("code", code))
+        if cached is not None:
+            found[code] = cached
+        else:
+            pending.append(code)
+    if not pending:
+        return found
+
+    statement = (
+        select(Product)
+        .where(Product.organization_id == organization_id)
+        .where(Product.deleted_at.is_(None))  # type: ignore[union-attr]
+        .where(or_(col(Product.barcode).in_(pending), col(Product.sku).in_(pending)))
+    )
+    by_barcode: dict[str, Product] = {}
+    by_sku: dict[str, Product] = {}
+    for product in session.exec(statement):
+        if product.barcode:
+            by_barcode[product.barcode] = product
+        by_sku[product.sku] = product
+    for code in pending:
+        match = by_barcode.get(code) or by_sku.get(code)
+        if match is not None:
+            snapshot = ProductPublic.model_validate(match)
+            cache.set(("code", code), snapshot)
+            found[code] = snapshot
+    return found
+
+
 def get_low_stock_products(
     *,
     session: Session,
@@ -447,6 +1083,7 @@ def get_low_stock_products(
     return list(session.exec(statement).all())
 
 
+@traced
 def count_low_stock_products(*, session: Session, organization_id: uuid.UUID) -> int:
     """Count products where stock_quantity <= stock_min"""
     from sqlalchemy import func
@@ -468,25 +1105,27 @@ def update_product(
     from datetime import datetime, timezone
 
     product_data = product_in.model_dump(exclude_unset=True)
+    _forget_product_lookups(session, db_product)
     db_product.sqlmodel_update(product_data)
     db_product.updated_at = datetime.now(timezone.utc)
     session.add(db_product)
+    _forget_product_lookups(session, db_product)
     session.commit()
     session.refresh(db_product)
     return db_product
 
 
+@traced
 def adjust_product_stock(
-    *, session: Session, db_product: Product, quantity: int
+    *, session: Session, db_product: Product, quantity: int, commit: bool = True
 ) -> Product:
     """Adjust product stock by a given quantity (positive or negative)"""
     from datetime import datetime, timezone
 
     db_product.stock_quantity += quantity
     db_product.updated_at = datetime.now(timezone.utc)
-    session.add(db_product)
-    session.commit()
-    session.refresh(db_product)
+    _forget_product_lookups(session, db_product)
+    _save(session, db_product, commit=commit)
     return db_product
 
 
@@ -495,13 +1134,114 @@ def soft_delete_product(*, session: Session, db_product: Product) -> Product:
     from datetime import datetime, timezone
 
     db_product.deleted_at = datetime.now(timezone.utc)
+    db_product.updated_at = db_product.deleted_at
     db_product.is_active = False
     session.add(db_product)
+    _forget_product_lookups(session, db_product)
     session.commit()
     session.refresh(db_product)
     return db_product
 
 
+def _sync_horizon(session: Session) -> datetime:
+    """
+    Newest updated_at the change feed may hand out.
+
+    A write transaction still open may commit rows stamped before rows that
+    are already visible; a token past those stamps would skip them. So the
+    feed stops at the start of the oldest open write transaction, which
+    precedes every stamp it makes, less SYNC_COMMIT_GRACE.
+    """
+    # pg_stat_activity is read once per transaction unless told otherwise
+    session.execute(select(func.pg_stat_clear_snapshot()))
+    oldest = session.execute(
+        text(
+            "SELECT least(clock_timestamp(), min(xact_start)) FROM pg_stat_activity"
+            " WHERE datname = current_database() AND backend_xid IS NOT NULL"
+            " AND pid <> pg_backend_pid()"
+        )
+    ).scalar_one()
+    horizon: datetime = oldest - SYNC_COMMIT_GRACE
+    return horizon
+
+
+def _changed_since(
+    model: Any,
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    position: SyncPosition,
+    horizon: datetime,
+    limit: int,
+) -> list[Any]:
+    """Rows of model changed after position, up to horizon, oldest first"""
+    updated_at, row_id = col(model.updated_at), col(model.id)
+    statement = (
+        select(model)
+        .where(model.organization_id == organization_id)
+        .where(updated_at <= horizon)
+    )
+    if position.updated_at is not None:
+        statement = statement.where(
+            tuple_(updated_at, row_id)
+            > tuple_(
+                literal(position.updated_at, DateTime(timezone=True)),
+                literal(position.row_id, Uuid()),
+            )
+        )
+    statement = statement.order_by(updated_at, row_id).limit(limit + 1)
+    return list(session.exec(statement).all())
+
+
+def get_catalog_changes(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    since: ChangeToken,
+    limit: int = SYNC_MAX_LIMIT,
+) -> tuple[list[Product], list[Category], ChangeToken, bool]:
+    """
+    Get products and categories created, updated or soft-deleted after a
+    change token.
+
+    Returns (products, categories, next_token, has_more). Rows stamped after
+    the sync horizon (see _sync_horizon) are held back until a later call.
+    """
+    limit = max(1, min(limit, SYNC_MAX_LIMIT))
+    horizon = _sync_horizon(session)
+    products = _changed_since(
+        Product,
+        session=session,
+        organization_id=organization_id,
+        position=since.products,
+        horizon=horizon,
+        limit=limit,
+    )
+    categories = _changed_since(
+        Category,
+        session=session,
+        organization_id=organization_id,
+        position=since.categories,
+        horizon=horizon,
+        limit=limit,
+    )
+    has_more = len(products) > limit or len(categories) > limit
+    products, categories = products[:limit], categories[:limit]
+    next_token = ChangeToken(
+        products=(
+            SyncPosition(products[-1].updated_at, products[-1].id)
+            if products
+            else since.products
+        ),
+        categories=(
+            SyncPosition(categories[-1].updated_at, categories[-1].id)
+            if categories
+            else since.categories
+        ),
+    )
+    return products, categories, next_token, has_more
+
+
 # ============================================================================
 # CUSTOMER CRUD
 # ============================================================================
@@ -521,6 +1261,7 @@ def create_customer(
     return db_obj
 
 
+@traced
 def get_customer_by_id(
     *, session: Session, customer_id: uuid.UUID, organization_id: uuid.UUID
 ) -> Customer | None:
@@ -545,75 +1286,259 @@ _CUSTOMER_SORT_COLUMNS: dict[str, Any] = {
 }
 
 
-def get_customers_by_organization(
+def get_customer_sort(*, sort_by: str | None, sort_order: str = "asc") -> SortSpec:
+    """Resolve the ordering used by customer listings (defaults to created_at asc)"""
+    return resolve_sort(_CUSTOMER_SORT_COLUMNS, sort_by=sort_by, sort_order=sort_order)
+
+
+def _customer_search_condition(term: str) -> Any:
+    return search_condition(
+        term,
+        columns=[
+            CUSTOMER_FULL_NAME,
+            Customer.email,
+            Customer.document_number,
+            Customer.phone,
+        ],
+        exact_columns=[Customer.document_number],
+    )
+
+
+def _customers_query(
+    *,
+    organization_id: uuid.UUID,
+    search: str | None = None,
+    is_active: bool | None = None,
+) -> Any:
+    """Build the filtered customer SELECT shared by listing and counting"""
+    statement = (
+        select(Customer)
+        .where(Customer.organization_id == organization_id)
+        .where(Customer.deleted_at.is_(None))  # type: ignore[union-attr]
+    )
+    term = normalize_term(search)
+    if term:
+        statement = statement.where(_customer_search_condition(term))
+    if is_active is not None:
+        statement = statement.where(Customer.is_active == is_active)
+    return statement
+
+
+def get_customers_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    is_active: bool | None = None,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> tuple[list[Customer], int | None, bool]:
+    """
+    Get a page of customers and its total, counted according to count_mode.
+
+    Returns (customers, count, count_is_estimate).
+    """
+    return fetch_page(
+        session,
+        _customers_query(
+            organization_id=organization_id, search=search, is_active=is_active
+        ),
+        sort=get_customer_sort(sort_by=sort_by, sort_order=sort_order),
+        id_column=Customer.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        estimable=not search,
+    )
+
+
+# Columns for sparse customer fieldsets, keyed by CustomerPublic field
+CUSTOMER_PUBLIC_COLUMNS = public_columns(Customer, CustomerPublic)
+CUSTOMER_FIELDS: dict[str, Any] = {c.key: c for c in CUSTOMER_PUBLIC_COLUMNS}
+
+
+def get_customer_row(
+    *,
+    session: Session,
+    customer_id: uuid.UUID,
+    organization_id: uuid.UUID,
+    fields: Sequence[str],
+) -> dict[str, Any] | None:
+    """Get only the given CustomerPublic fields of a customer by ID"""
+    statement = (
+        select(*[CUSTOMER_FIELDS[name] for name in fields])
+        .where(Customer.id == customer_id)
+        .where(Customer.organization_id == organization_id)
+        .where(Customer.deleted_at.is_(None))  # type: ignore[union-attr]
+    )
+    row = session.execute(statement).first()
+    return None if row is None else dict(zip(fields, row, strict=True))
+
+
+def get_customer_rows_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    is_active: bool | None = None,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+    fields: Sequence[str] | None = None,
+) -> tuple[list[dict[str, Any]], int | None, bool]:
+    """
+    Same page as get_customers_page, as CustomerPublic-shaped dicts read from
+    column tuples, optionally narrowed to ``fields`` like
+    get_product_rows_page.
+    """
+    return fetch_page(
+        session,
+        _customers_query(
+            organization_id=organization_id, search=search, is_active=is_active
+        ),
+        sort=get_customer_sort(sort_by=sort_by, sort_order=sort_order),
+        id_column=Customer.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        estimable=not search,
+        columns=(
+            CUSTOMER_PUBLIC_COLUMNS
+            if fields is None
+            else [CUSTOMER_FIELDS[name] for name in fields]
+        ),
+    )
+
+
+@traced
+def get_customers_by_organization(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    is_active: bool | None = None,
+    cursor: str | None = None,
+) -> list[Customer]:
+    """
+    Get all customers for an organization.
+
+    When a cursor is given the page is fetched with a keyset seek and skip is ignored.
+    """
+    customers, _, _ = get_customers_page(
+        session=session,
+        organization_id=organization_id,
+        skip=skip,
+        limit=limit,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        is_active=is_active,
+        cursor=cursor,
+        count_mode="none",
+    )
+    return customers
+
+
+def count_customers_by_organization(
     *,
     session: Session,
     organization_id: uuid.UUID,
-    skip: int = 0,
-    limit: int = 100,
     search: str | None = None,
-    sort_by: str | None = None,
-    sort_order: str = "asc",
     is_active: bool | None = None,
+) -> int:
+    """Count customers in an organization"""
+    return count_rows(
+        session,
+        _customers_query(
+            organization_id=organization_id, search=search, is_active=is_active
+        ),
+    )
+
+
+def search_customers(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    term: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
 ) -> list[Customer]:
-    """Get all customers for an organization"""
-    statement = (
-        select(Customer)
+    """
+    Typeahead search over active customers.
+
+    Exact document matches come first, then full name prefix matches.
+    """
+    term = normalize_term(term)
+    if not term:
+        return []
+    scope = (
+        select(Customer.id)
         .where(Customer.organization_id == organization_id)
         .where(Customer.deleted_at.is_(None))  # type: ignore[union-attr]
+        .where(Customer.is_active == True)  # noqa: E712
     )
-    if search:
-        term = f"%{search}%"
-        statement = statement.where(
-            or_(
-                Customer.first_name.ilike(term),  # type: ignore[attr-defined]
-                Customer.last_name.ilike(term),  # type: ignore[attr-defined]
-                Customer.email.ilike(term),  # type: ignore[union-attr]
-                Customer.document_number.ilike(term),  # type: ignore[attr-defined]
-                Customer.phone.ilike(term),  # type: ignore[union-attr]
-            )
-        )
-    if is_active is not None:
-        statement = statement.where(Customer.is_active == is_active)
-    sort_col = _CUSTOMER_SORT_COLUMNS.get(sort_by or "")
-    if sort_col is not None:
-        statement = statement.order_by(
-            sort_col.asc() if sort_order == "asc" else sort_col.desc()
+    candidates = scope.where(_customer_search_condition(term)).limit(
+        SEARCH_CANDIDATE_LIMIT
+    )
+    exact = scope.where(Customer.document_number == term)
+    rank = case(
+        (col(Customer.document_number) == term, 0),
+        (CUSTOMER_FULL_NAME.ilike(f"{escape_like(term)}%", escape="\\"), 1),
+        else_=2,
+    )
+    statement = (
+        select(Customer)
+        .where(col(Customer.id).in_(candidates.union(exact)))
+        .order_by(
+            rank,
+            col(Customer.first_name),
+            col(Customer.last_name),
+            col(Customer.id),
         )
-    statement = statement.offset(skip).limit(limit)
+        .limit(clamp_limit(limit))
+    )
     return list(session.exec(statement).all())
 
 
-def count_customers_by_organization(
+def full_text_search_customers(
     *,
     session: Session,
     organization_id: uuid.UUID,
-    search: str | None = None,
-    is_active: bool | None = None,
-) -> int:
-    """Count customers in an organization"""
-    from sqlalchemy import func
-
+    query: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> list[tuple[Customer, float]]:
+    """Rank customers against a web-style full-text query, best match first"""
+    query = normalize_term(query)
+    if not query:
+        return []
+    tsquery = func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, query)
+    rank = func.ts_rank_cd(CUSTOMER_SEARCH_VECTOR, tsquery, RANK_NORMALIZATION)
     statement = (
-        select(func.count())
-        .select_from(Customer)
+        select(Customer, rank)
         .where(Customer.organization_id == organization_id)
         .where(Customer.deleted_at.is_(None))  # type: ignore[union-attr]
-    )
-    if search:
-        term = f"%{search}%"
-        statement = statement.where(
-            or_(
-                Customer.first_name.ilike(term),  # type: ignore[attr-defined]
-                Customer.last_name.ilike(term),  # type: ignore[attr-defined]
-                Customer.email.ilike(term),  # type: ignore[union-attr]
-                Customer.document_number.ilike(term),  # type: ignore[attr-defined]
-                Customer.phone.ilike(term),  # type: ignore[union-attr]
-            )
+        .where(CUSTOMER_SEARCH_VECTOR.bool_op("@@")(tsquery))
+        .order_by(
+            rank.desc(),
+            col(Customer.first_name),
+            col(Customer.last_name),
+            col(Customer.id),
         )
-    if is_active is not None:
-        statement = statement.where(Customer.is_active == is_active)
-    return session.exec(statement).one()
+        .limit(clamp_limit(limit))
+    )
+    return [(customer, float(score)) for customer, score in session.exec(statement)]
 
 
 def get_customer_by_document(
@@ -661,6 +1586,7 @@ def soft_delete_customer(*, session: Session, db_customer: Customer) -> Customer
 # ============================================================================
 
 
+@traced
 def create_inventory_movement(
     *,
     session: Session,
@@ -669,6 +1595,7 @@ def create_inventory_movement(
     user_id: uuid.UUID,
     previous_stock: int,
     new_stock: int,
+    commit: bool = True,
 ) -> InventoryMovement:
     """Create a new inventory movement record"""
     db_obj = InventoryMovement.model_validate(
@@ -680,9 +1607,7 @@ def create_inventory_movement(
             "new_stock": new_stock,
         },
     )
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    _save(session, db_obj, commit=commit)
     return db_obj
 
 
@@ -698,22 +1623,62 @@ def get_inventory_movement_by_id(
     return session.exec(statement).first()
 
 
+# Movements are always listed most recent first
+MOVEMENT_SORT = SortSpec(
+    key="created_at", column=InventoryMovement.created_at, descending=True
+)
+
+
+def get_movements_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    product_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> tuple[list[InventoryMovement], int | None, bool]:
+    """
+    Get a page of inventory movements (optionally for one product) and its total.
+
+    Returns (movements, count, count_is_estimate).
+    """
+    statement = select(InventoryMovement).where(
+        InventoryMovement.organization_id == organization_id
+    )
+    if product_id is not None:
+        statement = statement.where(InventoryMovement.product_id == product_id)
+    return fetch_page(
+        session,
+        statement,
+        sort=MOVEMENT_SORT,
+        id_column=InventoryMovement.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+    )
+
+
 def get_movements_by_organization(
     *,
     session: Session,
     organization_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[InventoryMovement]:
     """Get all inventory movements for an organization, ordered by most recent"""
-    statement = (
-        select(InventoryMovement)
-        .where(InventoryMovement.organization_id == organization_id)
-        .order_by(InventoryMovement.created_at.desc())  # type: ignore[attr-defined]
-        .offset(skip)
-        .limit(limit)
+    movements, _, _ = get_movements_page(
+        session=session,
+        organization_id=organization_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode="none",
     )
-    return list(session.exec(statement).all())
+    return movements
 
 
 def count_movements_by_organization(
@@ -737,17 +1702,19 @@ def get_movements_by_product(
     organization_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[InventoryMovement]:
     """Get all inventory movements for a specific product"""
-    statement = (
-        select(InventoryMovement)
-        .where(InventoryMovement.product_id == product_id)
-        .where(InventoryMovement.organization_id == organization_id)
-        .order_by(InventoryMovement.created_at.desc())  # type: ignore[attr-defined]
-        .offset(skip)
-        .limit(limit)
+    movements, _, _ = get_movements_page(
+        session=session,
+        organization_id=organization_id,
+        product_id=product_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode="none",
     )
-    return list(session.exec(statement).all())
+    return movements
 
 
 def count_movements_by_product(
@@ -773,6 +1740,7 @@ def count_movements_by_product(
 # ============================================================================
 
 
+@traced
 def generate_invoice_number(*, session: Session, organization_id: uuid.UUID) -> str:
     """Generate the next invoice number for an organization."""
     from sqlalchemy import func
@@ -785,6 +1753,7 @@ def generate_invoice_number(*, session: Session, organization_id: uuid.UUID) ->
     return f"INV-{count + 1:06d}"
 
 
+@traced
 def create_sale(
     *,
     session: Session,
@@ -798,6 +1767,7 @@ def create_sale(
     total: Any,
     payment_method: str,
     notes: str | None,
+    commit: bool = True,
 ) -> Sale:
     """Create a new sale record."""
     sale = Sale(
@@ -813,12 +1783,11 @@ def create_sale(
         notes=notes,
         status="completed",
     )
-    session.add(sale)
-    session.commit()
-    session.refresh(sale)
+    _save(session, sale, commit=commit)
     return sale
 
 
+@traced
 def create_sale_item(
     *,
     session: Session,
@@ -829,6 +1798,7 @@ def create_sale_item(
     quantity: int,
     unit_price: Any,
     subtotal: Any,
+    commit: bool = True,
 ) -> SaleItem:
     """Create a sale item record."""
     item = SaleItem(
@@ -840,9 +1810,7 @@ def create_sale_item(
         unit_price=unit_price,
         subtotal=subtotal,
     )
-    session.add(item)
-    session.commit()
-    session.refresh(item)
+    _save(session, item, commit=commit)
     return item
 
 
@@ -868,6 +1836,167 @@ _SALE_SORT_COLUMNS: dict[str, Any] = {
 }
 
 
+def get_sale_sort(*, sort_by: str | None, sort_order: str = "asc") -> SortSpec:
+    """Resolve the ordering used by sale listings (defaults to most recent first)."""
+    return resolve_sort(
+        _SALE_SORT_COLUMNS,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        default_descending=True,
+    )
+
+
+def _sale_search_condition(term: str) -> Any:
+    return search_condition(
+        term, columns=[Sale.invoice_number], exact_columns=[Sale.invoice_number]
+    )
+
+
+# Loads the items of a whole page in one query instead of one per sale
+_SALE_ITEMS = selectinload(Sale.items)  # type: ignore[arg-type]
+
+
+def _sales_query(
+    *,
+    organization_id: uuid.UUID,
+    search: str | None = None,
+    status: str | None = None,
+    payment_method: str | None = None,
+) -> Any:
+    """Build the filtered sale SELECT shared by listing and counting."""
+    statement = select(Sale).where(Sale.organization_id == organization_id)
+    term = normalize_term(search)
+    if term:
+        statement = statement.where(_sale_search_condition(term))
+    if status:
+        statement = statement.where(Sale.status == status)
+    if payment_method:
+        statement = statement.where(Sale.payment_method == payment_method)
+    return statement
+
+
+def search_sales(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    term: str,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> list[Sale]:
+    """Typeahead search over sale invoice numbers, exact match first."""
+    term = normalize_term(term)
+    if not term:
+        return []
+    scope = select(Sale.id).where(Sale.organization_id == organization_id)
+    candidates = scope.where(_sale_search_condition(term)).limit(SEARCH_CANDIDATE_LIMIT)
+    exact = scope.where(Sale.invoice_number == term)
+    rank = case((col(Sale.invoice_number) == term, 0), else_=1)
+    statement = (
+        select(Sale)
+        .options(_SALE_ITEMS)
+        .where(col(Sale.id).in_(candidates.union(exact)))
+        .order_by(rank, col(Sale.created_at).desc(), col(Sale.id))
+        .limit(clamp_limit(limit))
+    )
+    return list(session.exec(statement).all())
+
+
+def get_sales_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    status: str | None = None,
+    payment_method: str | None = None,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> tuple[list[Sale], int | None, bool]:
+    """
+    Get a page of sales and its total, counted according to count_mode.
+
+    Returns (sales, count, count_is_estimate).
+    """
+    return fetch_page(
+        session,
+        _sales_query(
+            organization_id=organization_id,
+            search=search,
+            status=status,
+            payment_method=payment_method,
+        ).options(_SALE_ITEMS),
+        sort=get_sale_sort(sort_by=sort_by, sort_order=sort_order),
+        id_column=Sale.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        estimable=not search,
+    )
+
+
+# Columns selected by the fast JSON path; items are loaded separately
+SALE_PUBLIC_COLUMNS = public_columns(Sale, SalePublic, exclude=frozenset({"items"}))
+SALE_ITEM_PUBLIC_COLUMNS = public_columns(SaleItem, SaleItemPublic)
+
+
+def get_sale_rows_page(
+    *,
+    session: Session,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    sort_by: str | None = None,
+    sort_order: str = "asc",
+    status: str | None = None,
+    payment_method: str | None = None,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> tuple[list[dict[str, Any]], int | None, bool]:
+    """
+    Same page as get_sales_page, as SalePublic-shaped dicts read from column
+    tuples. The items of every sale on the page come from a single query.
+    """
+    sales, count, count_is_estimate = fetch_page(
+        session,
+        _sales_query(
+            organization_id=organization_id,
+            search=search,
+            status=status,
+            payment_method=payment_method,
+        ),
+        sort=get_sale_sort(sort_by=sort_by, sort_order=sort_order),
+        id_column=Sale.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        estimable=not search,
+        columns=SALE_PUBLIC_COLUMNS,
+    )
+    items_by_sale: dict[uuid.UUID, list[dict[str, Any]]] = {
+        sale["id"]: [] for sale in sales
+    }
+    if items_by_sale:
+        sale_ids = list(items_by_sale)
+        statement = (
+            select(*SALE_ITEM_PUBLIC_COLUMNS)
+            .where(col(SaleItem.sale_id) == any_(literal(sale_ids, ARRAY(Uuid()))))
+            .order_by(col(SaleItem.created_at), col(SaleItem.id))
+        )
+        keys = [column.key for column in SALE_ITEM_PUBLIC_COLUMNS]
+        for row in session.execute(statement):
+            item = dict(zip(keys, row, strict=True))
+            items_by_sale[item["sale_id"]].append(item)
+    for sale in sales:
+        sale["items"] = items_by_sale[sale["id"]]
+    return sales, count, count_is_estimate
+
+
+@traced
 def get_sales_by_organization(
     *,
     session: Session,
@@ -879,25 +2008,27 @@ def get_sales_by_organization(
     sort_order: str = "asc",
     status: str | None = None,
     payment_method: str | None = None,
+    cursor: str | None = None,
 ) -> list[Sale]:
-    """Get all sales for an organization, ordered by most recent."""
-    statement = select(Sale).where(Sale.organization_id == organization_id)
-    if search:
-        term = f"%{search}%"
-        statement = statement.where(Sale.invoice_number.ilike(term))  # type: ignore[attr-defined]
-    if status:
-        statement = statement.where(Sale.status == status)
-    if payment_method:
-        statement = statement.where(Sale.payment_method == payment_method)
-    sort_col = _SALE_SORT_COLUMNS.get(sort_by or "")
-    if sort_col is not None:
-        statement = statement.order_by(
-            sort_col.asc() if sort_order == "asc" else sort_col.desc()
-        )
-    else:
-        statement = statement.order_by(Sale.created_at.desc())  # type: ignore[attr-defined]
-    statement = statement.offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    """
+    Get all sales for an organization, ordered by most recent.
+
+    When a cursor is given the page is fetched with a keyset seek and skip is ignored.
+    """
+    sales, _, _ = get_sales_page(
+        session=session,
+        organization_id=organization_id,
+        skip=skip,
+        limit=limit,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        status=status,
+        payment_method=payment_method,
+        cursor=cursor,
+        count_mode="none",
+    )
+    return sales
 
 
 def count_sales_by_organization(
@@ -909,21 +2040,15 @@ def count_sales_by_organization(
     payment_method: str | None = None,
 ) -> int:
     """Count sales in an organization."""
-    from sqlalchemy import func
-
-    statement = (
-        select(func.count())
-        .select_from(Sale)
-        .where(Sale.organization_id == organization_id)
+    return count_rows(
+        session,
+        _sales_query(
+            organization_id=organization_id,
+            search=search,
+            status=status,
+            payment_method=payment_method,
+        ),
     )
-    if search:
-        term = f"%{search}%"
-        statement = statement.where(Sale.invoice_number.ilike(term))  # type: ignore[attr-defined]
-    if status:
-        statement = statement.where(Sale.status == status)
-    if payment_method:
-        statement = statement.where(Sale.payment_method == payment_method)
-    return session.exec(statement).one()
 
 
 def get_sale_items(*, session: Session, sale_id: uuid.UUID) -> list[SaleItem]:
@@ -968,6 +2093,7 @@ def get_sales_today(
     )
     statement = (
         select(Sale)
+        .options(_SALE_ITEMS)
         .where(Sale.organization_id == organization_id)
         .where(Sale.status == "completed")
         .where(Sale.sale_date >= today_start)
@@ -997,6 +2123,7 @@ def count_sales_today(*, session: Session, organization_id: uuid.UUID) -> int:
     return session.exec(statement).one()
 
 
+@traced
 def get_sales_stats(*, session: Session, organization_id: uuid.UUID) -> dict[str, Any]:
     """Get sales statistics for an organization."""
     from datetime import datetime, time, timezone
@@ -1047,11 +2174,13 @@ def get_sales_stats(*, session: Session, organization_id: uuid.UUID) -> dict[str
     }
 
 
+@traced
 def update_customer_purchase_stats(
     *,
     session: Session,
     db_customer: Customer,
     sale_total: Any,
+    commit: bool = True,
 ) -> Customer:
     """Update customer's denormalized purchase stats after a sale."""
     from datetime import datetime, timezone
@@ -1063,9 +2192,7 @@ def update_customer_purchase_stats(
     db_customer.purchases_count += 1
     db_customer.last_purchase_at = datetime.now(timezone.utc)
     db_customer.updated_at = datetime.now(timezone.utc)
-    session.add(db_customer)
-    session.commit()
-    session.refresh(db_customer)
+    _save(session, db_customer, commit=commit)
     return db_customer
 
 
@@ -1074,6 +2201,7 @@ def revert_customer_purchase_stats(
     session: Session,
     db_customer: Customer,
     sale_total: Any,
+    commit: bool = True,
 ) -> Customer:
     """Revert customer's denormalized purchase stats after a sale cancellation."""
     from datetime import datetime, timezone
@@ -1086,30 +2214,63 @@ def revert_customer_purchase_stats(
         db_customer.total_purchases = Decimal("0")
     db_customer.purchases_count = max(0, db_customer.purchases_count - 1)
     db_customer.updated_at = datetime.now(timezone.utc)
-    session.add(db_customer)
-    session.commit()
-    session.refresh(db_customer)
+    _save(session, db_customer, commit=commit)
     return db_customer
 
 
-def get_sales_by_customer(
+def get_customer_sales_page(
     *,
     session: Session,
     customer_id: uuid.UUID,
     organization_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
-) -> list[Sale]:
-    """Get all sales for a specific customer."""
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> tuple[list[Sale], int | None, bool]:
+    """
+    Get a page of a customer's sales and its total.
+
+    Returns (sales, count, count_is_estimate).
+    """
     statement = (
         select(Sale)
+        .options(_SALE_ITEMS)
         .where(Sale.customer_id == customer_id)
         .where(Sale.organization_id == organization_id)
-        .order_by(Sale.created_at.desc())  # type: ignore[attr-defined]
-        .offset(skip)
-        .limit(limit)
     )
-    return list(session.exec(statement).all())
+    return fetch_page(
+        session,
+        statement,
+        sort=get_sale_sort(sort_by=None),
+        id_column=Sale.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+    )
+
+
+def get_sales_by_customer(
+    *,
+    session: Session,
+    customer_id: uuid.UUID,
+    organization_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> list[Sale]:
+    """Get all sales for a specific customer."""
+    sales, _, _ = get_customer_sales_page(
+        session=session,
+        customer_id=customer_id,
+        organization_id=organization_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_mode="none",
+    )
+    return sales
 
 
 def count_sales_by_customer(
@@ -1202,6 +2363,7 @@ def _get_top_products_for_current_month(
     ]
 
 
+@traced
 def get_top_products_by_quantity(
     *,
     session: Session,
@@ -1217,6 +2379,7 @@ def get_top_products_by_quantity(
     )
 
 
+@traced
 def get_top_products_by_revenue(
     *,
     session: Session,
@@ -1246,6 +2409,7 @@ def get_top_products(
     )
 
 
+@traced
 def get_sales_by_day(
     *,
     session: Session,
@@ -1294,6 +2458,7 @@ def get_sales_by_day(
     return result
 
 
+@traced
 def get_dashboard_stats(
     *,
     session: Session,
@@ -1334,13 +2499,28 @@ def get_dashboard_stats(
     }
 
 
+async def get_dashboard_stats_async(
+    *, session: AsyncSession, organization_id: uuid.UUID
+) -> dict[str, Any]:
+    """Async get_dashboard_stats"""
+    return await session.run_sync(
+        _run_sync(get_dashboard_stats, organization_id=organization_id)
+    )
+
+
 # ============================================================================
 # AUTHENTICATION
 # ============================================================================
 
-# Dummy hash to use for timing attack prevention when user is not found
-# This is an Argon2 hash of a random password, used to ensure constant-time comparison
-DUMMY_HASH = "$argon2id$v=19$m=65536,t=3,p=4$MjQyZWE1MzBjYjJlZTI0Yw$YTU4NGM5ZTZmYjE2NzZlZjY0ZWY3ZGRkY2U2OWFjNjk"
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """
+    Hash to verify against when the user is not found, preventing timing
+    attacks. Made with the configured Argon2 parameters so it costs the same
+    as verifying a real password.
+    """
+    return get_password_hash(secrets.token_hex(16))
 
 
 def authenticate(
@@ -1353,21 +2533,113 @@ def authenticate(
     """
     Authenticate a user by email and password.
     If organization_id is provided, search within that organization only.
+
+    While an account is locked after too many consecutive failures, its
+    password is not checked and the result is None, exactly as for an
+    unknown email, so the lockout does not reveal which accounts exist.
     """
     db_user = get_user_by_email(
         session=session, email=email, organization_id=organization_id
     )
-    if not db_user:
+    now = datetime.now(timezone.utc)
+    if not db_user or _is_locked(db_user, now):
         # Prevent timing attacks by running password verification even when user doesn't exist
         # This ensures the response time is similar whether or not the email exists
-        verify_password(password, DUMMY_HASH)
+        verify_password(password, _dummy_hash())
         return None
     verified, updated_password_hash = verify_password(password, db_user.hashed_password)
     if not verified:
+        _record_failed_login(session=session, user_id=db_user.id, now=now)
+        return None
+    _record_login(
+        session=session, db_user=db_user, updated_password_hash=updated_password_hash
+    )
+    return db_user
+
+
+async def authenticate_async(
+    *,
+    session: AsyncSession,
+    email: str,
+    password: str,
+    organization_id: uuid.UUID | None = None,
+) -> User | None:
+    """
+    Async authenticate. The password check is awaited on the hash pool, so
+    a burst of logins does not hold threadpool threads while it waits.
+    """
+    db_user = await session.run_sync(
+        _run_sync(get_user_by_email, email=email, organization_id=organization_id)
+    )
+    now = datetime.now(timezone.utc)
+    if not db_user or _is_locked(db_user, now):
+        await verify_password_async(password, await _dummy_hash_async())
+        return None
+    verified, updated_password_hash = await verify_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        await session.run_sync(
+            _run_sync(_record_failed_login, user_id=db_user.id, now=now)
+        )
         return None
-    if updated_password_hash:
-        db_user.hashed_password = updated_password_hash
+    await session.run_sync(
+        _run_sync(
+            _record_login, db_user=db_user, updated_password_hash=updated_password_hash
+        )
+    )
+    return db_user
+
+
+async def _dummy_hash_async() -> str:
+    if _dummy_hash.cache_info().currsize:
+        return _dummy_hash()
+    # First call in this process: make the hash without blocking the loop
+    return await anyio.to_thread.run_sync(_dummy_hash)
+
+
+def _is_locked(db_user: User, now: datetime) -> bool:
+    if db_user.locked_until is not None and db_user.locked_until > now:
+        logger.info("Login attempt for locked user %s", db_user.id)
+        return True
+    return False
+
+
+def _record_login(
+    *, session: Session, db_user: User, updated_password_hash: str | None
+) -> None:
+    """Clear failed attempts after a good password and store any rehash"""
+    if updated_password_hash or db_user.failed_login_attempts or db_user.locked_until:
+        if updated_password_hash:
+            db_user.hashed_password = updated_password_hash
+        db_user.failed_login_attempts = 0
+        db_user.locked_until = None
         session.add(db_user)
         session.commit()
         session.refresh(db_user)
-    return db_user
+
+
+def _record_failed_login(
+    *, session: Session, user_id: uuid.UUID, now: datetime
+) -> None:
+    """
+    Count a wrong password, locking the account at the threshold. One
+    UPDATE, so concurrent failures in other workers are all counted.
+    """
+    attempts = col(User.failed_login_attempts) + 1
+    reached = attempts >= settings.LOGIN_LOCKOUT_THRESHOLD
+    locked_until = session.execute(
+        update(User)
+        .where(col(User.id) == user_id)
+        .values(
+            failed_login_attempts=case((reached, 0), else_=attempts),
+            locked_until=case(
+                (reached, now + timedelta(minutes=settings.LOGIN_LOCKOUT_MINUTES)),
+                else_=User.locked_until,
+            ),
+        )
+        .returning(col(User.locked_until))
+    ).scalar_one()
+    session.commit()
+    if locked_until is not None and locked_until > now:
+        logger.warning("Locked user %s after repeated failed logins", user_id)
@@ -1,10 +1,36 @@
+import secrets
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.routing import APIRoute
+from psycopg.errors import QueryCanceled
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlmodel import Session
 from starlette.middleware.cors import CORSMiddleware
 
+from app import crud
 from app.api.main import api_router
+from app.core import metrics, security, tracing
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.db import (
+    RECENT_WRITES_CHANNEL,
+    async_engine,
+    async_replica_engine,
+    engine,
+    handle_recent_write_notification,
+    pool_metrics,
+    replica_router,
+)
+from app.core.networks import ip_in_networks
+from app.core.notifications import NotificationListener
+from app.core.process_pool import PoolBusyError
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_count import QueryCountMiddleware
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,10 +40,65 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+if settings.TRACING_ENABLED:
+    tracing.configure_tracing()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    with Session(engine) as session:
+        crud.preload_roles(session=session)
+    listeners = []
+    if settings.AUTH_CACHE_LISTEN:
+        # Drop records other workers changed; clear all after a reconnect
+        listeners.append(
+            NotificationListener(
+                engine.url,
+                crud.USER_AUTH_CHANNEL,
+                on_message=crud.handle_user_auth_notification,
+                on_connect=crud.user_auth_cache.clear,
+            )
+        )
+    if settings.PRODUCT_LOOKUP_CACHE_LISTEN:
+        # Drop codes other workers changed; clear all after a reconnect
+        listeners.append(
+            NotificationListener(
+                engine.url,
+                crud.PRODUCT_LOOKUP_CHANNEL,
+                on_message=crud.handle_product_lookup_notification,
+                on_connect=crud.product_lookup_cache.clear,
+            )
+        )
+    if replica_router is not None:
+        # Writes committed through other workers, for read-your-writes
+        listeners.append(
+            NotificationListener(
+                engine.url,
+                RECENT_WRITES_CHANNEL,
+                on_message=handle_recent_write_notification,
+            )
+        )
+    for listener in listeners:
+        listener.start()
+    yield
+    for listener in listeners:
+        listener.stop()
+    # Async pools are bound to this event loop
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+    if security.hash_pool is not None:
+        security.hash_pool.shutdown()
+    metrics.mark_worker_stopped()
+    if settings.TRACING_ENABLED:
+        tracing.shutdown_tracing()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -30,4 +111,82 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+if settings.ENVIRONMENT != "production":
+    app.add_middleware(
+        QueryCountMiddleware,
+        repeat_threshold=settings.QUERY_REPEAT_WARNING_THRESHOLD,
+    )
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    def _may_scrape(request: Request) -> bool:
+        host = request.client.host if request.client else ""
+        if ip_in_networks(host, settings.METRICS_ALLOWED_IPS):
+            return True
+        token = settings.METRICS_TOKEN
+        authorization = request.headers.get("authorization", "")
+        return bool(token) and secrets.compare_digest(
+            authorization.encode(), f"Bearer {token}".encode()
+        )
+
+    @app.get("/metrics", tags=["metrics"], include_in_schema=False)
+    def read_metrics(request: Request) -> Response:
+        # Same answer as an unknown path, so the endpoint is not advertised
+        if not _may_scrape(request):
+            raise HTTPException(status_code=404, detail="Not Found")
+        content, media_type = metrics.render()
+        return Response(content=content, media_type=media_type)
+
+
+# Outermost, so the request span covers the other middleware too
+if settings.TRACING_ENABLED:
+    app.add_middleware(tracing.TracingMiddleware)
+
+
+@app.exception_handler(PoolBusyError)
+def password_hash_busy_handler(_request: Request, _exc: PoolBusyError) -> JSONResponse:
+    # Raised by password hashing when the pool's queue is full
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+def db_pool_timeout_handler(_request: Request, _exc: PoolTimeoutError) -> JSONResponse:
+    # No connection freed up within DB_POOL_TIMEOUT_SECONDS
+    pool_metrics.record_timeout()
+    metrics.DB_POOL_TIMEOUTS.inc()
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(OperationalError)
+def statement_timeout_handler(_request: Request, exc: OperationalError) -> JSONResponse:
+    # statement_timeout cancelled a query; anything else stays a 500
+    if not isinstance(exc.orig, QueryCanceled):
+        raise exc
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The request took too long; try narrowing it"},
+    )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
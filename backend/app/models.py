@@ -1,12 +1,22 @@
 import uuid
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from pydantic import EmailStr, field_validator
-from sqlalchemy import Column, DateTime, Index, Numeric, UniqueConstraint
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import (
+    Column,
+    Computed,
+    DateTime,
+    Index,
+    Numeric,
+    Text,
+    UniqueConstraint,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlmodel import Field, Relationship, SQLModel, col
 
 if TYPE_CHECKING:
     pass
@@ -160,6 +170,12 @@ class Category(CategoryBase, table=True):
         Index("idx_categories_organization_id", "organization_id"),
         Index("idx_categories_parent_id", "parent_id"),
         Index("idx_categories_is_active", "is_active"),
+        Index(
+            "idx_categories_organization_updated_at_id",
+            "organization_id",
+            "updated_at",
+            "id",
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -250,6 +266,43 @@ class Product(ProductBase, table=True):
         Index("idx_products_category_id", "category_id"),
         Index("idx_products_is_active", "is_active"),
         Index("idx_products_sku", "sku"),
+        Index(
+            "idx_products_organization_updated_at_id",
+            "organization_id",
+            "updated_at",
+            "id",
+        ),
+        Index(
+            "idx_products_organization_barcode",
+            "organization_id",
+            "barcode",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "idx_products_organization_created_at_id",
+            "organization_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "idx_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_products_sku_trgm",
+            "sku",
+            postgresql_using="gin",
+            postgresql_ops={"sku": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_products_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -279,6 +332,22 @@ class Product(ProductBase, table=True):
     sale_items: list["SaleItem"] = Relationship(back_populates="product")
 
 
+# Weighted full-text document, generated by Postgres (migration 010). The column
+# is added to the table but not the mapper, so product loads never fetch it.
+PRODUCT_SEARCH_VECTOR = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('spanish_unaccent', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('spanish_unaccent', coalesce(sku, '')), 'A') || "
+        "setweight(to_tsvector('spanish_unaccent', coalesce(description, '')), 'B')",
+        persisted=True,
+    ),
+)
+Product.__table__.append_column(PRODUCT_SEARCH_VECTOR)  # type: ignore[attr-defined]
+Index("idx_products_search_vector", PRODUCT_SEARCH_VECTOR, postgresql_using="gin")
+
+
 class ProductCreate(SQLModel):
     name: str = Field(max_length=255)
     sku: str = Field(max_length=100)
@@ -307,6 +376,14 @@ class ProductCreate(SQLModel):
             raise ValueError("Stock values must be non-negative")
         return v
 
+    @field_validator("barcode")
+    @classmethod
+    def validate_barcode(cls, v: str | None) -> str | None:
+        # Blank barcodes are stored as NULL so they never collide in the unique index
+        if v is None:
+            return v
+        return v.strip() or None
+
 
 class ProductUpdate(SQLModel):
     name: str | None = Field(default=None, max_length=255)
@@ -337,6 +414,14 @@ class ProductUpdate(SQLModel):
             raise ValueError("Stock values must be non-negative")
         return v
 
+    @field_validator("barcode")
+    @classmethod
+    def validate_barcode(cls, v: str | None) -> str | None:
+        # Blank barcodes are stored as NULL so they never collide in the unique index
+        if v is None:
+            return v
+        return v.strip() or None
+
 
 class StockAdjustment(SQLModel):
     """Schema for manual stock adjustment."""
@@ -353,9 +438,48 @@ class ProductPublic(ProductBase):
     updated_at: datetime
 
 
+class CatalogChangesPublic(SQLModel):
+    """Catalog rows changed since a change token, for offline client replicas"""
+
+    products: list[ProductPublic]
+    deleted_product_ids: list[uuid.UUID]
+    categories: list[CategoryPublic]
+    deleted_category_ids: list[uuid.UUID]
+    next_token: str
+    has_more: bool
+
+
+# Upper bound on IDs resolved by one /products/batch request
+PRODUCT_BATCH_MAX_IDS = 200
+
+
+class ProductBatchRequest(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=PRODUCT_BATCH_MAX_IDS)
+
+
+class ProductBatchPublic(SQLModel):
+    """Products in request order; IDs that could not be found are in missing"""
+
+    data: list[ProductPublic]
+    missing: list[uuid.UUID]
+
+
+class ProductLookupRequest(SQLModel):
+    codes: list[str] = Field(min_length=1, max_length=500)
+
+
+class ProductLookupPublic(SQLModel):
+    """Scanned codes resolved to products; unknown codes are listed in missing"""
+
+    data: dict[str, ProductPublic]
+    missing: list[str]
+
+
 class ProductsPublic(SQLModel):
     data: list[ProductPublic]
-    count: int
+    count: int | None
+    count_is_estimate: bool = False
+    next_cursor: str | None = None
 
 
 # ============================================================================
@@ -388,6 +512,18 @@ class InventoryMovement(InventoryMovementBase, table=True):
             "reference_type",
             "reference_id",
         ),
+        Index(
+            "idx_inventory_movements_organization_created_at_id",
+            "organization_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "idx_inventory_movements_product_created_at_id",
+            "product_id",
+            "created_at",
+            "id",
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -426,7 +562,9 @@ class InventoryMovementPublic(InventoryMovementBase):
 
 class InventoryMovementsPublic(SQLModel):
     data: list[InventoryMovementPublic]
-    count: int
+    count: int | None
+    count_is_estimate: bool = False
+    next_cursor: str | None = None
 
 
 # ============================================================================
@@ -460,6 +598,30 @@ class Customer(CustomerBase, table=True):
         Index("idx_customers_email", "email"),
         Index("idx_customers_phone", "phone"),
         Index("idx_customers_is_active", "is_active"),
+        Index(
+            "idx_customers_organization_created_at_id",
+            "organization_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "idx_customers_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_customers_document_number_trgm",
+            "document_number",
+            postgresql_using="gin",
+            postgresql_ops={"document_number": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_customers_phone_trgm",
+            "phone",
+            postgresql_using="gin",
+            postgresql_ops={"phone": "gin_trgm_ops"},
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -491,6 +653,37 @@ class Customer(CustomerBase, table=True):
     sales: list["Sale"] = Relationship(back_populates="customer")
 
 
+# "first last" expression searched as one string, so full names match
+CUSTOMER_FULL_NAME = (
+    col(Customer.first_name)
+    .op("||")(literal_column("' '"))
+    .op("||")(col(Customer.last_name))
+)
+
+Index(
+    "idx_customers_full_name_trgm",
+    CUSTOMER_FULL_NAME.label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"},
+)
+
+# Weighted full-text document, generated by Postgres like PRODUCT_SEARCH_VECTOR
+CUSTOMER_SEARCH_VECTOR = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('spanish_unaccent', "
+        "coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+        "setweight(to_tsvector('spanish_unaccent', coalesce(document_number, '')), 'A') || "
+        "setweight(to_tsvector('spanish_unaccent', coalesce(email, '')), 'B') || "
+        "setweight(to_tsvector('spanish_unaccent', coalesce(phone, '')), 'C')",
+        persisted=True,
+    ),
+)
+Customer.__table__.append_column(CUSTOMER_SEARCH_VECTOR)  # type: ignore[attr-defined]
+Index("idx_customers_search_vector", CUSTOMER_SEARCH_VECTOR, postgresql_using="gin")
+
+
 class CustomerCreate(SQLModel):
     document_type: str = Field(max_length=50)
     document_number: str = Field(max_length=50)
@@ -530,7 +723,9 @@ class CustomerPublic(CustomerBase):
 
 class CustomersPublic(SQLModel):
     data: list[CustomerPublic]
-    count: int
+    count: int | None
+    count_is_estimate: bool = False
+    next_cursor: str | None = None
 
 
 # ============================================================================
@@ -583,6 +778,19 @@ class Sale(SaleBase, table=True):
         Index("idx_sales_status", "status"),
         Index("idx_sales_sale_date", "sale_date"),
         Index("idx_sales_invoice_number", "invoice_number"),
+        Index(
+            "idx_sales_organization_created_at_id",
+            "organization_id",
+            "created_at",
+            "id",
+        ),
+        Index("idx_sales_customer_created_at_id", "customer_id", "created_at", "id"),
+        Index(
+            "idx_sales_invoice_number_trgm",
+            "invoice_number",
+            postgresql_using="gin",
+            postgresql_ops={"invoice_number": "gin_trgm_ops"},
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -718,7 +926,9 @@ class SalePublic(SQLModel):
 
 class SalesPublic(SQLModel):
     data: list[SalePublic]
-    count: int
+    count: int | None
+    count_is_estimate: bool = False
+    next_cursor: str | None = None
 
 
 class SaleCancelRequest(SQLModel):
@@ -806,6 +1016,26 @@ class DashboardExportRequest(SQLModel):
         return value
 
 
+# ============================================================================
+# SEARCH MODELS
+# ============================================================================
+
+
+class ProductSearchHit(ProductPublic):
+    rank: float
+
+
+class CustomerSearchHit(CustomerPublic):
+    rank: float
+
+
+class SearchResultsPublic(SQLModel):
+    """Full-text search hits grouped by entity type, best rank first"""
+
+    products: list[ProductSearchHit] = []
+    customers: list[CustomerSearchHit] = []
+
+
 # ============================================================================
 # USER MODELS
 # ============================================================================
@@ -832,6 +1062,11 @@ class User(UserBase, table=True):
         Index("idx_users_organization_id", "organization_id"),
         Index("idx_users_role_id", "role_id"),
         Index("idx_users_is_active", "is_active"),
+        Index(
+            "idx_users_tokens_revoked_at",
+            "tokens_revoked_at",
+            postgresql_where=text("tokens_revoked_at IS NOT NULL"),
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -859,6 +1094,12 @@ class User(UserBase, table=True):
         default=None,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+    # Access tokens issued before this instant are rejected (deactivation,
+    # deletion or role change)
+    tokens_revoked_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
 
     # Relationships
     organization: Organization = Relationship(back_populates="users")
@@ -980,6 +1221,29 @@ class TokenPayload(SQLModel):
     sub: str  # User ID
     organization_id: str  # Organization ID
     role: str  # Role name
+    iat: float | None = None  # Issued at (Unix time); absent on older tokens
+
+
+class UserAuthRecord(SQLModel):
+    """The fields of a user that authentication checks, cached per worker"""
+
+    id: uuid.UUID
+    organization_id: uuid.UUID
+    role_id: int
+    is_active: bool
+    tokens_revoked_at: datetime | None = None
+
+
+class LoginThrottleBucket(SQLModel, table=True):
+    """Token bucket of the shared login throttle (LOGIN_THROTTLE_BACKEND=postgres)"""
+
+    __tablename__ = "login_throttle_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: str = Field(primary_key=True, sa_type=Text)
+    tokens: float
+    allowed: bool
+    updated_at: datetime = Field(sa_type=DateTime(timezone=True))  # type: ignore
 
 
 class LoginResponse(Token):
@@ -988,6 +1252,60 @@ class LoginResponse(Token):
     user: UserPublicWithRelations
 
 
+# ============================================================================
+# OPERATIONS MODELS
+# ============================================================================
+
+
+class DbPoolStats(SQLModel):
+    """Connection pool usage of one worker process"""
+
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    saturation: float  # checked_out / (pool_size + max_overflow)
+    peak_checked_out: int
+    connects: int
+    checkouts: int
+    invalidations: int
+    # Checkouts that gave up waiting, in either of the worker's pools
+    timeouts: int
+    # The pool async routes and authentication use, beside the one above
+    async_pool: "DbPoolStats | None" = None
+
+
+class ProfileQuery(SQLModel):
+    """A statement run by a profiled request"""
+
+    start_ms: float  # since the request started
+    duration_ms: float
+    thread: str
+    statement: str
+    parameters: Any  # names and types, not values
+    canceled: bool = False
+
+
+class RequestProfilePublic(SQLModel):
+    """
+    Where one request spent its time. ``stacks`` are collapsed stack lines
+    ("root;caller;callee count"), ready for flamegraph.pl or speedscope.
+    """
+
+    id: uuid.UUID
+    method: str
+    path: str
+    route: str | None
+    organization_id: uuid.UUID
+    started_at: datetime
+    duration_ms: float
+    sample_interval_ms: float
+    samples: int
+    stacks: list[str]
+    queries: list[ProfileQuery]
+
+
 # ============================================================================
 # GENERIC MODELS
 # ============================================================================
@@ -0,0 +1,161 @@
+"""
+Benchmark async routes against sync equivalents at equal worker count.
+
+Usage:
+    python scripts/benchmark_async.py [--concurrency 200] [--requests 2000]
+
+Runs the app in one process (one worker) and fires --concurrency requests at
+a time at GET /dashboard/stats and GET /products/lookup (async, on the async
+engine) and at sync copies of the same endpoints mounted for the run (sync
+routes, the sync engine and Starlette's 40-thread pool). Prints throughput,
+latency and failed requests (e.g. 503s from pool timeouts) for each. The lookup cache is disabled so every lookup queries
+the database. Both engines share the DB_POOL_* sizing, so the comparison
+is at equal connections too; the async routes gain by not tying a thread
+to each waiting request. Populate the organization first, e.g. with
+scripts/seed_demo_data.py.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any
+
+import httpx
+from sqlmodel import select
+
+from app import crud
+from app.api.deps import CurrentOrganization, CurrentPrincipal, ReadSessionDep
+from app.core.config import settings
+from app.core.db import async_engine, engine
+from app.main import app
+from app.models import Product
+
+# Plain report lines; force replaces the setup app.utils does on import
+logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+logger = logging.getLogger(__name__)
+# httpx would log every request
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _mount_sync_copies() -> None:
+    def sync_dashboard_stats(
+        session: ReadSessionDep,
+        _principal: CurrentPrincipal,
+        current_organization: CurrentOrganization,
+    ) -> Any:
+        return crud.get_dashboard_stats(
+            session=session, organization_id=current_organization
+        )
+
+    def sync_lookup(
+        session: ReadSessionDep,
+        _principal: CurrentPrincipal,
+        current_organization: CurrentOrganization,
+        sku: str,
+    ) -> Any:
+        return crud.lookup_product(
+            session=session, organization_id=current_organization, sku=sku
+        )
+
+    app.add_api_route(
+        "/bench/sync-dashboard-stats", sync_dashboard_stats, tags=["bench"]
+    )
+    app.add_api_route("/bench/sync-lookup", sync_lookup, tags=["bench"])
+
+
+async def _run(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    headers: dict[str, str],
+    params: dict[str, str],
+    concurrency: int,
+    requests: int,
+) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            r = await client.get(url, headers=headers, params=params)
+            if r.is_success:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    _mount_sync_copies()
+    crud.product_lookup_cache.clear()
+    crud.product_lookup_cache.maxsize = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=120
+    ) as client:
+        r = await client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={
+                "username": settings.FIRST_SUPERUSER,
+                "password": settings.FIRST_SUPERUSER_PASSWORD,
+            },
+        )
+        r.raise_for_status()
+        body = r.json()
+        headers = {"Authorization": f"Bearer {body['access_token']}"}
+        with engine.connect() as conn:
+            sku = conn.execute(
+                select(Product.sku)
+                .where(Product.organization_id == body["user"]["organization_id"])
+                .limit(1)
+            ).scalar_one_or_none()
+        if sku is None:
+            raise SystemExit("No product with a SKU; seed the organization first")
+
+        cases = [
+            ("dashboard async", f"{settings.API_V1_STR}/dashboard/stats", {}),
+            ("dashboard sync", "/bench/sync-dashboard-stats", {}),
+            ("lookup async", f"{settings.API_V1_STR}/products/lookup", {"sku": sku}),
+            ("lookup sync", "/bench/sync-lookup", {"sku": sku}),
+        ]
+        logger.info(
+            f"{'case':<18}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+            f"{'errors':>8}"
+        )
+        for name, url, params in cases:
+            await client.get(url, headers=headers, params=params)  # warm up
+            elapsed, latencies, errors = await _run(
+                client,
+                url,
+                headers=headers,
+                params=params,
+                concurrency=args.concurrency,
+                requests=args.requests,
+            )
+            quantiles = statistics.quantiles(latencies, n=20)
+            logger.info(
+                f"{name:<18}{len(latencies) / elapsed:>9.0f}"
+                f"{statistics.median(latencies) * 1000:>9.1f}"
+                f"{quantiles[-1] * 1000:>9.1f}{max(latencies) * 1000:>9.1f}"
+                f"{errors:>8}"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark response compression on payloads shaped like our API responses.
+
+Usage:
+    python scripts/benchmark_compression.py [--repeat 50]
+
+For each payload size it logs the compressed size and the CPU time spent
+per response for gzip and brotli at several levels, so the defaults in
+COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY / COMPRESSION_MINIMUM_SIZE
+can be checked against the bandwidth they save.
+"""
+
+import argparse
+import csv
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+from app.core.compression import compress_bytes
+from app.models import ProductPublic, ProductsPublic
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+LEVELS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 11)]
+
+WORDS = [
+    "Camiseta",
+    "Pantalón",
+    "Audífonos",
+    "Cargador",
+    "Cable",
+    "Zapatillas",
+    "Lámpara",
+    "Parlante",
+    "Funda",
+    "Mochila",
+]
+
+
+def _products_payload(count: int, rng: random.Random) -> bytes:
+    organization_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    products = [
+        ProductPublic(
+            id=uuid.uuid4(),
+            organization_id=organization_id,
+            category_id=uuid.uuid4(),
+            name=f"{rng.choice(WORDS)} {rng.choice(WORDS).lower()} {i}",
+            sku=f"SKU-{i:06d}",
+            description=" ".join(rng.choices(WORDS, k=12)),
+            cost_price=Decimal(rng.randint(1000, 90000)),
+            sale_price=Decimal(rng.randint(1000, 120000)),
+            stock_quantity=rng.randint(0, 500),
+            stock_min=5,
+            barcode=f"{rng.randrange(10**12, 10**13)}",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    return ProductsPublic(data=products, count=count).model_dump_json().encode()
+
+
+def _csv_payload(rows: int, rng: random.Random) -> bytes:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["sku", "name", "stock", "sale_price"])
+    for i in range(rows):
+        writer.writerow(
+            [f"SKU-{i:06d}", rng.choice(WORDS), rng.randint(0, 500), rng.randint(1, 9)]
+        )
+    return buffer.getvalue().encode()
+
+
+def _measure(data: bytes, encoding: str, level: int, repeat: int) -> tuple[int, float]:
+    start = time.process_time()
+    for _ in range(repeat):
+        compressed = compress_bytes(data, encoding=encoding, level=level)
+    elapsed = (time.process_time() - start) / repeat
+    return len(compressed), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    payloads = [
+        ("health-check", b"true"),
+        ("products x1", _products_payload(1, rng)),
+        ("products x10", _products_payload(10, rng)),
+        ("products x100", _products_payload(100, rng)),
+        ("products x1000", _products_payload(1000, rng)),
+        ("csv 10k rows", _csv_payload(10_000, rng)),
+    ]
+
+    logger.info(
+        f"{'payload':<16}{'bytes':>10}  {'codec':<8}{'bytes':>10}{'ratio':>8}{'cpu ms':>9}"
+    )
+    for name, data in payloads:
+        for encoding, level in LEVELS:
+            size, elapsed = _measure(data, encoding, level, args.repeat)
+            logger.info(
+                f"{name:<16}{len(data):>10}  {encoding + str(level):<8}"
+                f"{size:>10}{size / len(data):>8.2f}{elapsed * 1000:>9.3f}"
+            )
+        logger.info("")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Benchmark crud hot paths against a seeded dataset of a chosen size.
+
+Usage:
+    python scripts/benchmark_crud.py [--size 100k] [--repeat 10] [--only a,b]
+        [--save | --compare [--threshold 0.2]] [--baseline PATH]
+
+--size (1k, 100k, 1m or any count with a k/m suffix) is the number of sale
+items and of inventory movements in a dedicated "bench-<size>" organization,
+with a third as many sales, a twentieth as many products and a fiftieth as
+many customers. The organization is generated in Postgres (generate_series)
+the first time a size is used and reused afterwards.
+
+Each benchmark runs once to warm up, then --repeat times (exports a fifth
+as often), logging min, median and p95 wall time. create_sale runs the
+sales route's full flow (validation, items, stock, movements, customer
+stats) and rolls back, so the dataset does not drift between runs.
+
+--save stores the medians as the baseline for the size, by default in
+scripts/benchmark_baselines/crud-<size>.json. --compare checks against that
+baseline and exits with status 1 when any median is more than --threshold
+(a fraction) slower. Baselines only compare runs on the same machine and
+database settings.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app import crud
+from app.api.routes.dashboard import (
+    _build_customers_export,
+    _build_inventory_export,
+    _build_sales_export,
+)
+from app.api.routes.sales import _create_sale
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.models import (
+    Customer,
+    DashboardExportRequest,
+    Organization,
+    Product,
+    SaleCreate,
+    SaleItemCreate,
+    User,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+BASELINE_DIR = Path(__file__).parent / "benchmark_baselines"
+PASSWORD = "bench-password"
+SEARCH_TERM = "zapatilla"
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * factor)
+
+
+# Runs in one transaction; :org, :admin and the row counts are bound
+_SEED_SQL = """
+INSERT INTO categories (id, organization_id, name, description)
+SELECT gen_random_uuid(), :org, 'Categoría ' || i, 'Benchmark category'
+FROM generate_series(1, 10) i;
+
+CREATE TEMP TABLE bench_products ON COMMIT DROP AS
+SELECT
+    i,
+    gen_random_uuid() AS id,
+    (ARRAY['Zapatilla', 'Camiseta', 'Jean', 'Polo', 'Licuadora', 'Audífonos',
+           'Cargador', 'Lámpara', 'Galletas', 'Jugo'])[1 + i % 10]
+        || ' ' || (ARRAY['Azul', 'Negro', 'Rojo', 'Blanco', 'Verde', 'Gris',
+                         'Pro', 'Básico'])[1 + (i / 10) % 8]
+        || ' ' || i AS name,
+    'BENCH-' || i AS sku,
+    round((5 + random() * 300)::numeric, 2) AS price
+FROM generate_series(1, :products) i;
+
+INSERT INTO products (
+    id, organization_id, category_id, name, sku, description, cost_price,
+    sale_price, stock_quantity, stock_min, unit, barcode, is_active, created_at
+)
+SELECT
+    p.id, :org, c.id, p.name, p.sku, 'Producto de prueba ' || p.name, round(p.price * 0.6, 2),
+    p.price, 1000000, 10 + p.i % 40, 'unit', '775' || lpad(p.i::text, 10, '0'),
+    p.i % 25 <> 0, now() - (p.i % 700) * interval '1 day'
+FROM bench_products p
+JOIN (
+    SELECT id, row_number() OVER (ORDER BY name) % 10 AS n FROM categories
+    WHERE organization_id = :org
+) c ON c.n = p.i % 10;
+
+CREATE TEMP TABLE bench_customers ON COMMIT DROP AS
+SELECT i, gen_random_uuid() AS id FROM generate_series(1, :customers) i;
+
+INSERT INTO customers (
+    id, organization_id, document_type, document_number, first_name,
+    last_name, email, phone, city, country, created_at
+)
+SELECT
+    c.id, :org, 'DNI', lpad(c.i::text, 8, '0'),
+    (ARRAY['Carlos', 'María', 'José', 'Ana', 'Luis', 'Rosa'])[1 + c.i % 6],
+    (ARRAY['Mendoza', 'García', 'Ramírez', 'Torres', 'Chávez'])[1 + c.i % 5]
+        || ' ' || c.i,
+    'cliente' || c.i || '@example.com', '+51 9' || lpad(c.i::text, 8, '0'),
+    'Lima', 'Perú', now() - (c.i % 700) * interval '1 day'
+FROM bench_customers c;
+
+CREATE TEMP TABLE bench_sales ON COMMIT DROP AS
+SELECT
+    i,
+    gen_random_uuid() AS id,
+    now() - (random() * 365) * interval '1 day' AS sale_date,
+    CASE WHEN i % 20 = 0 THEN 'cancelled' ELSE 'completed' END AS status
+FROM generate_series(1, :sales) i;
+
+INSERT INTO sales (
+    id, organization_id, customer_id, user_id, invoice_number, sale_date,
+    payment_method, status, created_at, updated_at
+)
+SELECT
+    s.id, :org, c.id, :admin, 'INV-' || lpad(s.i::text, greatest(6, length(s.i::text)), '0'),
+    s.sale_date, (ARRAY['cash', 'card', 'transfer'])[1 + s.i % 3], s.status,
+    s.sale_date, s.sale_date
+FROM bench_sales s
+JOIN bench_customers c ON c.i = 1 + s.i % :customers;
+
+INSERT INTO sale_items (
+    id, sale_id, product_id, product_name, product_sku, quantity, unit_price,
+    subtotal, created_at
+)
+SELECT
+    gen_random_uuid(), s.id, p.id, p.name, p.sku, 1 + n % 4, p.price,
+    p.price * (1 + n % 4), s.sale_date
+FROM generate_series(1, :items) n
+JOIN bench_sales s ON s.i = 1 + n % :sales
+JOIN bench_products p ON p.i = 1 + (n::bigint * 7919) % :products;
+
+UPDATE sales SET subtotal = t.subtotal, tax = round(t.subtotal * 0.18, 2),
+    total = t.subtotal + round(t.subtotal * 0.18, 2)
+FROM (
+    SELECT sale_id, sum(subtotal) AS subtotal FROM sale_items
+    JOIN bench_sales s ON s.id = sale_id GROUP BY sale_id
+) t
+WHERE sales.id = t.sale_id;
+
+INSERT INTO inventory_movements (
+    id, organization_id, product_id, user_id, movement_type, quantity,
+    previous_stock, new_stock, reference_type, reason, created_at
+)
+SELECT
+    gen_random_uuid(), :org, p.id, :admin, 'sale', -(1 + n % 4),
+    1000000 + 1 + n % 4, 1000000, 'sale', 'Benchmark movement',
+    now() - (n % 365) * interval '1 day' - (n % 86400) * interval '1 second'
+FROM generate_series(1, :items) n
+JOIN bench_products p ON p.i = 1 + (n::bigint * 104729) % :products;
+
+UPDATE customers SET purchases_count = t.n, total_purchases = t.total,
+    last_purchase_at = t.last
+FROM (
+    SELECT customer_id, count(*) AS n, sum(total) AS total,
+        max(sale_date) AS last
+    FROM sales WHERE organization_id = :org AND status = 'completed'
+    GROUP BY customer_id
+) t
+WHERE customers.id = t.customer_id;
+"""
+
+
+@dataclass
+class Dataset:
+    organization_id: uuid.UUID
+    admin: User
+    product_ids: list[uuid.UUID]
+    customer_id: uuid.UUID
+    rows: int
+
+
+def ensure_dataset(rows: int, label: str) -> Dataset:
+    slug = f"bench-{label}"
+    with Session(engine) as session:
+        org = session.exec(
+            select(Organization).where(Organization.slug == slug)
+        ).first()
+        if org is None:
+            logger.info(f"Seeding {slug} ({rows} sale items and movements)...")
+            started = time.perf_counter()
+            _seed(session, slug=slug, rows=rows)
+            logger.info(f"Seeded in {time.perf_counter() - started:.1f} s")
+            org = session.exec(
+                select(Organization).where(Organization.slug == slug)
+            ).one()
+        admin = session.exec(select(User).where(User.organization_id == org.id)).one()
+        product_ids = list(
+            session.exec(
+                select(Product.id)
+                .where(Product.organization_id == org.id)
+                .where(Product.is_active)
+                .order_by(Product.sku)
+                .limit(3)
+            ).all()
+        )
+        customer_id = session.exec(
+            select(Customer.id).where(Customer.organization_id == org.id).limit(1)
+        ).one()
+        return Dataset(org.id, admin, product_ids, customer_id, rows)
+
+
+def _seed(session: Session, *, slug: str, rows: int) -> None:
+    org = Organization(name=f"Benchmark {slug}", slug=slug)
+    session.add(org)
+    session.flush()
+    admin_role = crud.get_role_by_name(session=session, name="admin")
+    if admin_role is None:
+        raise SystemExit("Roles not found; run the migrations first")
+    admin = User(
+        organization_id=org.id,
+        role_id=admin_role.id,
+        email=f"admin@{slug}.example.com",
+        hashed_password=get_password_hash(PASSWORD),
+        first_name="Bench",
+        last_name="Admin",
+        is_active=True,
+        is_verified=True,
+    )
+    session.add(admin)
+    session.flush()
+    counts = {
+        "products": max(rows // 20, 50),
+        "customers": max(rows // 50, 20),
+        "sales": max(rows // 3, 1),
+        "items": rows,
+    }
+    connection = session.connection()
+    for statement in _SEED_SQL.split(";\n"):
+        if statement.strip():
+            connection.execute(
+                text(statement), {"org": org.id, "admin": admin.id, **counts}
+            )
+    session.commit()
+    for table in (
+        "products",
+        "customers",
+        "sales",
+        "sale_items",
+        "inventory_movements",
+    ):
+        session.execute(text(f"ANALYZE {table}"))
+    session.commit()
+
+
+def _benchmarks(data: Dataset) -> dict[str, Callable[[Session], Any]]:
+    org = data.organization_id
+    sale_in = SaleCreate(
+        customer_id=data.customer_id,
+        items=[SaleItemCreate(product_id=pid, quantity=1) for pid in data.product_ids],
+    )
+    deep_offset = max(data.rows * 9 // 10 - 100, 0)
+
+    def export(builder: Callable[..., Any], dataset: str) -> Callable[[Session], Any]:
+        payload = DashboardExportRequest(dataset=dataset)
+        return lambda s: builder(session=s, organization_id=org, payload=payload)
+
+    return {
+        "create_sale": lambda s: _create_sale(
+            s, organization_id=org, user_id=data.admin.id, sale_in=sale_in
+        ),
+        "dashboard_stats": lambda s: crud.get_dashboard_stats(
+            session=s, organization_id=org
+        ),
+        "product_search": lambda s: crud.get_products_by_organization(
+            session=s, organization_id=org, search=SEARCH_TERM, limit=50
+        ),
+        "movements_deep_page": lambda s: crud.get_movements_by_organization(
+            session=s, organization_id=org, skip=deep_offset, limit=100
+        ),
+        "export_inventory": export(_build_inventory_export, "inventory"),
+        "export_customers": export(_build_customers_export, "customers"),
+        "export_sales": export(_build_sales_export, "sales"),
+        "authenticate": lambda s: crud.authenticate(
+            session=s, email=data.admin.email, password=PASSWORD
+        ),
+    }
+
+
+def _time(func: Callable[[Session], Any], repeat: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat + 1):  # the first run warms caches and is dropped
+        with Session(engine) as session:
+            started = time.perf_counter()
+            func(session)
+            timings.append(time.perf_counter() - started)
+            session.rollback()
+    return timings[1:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="100k")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="store a new baseline")
+    mode.add_argument("--compare", action="store_true", help="check the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--baseline", type=Path)
+    args = parser.parse_args()
+    # Seeding and exports would flood the slow query log
+    settings.DB_SLOW_QUERY_MS = None
+
+    label = args.size.strip().lower()
+    baseline_path = args.baseline or BASELINE_DIR / f"crud-{label}.json"
+    data = ensure_dataset(parse_size(args.size), label)
+    benchmarks = _benchmarks(data)
+    if args.only:
+        names = args.only.split(",")
+        unknown = set(names) - benchmarks.keys()
+        if unknown:
+            raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        benchmarks = {name: benchmarks[name] for name in names}
+    baseline: dict[str, Any] = {}
+    if args.compare:
+        if not baseline_path.exists():
+            raise SystemExit(f"No baseline at {baseline_path}; run with --save first")
+        baseline = json.loads(baseline_path.read_text())["medians_ms"]
+
+    header = f"{'benchmark':<22}{'min ms':>10}{'median ms':>11}{'p95 ms':>10}"
+    logger.info(header + (f"{'baseline':>10}{'change':>9}" if args.compare else ""))
+    medians: dict[str, float] = {}
+    regressions: list[str] = []
+    for name, func in benchmarks.items():
+        repeat = max(args.repeat // 5, 2) if name.startswith("export_") else args.repeat
+        timings = [t * 1000 for t in _time(func, repeat)]
+        median = medians[name] = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else median
+        line = f"{name:<22}{min(timings):>10.2f}{median:>11.2f}{p95:>10.2f}"
+        if args.compare and name in baseline:
+            change = median / baseline[name] - 1
+            line += f"{baseline[name]:>10.2f}{change:>+9.0%}"
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        logger.info(line)
+
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        saved = (
+            json.loads(baseline_path.read_text())["medians_ms"]
+            if baseline_path.exists()
+            else {}
+        )
+        baseline_path.write_text(
+            json.dumps(
+                {
+                    "size": label,
+                    "rows": data.rows,
+                    "python": platform.python_version(),
+                    "medians_ms": {**saved, **medians},
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        logger.info(f"Baseline saved to {baseline_path}")
+    if regressions:
+        raise SystemExit(
+            f"Slower than baseline by over {args.threshold:.0%}: "
+            + ", ".join(regressions)
+        )
+
+
+if __name__ == "__main__":
+    main()
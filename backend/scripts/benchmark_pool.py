@@ -0,0 +1,110 @@
+"""
+Load-test connection pool sizes against the sizing formula in Settings.
+
+Usage:
+    python scripts/benchmark_pool.py [--threads 40] [--seconds 10] [--db-ms 20]
+        [--sizes 2,5,10,20] [--overflow 10]
+
+Simulates one worker process: --threads request threads (Starlette's
+threadpool holds 40) each loop checking out a connection, spending --db-ms
+in Postgres (pg_sleep) and releasing it. For every pool size it logs
+throughput, latency, time spent waiting for a connection, pool timeouts and
+the peak number of connections in use.
+
+Little's law gives the connections a worker keeps busy:
+    connections = request rate * DB time per request
+Once DB_POOL_SIZE reaches that figure checkout waits drop to ~0 and more
+connections add nothing; below it, requests queue on the pool. Multiply
+DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW
+by the number of workers and check the total against Postgres
+max_connections (see the formula in app/core/config.py).
+"""
+
+import argparse
+import logging
+import statistics
+import threading
+import time
+
+from sqlalchemy import exc, text
+
+from app.core.config import settings
+from app.core.db import PoolMetrics, make_engine
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def _run(
+    *, pool_size: int, overflow: int, threads: int, seconds: float, db_ms: float
+) -> None:
+    settings.DB_POOL_SIZE = pool_size
+    settings.DB_MAX_OVERFLOW = overflow
+    engine = make_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    metrics = PoolMetrics(engine)
+    latencies: list[float] = []
+    waits: list[float] = []
+    timeouts = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker() -> None:
+        nonlocal timeouts
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    checked_out = time.perf_counter()
+                    conn.execute(text("SELECT pg_sleep(:s)"), {"s": db_ms / 1000})
+            except exc.TimeoutError:
+                with lock:
+                    timeouts += 1
+                continue
+            end = time.perf_counter()
+            with lock:
+                waits.append(checked_out - start)
+                latencies.append(end - start)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    engine.dispose()
+
+    def p95(values: list[float]) -> float:
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) > 1 else 0
+
+    logger.info(
+        f"{pool_size:>5}{overflow:>9}{len(latencies) / seconds:>9.0f}"
+        f"{statistics.median(latencies) * 1000 if latencies else 0:>9.1f}"
+        f"{p95(latencies):>9.1f}{p95(waits):>10.1f}{timeouts:>9}"
+        f"{metrics.peak_checked_out:>7}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--db-ms", type=float, default=20)
+    parser.add_argument("--sizes", default="2,5,10,20")
+    parser.add_argument("--overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    args = parser.parse_args()
+
+    logger.info(
+        f"{'pool':>5}{'overflow':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'wait p95':>10}{'timeouts':>9}{'peak':>7}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        _run(
+            pool_size=size,
+            overflow=args.overflow,
+            threads=args.threads,
+            seconds=args.seconds,
+            db_ms=args.db_ms,
+        )
+
+
+if __name__ == "__main__":
+    main()
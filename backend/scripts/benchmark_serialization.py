@@ -0,0 +1,113 @@
+"""
+Benchmark the fast JSON path of the list endpoints against the default path.
+
+Usage:
+    python scripts/benchmark_serialization.py [--requests 50] [--limit 100]
+
+Runs GET /products/ and GET /sales/ in-process as the first superuser, once
+with FAST_JSON_LIST_ENDPOINTS off (ORM objects validated into the response
+model) and once with it on (column tuples encoded with orjson). Both paths
+must return the same JSON. Populate the organization first, e.g. with
+scripts/seed_demo_data.py, so pages are full.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import time
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+# Plain report lines; force replaces the setup app.utils does on import
+logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+logger = logging.getLogger(__name__)
+# httpx would log every request
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+ENDPOINTS = ["/products/", "/sales/"]
+
+
+def _login(client: TestClient) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _run(
+    client: TestClient,
+    path: str,
+    *,
+    headers: dict[str, str],
+    params: dict[str, str | int],
+    requests: int,
+    fast: bool,
+) -> tuple[list[float], bytes]:
+    settings.FAST_JSON_LIST_ENDPOINTS = fast
+    url = f"{settings.API_V1_STR}{path}"
+    body = client.get(url, headers=headers, params=params).content  # warm up
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        r = client.get(url, headers=headers, params=params)
+        timings.append(time.perf_counter() - start)
+        r.raise_for_status()
+    return timings, body
+
+
+def _normalized(body: bytes) -> Any:
+    # Sale items have no defined order on the default path
+    page = json.loads(body)
+    for row in page["data"]:
+        if "items" in row:
+            row["items"].sort(key=lambda item: item["id"])
+    return page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    # Identity encoding keeps compression out of the measurement
+    params: dict[str, str | int] = {"limit": args.limit, "include_count": "false"}
+    with TestClient(app) as client:
+        headers = {**_login(client), "Accept-Encoding": "identity"}
+        logger.info(
+            f"{'endpoint':<12}{'path':<9}{'rows':>6}{'bytes':>10}{'p50 ms':>9}{'mean ms':>9}"
+        )
+        for path in ENDPOINTS:
+            results = {}
+            for fast in (False, True):
+                timings, body = _run(
+                    client,
+                    path,
+                    headers=headers,
+                    params=params,
+                    requests=args.requests,
+                    fast=fast,
+                )
+                results[fast] = body
+                rows = len(json.loads(body)["data"])
+                logger.info(
+                    f"{path:<12}{'fast' if fast else 'default':<9}{rows:>6}"
+                    f"{len(body):>10}{statistics.median(timings) * 1000:>9.2f}"
+                    f"{statistics.fmean(timings) * 1000:>9.2f}"
+                )
+            if _normalized(results[False]) != _normalized(results[True]):
+                logger.warning(f"{path} payloads differ between paths")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Load-test the running API with weighted, realistic scenarios.
+
+Usage:
+    python scripts/load_test.py [--base-url http://localhost:8000]
+        [--tills 200] [--managers 10] [--duration 60] [--ramp-up 10]
+        [--till-think 2] [--manager-think 5] [--restock 100000]
+
+Runs against the local compose stack and the data scripts/seed_demo_data.py
+creates in the default organization. Tills log in as its sellers and loop
+over checkout (search, then a sale), plain product searches, cancelling one
+of their own recent sales and logging in again. Managers log in as the
+superuser and mostly poll the dashboard, now and then exporting a dataset.
+Each virtual user waits a random think time (exponential, mean --*-think
+seconds) between scenarios.
+
+Before the run every product is topped up to --restock units through
+inventory movements, so checkouts do not fail for lack of stock. At the end
+it logs throughput, p50/p95/p99 latency and the error rate per endpoint,
+and which statuses the errors were.
+
+The compose override runs one reloading worker; to load the four-worker
+image, drop the backend "command" from compose.override.yml. Login
+throttling (LOGIN_IP_PER_MINUTE, LOGIN_EMAIL_PER_MINUTE) applies to the
+run's logins, which all come from one address; raise it in .env or expect
+429s on the login endpoint.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from seed_demo_data import PRODUCTS, SELLER_PASSWORD, SELLER_USERS
+
+from app.core.config import settings
+
+# Plain report lines; force replaces the setup seed_demo_data already did
+logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+logger = logging.getLogger(__name__)
+# seed_demo_data logs at INFO; httpx would log every request
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+API = settings.API_V1_STR
+# First word of each seeded product name, e.g. "iPhone", "Camiseta"
+SEARCH_TERMS = sorted({name.split()[0] for name, *_ in PRODUCTS})
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, Counter[str]] = field(
+        default_factory=lambda: defaultdict(Counter)
+    )
+
+    def record(self, endpoint: str, seconds: float, error: str | None) -> None:
+        self.latencies[endpoint].append(seconds)
+        if error is not None:
+            self.errors[endpoint][error] += 1
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    stats: Stats
+    email: str
+    password: str
+    token: str
+    products: list[dict[str, Any]]
+    customers: list[str]
+    recent_sales: list[str] = field(default_factory=list)
+
+    async def request(
+        self, endpoint: str, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response | None:
+        """Send a request, timed under ``endpoint``; None if it failed"""
+        headers = {"Authorization": f"Bearer {self.token}"}
+        started = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as exc:
+            self.stats.record(
+                endpoint, time.perf_counter() - started, type(exc).__name__
+            )
+            return None
+        error = str(r.status_code) if r.status_code >= 400 else None
+        self.stats.record(endpoint, time.perf_counter() - started, error)
+        return r if error is None else None
+
+
+async def login(vu: VirtualUser) -> None:
+    r = await vu.request(
+        "POST /login/access-token",
+        "POST",
+        f"{API}/login/access-token",
+        data={"username": vu.email, "password": vu.password},
+    )
+    if r is not None:
+        vu.token = r.json()["access_token"]
+
+
+async def search_products(vu: VirtualUser) -> list[dict[str, Any]]:
+    r = await vu.request(
+        "GET /products/?search",
+        "GET",
+        f"{API}/products/",
+        params={"search": random.choice(SEARCH_TERMS), "limit": 20},
+    )
+    return r.json()["data"] if r is not None else []
+
+
+async def checkout(vu: VirtualUser) -> None:
+    found = [p for p in await search_products(vu) if p["is_active"]]
+    choices = random.sample(vu.products, k=min(random.randint(1, 3), len(vu.products)))
+    if found:
+        choices[0] = random.choice(found)
+    items = {p["id"]: random.randint(1, 3) for p in choices}
+    r = await vu.request(
+        "POST /sales/",
+        "POST",
+        f"{API}/sales/",
+        json={
+            "items": [{"product_id": pid, "quantity": q} for pid, q in items.items()],
+            "customer_id": (
+                random.choice(vu.customers)
+                if vu.customers and random.random() < 0.6
+                else None
+            ),
+            "payment_method": random.choice(["cash", "card", "transfer"]),
+        },
+    )
+    if r is not None:
+        vu.recent_sales = [*vu.recent_sales[-9:], r.json()["id"]]
+
+
+async def cancel_sale(vu: VirtualUser) -> None:
+    if not vu.recent_sales:
+        return
+    sale_id = vu.recent_sales.pop(random.randrange(len(vu.recent_sales)))
+    await vu.request(
+        "POST /sales/{id}/cancel",
+        "POST",
+        f"{API}/sales/{sale_id}/cancel",
+        json={"reason": "Load test"},
+    )
+
+
+async def poll_dashboard(vu: VirtualUser) -> None:
+    await vu.request("GET /dashboard/stats", "GET", f"{API}/dashboard/stats")
+
+
+async def export(vu: VirtualUser) -> None:
+    await vu.request(
+        "POST /dashboard/export-excel",
+        "POST",
+        f"{API}/dashboard/export-excel",
+        json={"dataset": random.choice(["inventory", "customers", "sales"])},
+    )
+
+
+async def product_search(vu: VirtualUser) -> None:
+    await search_products(vu)
+
+
+Scenario = Callable[[VirtualUser], Awaitable[Any]]
+
+# (scenario, weight) for each kind of user
+TILL_SCENARIOS: list[tuple[Scenario, int]] = [
+    (checkout, 70),
+    (product_search, 20),
+    (cancel_sale, 5),
+    (login, 5),
+]
+MANAGER_SCENARIOS: list[tuple[Scenario, int]] = [
+    (poll_dashboard, 85),
+    (export, 10),
+    (login, 5),
+]
+
+
+async def run_user(
+    vu: VirtualUser,
+    scenarios: list[tuple[Scenario, int]],
+    *,
+    start_after: float,
+    deadline: float,
+    think: float,
+) -> None:
+    await asyncio.sleep(start_after)
+    funcs = [s for s, _ in scenarios]
+    weights = [w for _, w in scenarios]
+    while time.monotonic() < deadline:
+        await random.choices(funcs, weights)[0](vu)
+        await asyncio.sleep(random.expovariate(1 / think) if think > 0 else 0)
+
+
+async def _token(client: httpx.AsyncClient, email: str, password: str) -> str:
+    r = await client.post(
+        f"{API}/login/access-token", data={"username": email, "password": password}
+    )
+    if r.status_code != 200:
+        raise SystemExit(f"Login as {email} failed ({r.status_code}): {r.text}")
+    return str(r.json()["access_token"])
+
+
+async def _prepare(
+    client: httpx.AsyncClient, admin_token: str, restock: int
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Seeded products (topped up to ``restock``) and customer ids"""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    r = await client.get(
+        f"{API}/products/", headers=headers, params={"limit": 1000, "is_active": True}
+    )
+    r.raise_for_status()
+    products = r.json()["data"]
+    if not products:
+        raise SystemExit("No products; run scripts/seed_demo_data.py first")
+    for product in products:
+        if product["stock_quantity"] < restock:
+            r = await client.post(
+                f"{API}/inventory-movements/",
+                headers=headers,
+                json={
+                    "product_id": product["id"],
+                    "movement_type": "purchase",
+                    "quantity": restock - product["stock_quantity"],
+                    "reason": "Load test restock",
+                },
+            )
+            r.raise_for_status()
+    r = await client.get(f"{API}/customers/", headers=headers, params={"limit": 1000})
+    r.raise_for_status()
+    return products, [c["id"] for c in r.json()["data"]]
+
+
+def _report(stats: Stats, elapsed: float) -> None:
+    logger.info(
+        f"\n{'endpoint':<28}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'errors':>8}"
+    )
+    total = errors = 0
+    for endpoint in sorted(stats.latencies):
+        latencies = stats.latencies[endpoint]
+        failed = sum(stats.errors[endpoint].values())
+        total += len(latencies)
+        errors += failed
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0]
+        logger.info(
+            f"{endpoint:<28}{len(latencies):>9}{len(latencies) / elapsed:>8.1f}"
+            f"{p50 * 1000:>9.0f}{p95 * 1000:>9.0f}{p99 * 1000:>9.0f}"
+            f"{failed / len(latencies):>8.1%}"
+        )
+    logger.info(
+        f"{'total':<28}{total:>9}{total / elapsed:>8.1f}{'':>27}{errors / total:>8.1%}"
+    )
+    for endpoint, counts in sorted(stats.errors.items()):
+        if not counts:
+            continue
+        detail = ", ".join(f"{status} x{n}" for status, n in counts.most_common())
+        logger.info(f"  {endpoint}: {detail}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--tills", type=int, default=200)
+    parser.add_argument("--managers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--ramp-up", type=float, default=10)
+    parser.add_argument("--till-think", type=float, default=2)
+    parser.add_argument("--manager-think", type=float, default=5)
+    parser.add_argument("--restock", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    users = args.tills + args.managers
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=60,
+        limits=httpx.Limits(max_connections=users, max_keepalive_connections=users),
+    ) as client:
+        admin = (settings.FIRST_SUPERUSER, settings.FIRST_SUPERUSER_PASSWORD)
+        admin_token = await _token(client, *admin)
+        sellers = [(s["email"], SELLER_PASSWORD) for s in SELLER_USERS]
+        seller_tokens = [await _token(client, *seller) for seller in sellers]
+        products, customers = await _prepare(client, admin_token, args.restock)
+        logger.info(
+            f"{args.tills} tills, {args.managers} managers, {args.duration:.0f} s; "
+            f"{len(products)} products, {len(customers)} customers"
+        )
+
+        stats = Stats()
+        started = time.monotonic()
+        deadline = started + args.duration
+        runs = []
+        for n in range(users):
+            is_till = n < args.tills
+            email, password = sellers[n % len(sellers)] if is_till else admin
+            vu = VirtualUser(
+                client=client,
+                stats=stats,
+                email=email,
+                password=password,
+                token=seller_tokens[n % len(sellers)] if is_till else admin_token,
+                products=products,
+                customers=customers,
+            )
+            runs.append(
+                run_user(
+                    vu,
+                    TILL_SCENARIOS if is_till else MANAGER_SCENARIOS,
+                    start_after=args.ramp_up * n / users,
+                    deadline=deadline,
+                    think=args.till_think if is_till else args.manager_think,
+                )
+            )
+        await asyncio.gather(*runs)
+        _report(stats, time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,15 +6,46 @@ Usage (via Docker Compose):
 
 This script is idempotent: it checks for existing data before inserting.
 It creates data within the "default" organization using the existing superuser.
+
+Bulk mode generates data at scale instead:
+    python scripts/seed_demo_data.py --tenants 10 [--years 2]
+        [--sales-per-day 300] [--products 500] [--customers 5000]
+        [--sellers 4] [--slug-prefix demo] [--jobs 1] [--seed 42]
+
+It creates organizations "<prefix>-001", "<prefix>-002", ... (skipping any
+that exist), each with an admin, sellers, the demo categories, --products
+variants of the demo products and --customers customers. Then it trades
+each one day by day over --years. --sales-per-day is the average over the
+last year. Volume follows the month and the weekday, grows by a yearly
+trend, and peaks at lunch and after work. A few products sell most (Zipf
+popularity), and regular customers come back. Some sales are cancelled,
+and stock is restocked when it runs low. Rows go in through COPY, one
+transaction per organization, and --jobs organizations load in parallel.
+Afterwards each organization is checked: stock must be the sum of the
+movements, and customer stats must add up their completed sales.
 """
 
+import argparse
+import heapq
 import logging
+import math
 import random
+import time
+import unicodedata
+import uuid
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from itertools import accumulate, repeat
+from typing import Any
 
+from sqlalchemy import text
 from sqlmodel import Session, select
 
+from app.core.config import settings
 from app.core.db import engine
 from app.core.security import get_password_hash
 from app.models import (
@@ -471,8 +502,16 @@ SELLER_USERS: list[dict] = [
     },
 ]
 
+SELLER_PASSWORD = "seller123"
+
 PAYMENT_METHODS = ["cash", "card", "transfer"]
 
+CANCELLATION_REASONS = [
+    "Cliente cambió de opinión",
+    "Producto defectuoso",
+    "Error en la orden",
+]
+
 
 def seed(session: Session) -> None:
     """Main seed function."""
@@ -532,7 +571,7 @@ def seed(session: Session) -> None:
             organization_id=org_id,
             role_id=seller_role.id,
             email=seller_data["email"],
-            hashed_password=get_password_hash("seller123"),
+            hashed_password=get_password_hash(SELLER_PASSWORD),
             first_name=seller_data["first_name"],
             last_name=seller_data["last_name"],
             phone=seller_data["phone"],
@@ -736,13 +775,7 @@ def seed(session: Session) -> None:
             if is_cancelled:
                 sale.cancelled_at = sale_date + timedelta(hours=random.randint(1, 4))
                 sale.cancelled_by = admin_user.id
-                sale.cancellation_reason = random.choice(
-                    [
-                        "Cliente cambió de opinión",
-                        "Producto defectuoso",
-                        "Error en la orden",
-                    ]
-                )
+                sale.cancellation_reason = random.choice(CANCELLATION_REASONS)
 
             session.add(sale)
             session.flush()
@@ -758,10 +791,7 @@ def seed(session: Session) -> None:
 
             # Create inventory movements for completed sales
             if status == "completed":
-                for item_data in items_data:
-                    prod_obj = next(
-                        p for p in product_list if p.id == item_data["product_id"]
-                    )
+                for prod_obj, item_data in zip(sale_products, items_data, strict=True):
                     prev_stock = prod_obj.stock_quantity
                     prod_obj.stock_quantity = max(
                         0, prod_obj.stock_quantity - item_data["quantity"]
@@ -838,12 +868,749 @@ def seed(session: Session) -> None:
     logger.info("Login credentials:")
     logger.info("  Admin:    admin@example.com / changethis")
     for sd in SELLER_USERS:
-        logger.info(f"  Seller:   {sd['email']} / seller123")
+        logger.info(f"  Seller:   {sd['email']} / {SELLER_PASSWORD}")
+    logger.info("=" * 60)
+
+
+# ---------------------------------------------------------------------------
+# Bulk generator (--tenants): many organizations with years of history
+# ---------------------------------------------------------------------------
+
+# Relative sales volume by month, January first: a slow start of the year,
+# Mother's Day in May, the July bonus and the Christmas peak
+MONTH_FACTORS = [0.8, 0.8, 0.9, 0.95, 1.1, 0.95, 1.2, 1.0, 0.95, 1.0, 1.15, 1.6]
+# Monday first
+WEEKDAY_FACTORS = [0.85, 0.9, 0.95, 1.0, 1.15, 1.35, 0.8]
+# Yearly growth in sales volume, so older years sell less
+YEARLY_GROWTH = 0.15
+# Opening hours (UTC) weighted by traffic, with lunchtime and after-work peaks
+SALE_HOURS = list(range(8, 22))
+SALE_HOUR_WEIGHTS = [3, 5, 6, 8, 10, 10, 7, 6, 6, 8, 10, 9, 6, 3]
+ITEM_COUNT_WEIGHTS = [35, 30, 18, 10, 7]  # 1 to 5 lines per sale
+QUANTITY_WEIGHTS = [55, 25, 12, 8]  # 1 to 4 units per line
+PAYMENT_WEIGHTS = [50, 40, 10]  # PAYMENT_METHODS
+CUSTOMER_SHARE = 0.65  # sales with a registered customer
+CANCEL_SHARE = 0.03
+# Zipf exponents: a few products and regular customers make most sales
+PRODUCT_POPULARITY = 1.1
+CUSTOMER_LOYALTY = 0.9
+# Stock kept per product, in days of its expected demand
+STOCK_MIN_DAYS = 7
+REORDER_DAYS = 30
+
+PRODUCT_VARIANTS = ["Negro", "Blanco", "Azul", "Rojo", "Gris", "Pro", "Plus", "Mini"]
+FIRST_NAMES = (
+    "Carlos María José Ana Luis Rosa Pedro Carmen Diego Sofía Jorge Lucía "
+    "Miguel Elena Raúl Patricia"
+).split()
+LAST_NAMES = (
+    "Mendoza García Ramírez Fernández Chávez Huamán Silva López Vargas Paredes "
+    "Torres Quispe Rojas Flores"
+).split()
+CITIES = ["Lima", "Arequipa", "Trujillo", "Cusco", "Piura", "Chiclayo", "Callao"]
+
+# COPY column lists, in the order of the generated rows
+PRODUCT_COLUMNS = (
+    "id, organization_id, category_id, name, sku, description, cost_price, "
+    "sale_price, stock_quantity, stock_min, unit, barcode, is_active, "
+    "created_at, updated_at"
+)
+CUSTOMER_COLUMNS = (
+    "id, organization_id, document_type, document_number, first_name, "
+    "last_name, email, phone, city, country, is_active, total_purchases, "
+    "purchases_count, created_at, updated_at"
+)
+SALE_COLUMNS = (
+    "id, organization_id, customer_id, user_id, invoice_number, sale_date, "
+    "subtotal, discount, tax, total, payment_method, status, cancelled_at, "
+    "cancelled_by, cancellation_reason, created_at, updated_at"
+)
+SALE_ITEM_COLUMNS = (
+    "id, sale_id, product_id, product_name, product_sku, quantity, unit_price, "
+    "subtotal, created_at"
+)
+MOVEMENT_COLUMNS = (
+    "id, organization_id, product_id, user_id, movement_type, quantity, "
+    "previous_stock, new_stock, reference_id, reference_type, reason, created_at"
+)
+
+
+def _money(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def _cents(amount: float) -> int:
+    return round(amount * 100)
+
+
+def _zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    """Cumulative Zipf weights over n items in random rank order"""
+    ranks = list(range(1, n + 1))
+    random.shuffle(ranks)
+    return list(accumulate(1 / rank**exponent for rank in ranks))
+
+
+def _poisson(mean: float) -> int:
+    if mean > 50:
+        return max(0, round(random.gauss(mean, math.sqrt(mean))))
+    limit, n, p = math.exp(-mean), 0, random.random()
+    while p > limit:
+        n += 1
+        p *= random.random()
+    return n
+
+
+def _ascii(value: str) -> str:
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode()
+
+
+@dataclass(eq=False)
+class BulkProduct:
+    id: uuid.UUID
+    name: str
+    sku: str
+    price: int  # cents
+    stock_min: int
+    reorder_to: int
+    stock: int = 0
+
+
+@dataclass(eq=False)
+class BulkCustomer:
+    id: uuid.UUID
+    total: int = 0  # cents, completed sales only
+    count: int = 0
+    last_purchase_at: datetime | None = None
+
+
+@dataclass
+class PendingCancel:
+    sale_id: uuid.UUID
+    invoice_number: str
+    reason: str
+    lines: list[tuple[BulkProduct, int]]
+
+
+class TenantHistory:
+    """
+    Trades one organization day by day, the way the sales routes would:
+    each sale line takes stock through a "sale" movement, cancellations
+    put it back with a "return", products at or below stock_min are
+    restocked the next morning (or right away if a sale needs more than
+    is left) and customer stats add up the completed sales. Rows are
+    buffered and COPYed a month at a time.
+    """
+
+    def __init__(
+        self,
+        cursor: Any,
+        *,
+        organization_id: uuid.UUID,
+        admin_id: uuid.UUID,
+        seller_ids: list[uuid.UUID],
+        products: list[BulkProduct],
+        customers: list[BulkCustomer],
+    ) -> None:
+        self.cursor = cursor
+        self.organization_id = organization_id
+        self.admin_id = admin_id
+        self.seller_ids = seller_ids
+        self.products = products
+        self.product_weights = _zipf_cum_weights(len(products), PRODUCT_POPULARITY)
+        self.customers = customers
+        self.customer_weights = _zipf_cum_weights(len(customers), CUSTOMER_LOYALTY)
+        self.hour_weights = list(accumulate(SALE_HOUR_WEIGHTS))
+        self.low_stock: set[BulkProduct] = set()
+        self.cancellations: list[tuple[datetime, int, PendingCancel]] = []
+        self.sales: list[tuple[Any, ...]] = []
+        self.items: list[tuple[Any, ...]] = []
+        self.movements: list[tuple[Any, ...]] = []
+        self.counts = Counter[str]()
+
+    def _move(
+        self,
+        product: BulkProduct,
+        quantity: int,
+        at: datetime,
+        *,
+        movement_type: str,
+        user_id: uuid.UUID,
+        reason: str,
+        reference_type: str,
+        reference_id: uuid.UUID | None = None,
+    ) -> None:
+        previous = product.stock
+        product.stock += quantity
+        self.counts["inventory_movements"] += 1
+        self.movements.append(
+            (
+                uuid.uuid4(),
+                self.organization_id,
+                product.id,
+                user_id,
+                movement_type,
+                quantity,
+                previous,
+                product.stock,
+                reference_id,
+                reference_type,
+                reason,
+                at,
+            )
+        )
+        if product.stock <= product.stock_min:
+            self.low_stock.add(product)
+
+    def _restock(self, product: BulkProduct, at: datetime, reason: str) -> None:
+        self._move(
+            product,
+            product.reorder_to - product.stock,
+            at,
+            movement_type="purchase",
+            user_id=self.admin_id,
+            reason=reason,
+            reference_type="purchase",
+        )
+        self.low_stock.discard(product)
+
+    def open(self, at: datetime) -> None:
+        for product in self.products:
+            self._move(
+                product,
+                product.reorder_to,
+                at,
+                movement_type="purchase",
+                user_id=self.admin_id,
+                reason="Stock inicial - Inventario de apertura",
+                reference_type="adjustment",
+            )
+
+    def _sell(self, at: datetime, invoice_number: str, latest: datetime) -> None:
+        sale_id = uuid.uuid4()
+        seller_id = random.choice(self.seller_ids)
+        count = random.choices(range(1, 6), ITEM_COUNT_WEIGHTS)[0]
+        picked = random.choices(
+            self.products, cum_weights=self.product_weights, k=count
+        )
+        lines = [
+            (product, random.choices(range(1, 5), QUANTITY_WEIGHTS)[0])
+            for product in dict.fromkeys(picked)
+        ]
+        subtotal = 0
+        for product, quantity in lines:
+            if product.stock < quantity:
+                self._restock(
+                    product,
+                    at - timedelta(microseconds=1),
+                    "Reposición urgente de inventario",
+                )
+            line_total = product.price * quantity
+            subtotal += line_total
+            self.items.append(
+                (
+                    uuid.uuid4(),
+                    sale_id,
+                    product.id,
+                    product.name,
+                    product.sku,
+                    quantity,
+                    _money(product.price),
+                    _money(line_total),
+                    at,
+                )
+            )
+            self._move(
+                product,
+                -quantity,
+                at,
+                movement_type="sale",
+                user_id=seller_id,
+                reason=f"Sale {invoice_number}",
+                reference_type="sale",
+                reference_id=sale_id,
+            )
+        discount = (subtotal * random.choice([0, 0, 0, 5, 10]) + 50) // 100
+        tax = ((subtotal - discount) * 18 + 50) // 100  # 18% IGV
+        total = subtotal - discount + tax
+        customer = (
+            random.choices(self.customers, cum_weights=self.customer_weights)[0]
+            if self.customers and random.random() < CUSTOMER_SHARE
+            else None
+        )
+        cancelled_at = reason = None
+        if random.random() < CANCEL_SHARE:
+            cancelled_at = min(at + timedelta(minutes=random.randint(5, 240)), latest)
+            reason = random.choice(CANCELLATION_REASONS)
+            cancel = PendingCancel(sale_id, invoice_number, reason, lines)
+            heapq.heappush(
+                self.cancellations, (cancelled_at, self.counts["sales"], cancel)
+            )
+        elif customer is not None:
+            customer.total += total
+            customer.count += 1
+            customer.last_purchase_at = at
+        self.sales.append(
+            (
+                sale_id,
+                self.organization_id,
+                customer.id if customer else None,
+                seller_id,
+                invoice_number,
+                at,
+                _money(subtotal),
+                _money(discount),
+                _money(tax),
+                _money(total),
+                random.choices(PAYMENT_METHODS, PAYMENT_WEIGHTS)[0],
+                "completed" if cancelled_at is None else "cancelled",
+                cancelled_at,
+                self.admin_id if cancelled_at else None,
+                reason,
+                at,
+                cancelled_at or at,
+            )
+        )
+        self.counts["sales"] += 1
+        self.counts["sale_items"] += len(lines)
+
+    def _cancel_until(self, until: datetime) -> None:
+        while self.cancellations and self.cancellations[0][0] <= until:
+            at, _, cancel = heapq.heappop(self.cancellations)
+            for product, quantity in cancel.lines:
+                self._move(
+                    product,
+                    quantity,
+                    at,
+                    movement_type="return",
+                    user_id=self.admin_id,
+                    reason=f"Sale {cancel.invoice_number} cancelled: {cancel.reason}",
+                    reference_type="sale",
+                    reference_id=cancel.sale_id,
+                )
+
+    def trade_day(self, day: datetime, sales: int, until: datetime) -> None:
+        """Restock in the morning, then ``sales`` sales (those before ``until``)"""
+        self._cancel_until(day + timedelta(hours=7))
+        for product in list(self.low_stock):
+            if product.stock > product.stock_min:
+                self.low_stock.discard(product)
+                continue
+            self._restock(
+                product,
+                day + timedelta(hours=7, seconds=random.randint(0, 3599)),
+                "Reposición de inventario",
+            )
+        seconds = sorted(
+            hour * 3600 + random.random() * 3600
+            for hour in random.choices(
+                SALE_HOURS, cum_weights=self.hour_weights, k=sales
+            )
+        )
+        for offset in seconds:
+            at = day + timedelta(seconds=offset)
+            if at > until:
+                break
+            self._cancel_until(at)
+            self._sell(at, f"INV-{self.counts['sales'] + 1:06d}", until)
+
+    def flush(self) -> None:
+        for table, columns, rows in (
+            ("sales", SALE_COLUMNS, self.sales),
+            ("sale_items", SALE_ITEM_COLUMNS, self.items),
+            ("inventory_movements", MOVEMENT_COLUMNS, self.movements),
+        ):
+            _copy(self.cursor, table, columns, rows)
+            rows.clear()
+
+    def finish(self, now: datetime) -> None:
+        """Store the final stock and customer stats"""
+        self._cancel_until(now)
+        self.flush()
+        self.cursor.execute(
+            "CREATE TEMP TABLE bulk_stock (id uuid, stock integer) ON COMMIT DROP"
+        )
+        _copy(
+            self.cursor,
+            "bulk_stock",
+            "id, stock",
+            [(p.id, p.stock) for p in self.products],
+        )
+        self.cursor.execute(
+            "UPDATE products SET stock_quantity = s.stock "
+            "FROM bulk_stock s WHERE products.id = s.id"
+        )
+        self.cursor.execute(
+            "CREATE TEMP TABLE bulk_customer_stats (id uuid, total numeric, "
+            "n integer, last timestamptz) ON COMMIT DROP"
+        )
+        _copy(
+            self.cursor,
+            "bulk_customer_stats",
+            "id, total, n, last",
+            [
+                (c.id, _money(c.total), c.count, c.last_purchase_at)
+                for c in self.customers
+                if c.count
+            ],
+        )
+        self.cursor.execute(
+            "UPDATE customers SET total_purchases = s.total, purchases_count = s.n, "
+            "last_purchase_at = s.last "
+            "FROM bulk_customer_stats s WHERE customers.id = s.id"
+        )
+
+
+def _copy(cursor: Any, table: str, columns: str, rows: Iterable[Sequence[Any]]) -> None:
+    with cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def _bulk_catalog(
+    cursor: Any,
+    *,
+    organization_id: uuid.UUID,
+    category_ids: dict[str, uuid.UUID],
+    products: int,
+    customers: int,
+    sales_per_day: float,
+    opened_at: datetime,
+) -> tuple[list[BulkProduct], list[BulkCustomer]]:
+    """COPY the products (PRODUCTS in variants) and customers, with no stock yet"""
+    now = datetime.now(timezone.utc)
+    # Expected units a day of a product with all the demand; each product's
+    # share comes from its popularity weight
+    units = (
+        sales_per_day
+        * sum(n * w for n, w in enumerate(ITEM_COUNT_WEIGHTS, 1))
+        / sum(ITEM_COUNT_WEIGHTS)
+        * sum(n * w for n, w in enumerate(QUANTITY_WEIGHTS, 1))
+        / sum(QUANTITY_WEIGHTS)
+    )
+    popularity = _zipf_cum_weights(products, PRODUCT_POPULARITY)
+    product_list: list[BulkProduct] = []
+    product_rows = []
+    previous = 0.0
+    for i, weight in enumerate(popularity):
+        name, sku, cat_path, cost, price, _, _, unit = PRODUCTS[i % len(PRODUCTS)]
+        variant = i // len(PRODUCTS)
+        if variant:
+            name = f"{name} {PRODUCT_VARIANTS[variant % len(PRODUCT_VARIANTS)]}"
+            if variant >= len(PRODUCT_VARIANTS):
+                name = f"{name} {variant // len(PRODUCT_VARIANTS) + 1}"
+        markup = random.uniform(0.85, 1.2)
+        daily = units * (weight - previous) / popularity[-1]
+        previous = weight
+        stock_min = max(5, math.ceil(daily * STOCK_MIN_DAYS))
+        product = BulkProduct(
+            id=uuid.uuid4(),
+            name=name,
+            sku=f"{sku}-{i + 1:05d}",
+            price=_cents(price * markup),
+            stock_min=stock_min,
+            reorder_to=max(2 * stock_min, math.ceil(daily * REORDER_DAYS)),
+        )
+        product_list.append(product)
+        product_rows.append(
+            (
+                product.id,
+                organization_id,
+                category_ids[cat_path[-1]],
+                product.name,
+                product.sku,
+                None,
+                _money(_cents(cost * markup)),
+                _money(product.price),
+                0,
+                product.stock_min,
+                unit,
+                f"775{i + 1:010d}",
+                True,
+                opened_at,
+                now,
+            )
+        )
+    _copy(cursor, "products", PRODUCT_COLUMNS, product_rows)
+
+    customer_list: list[BulkCustomer] = []
+    customer_rows = []
+    for i in range(customers):
+        customer = BulkCustomer(id=uuid.uuid4())
+        customer_list.append(customer)
+        first = random.choice(FIRST_NAMES)
+        last = f"{random.choice(LAST_NAMES)} {random.choice(LAST_NAMES)}"
+        email = f"{_ascii(first)}.{_ascii(last).replace(' ', '')}{i + 1}@example.com"
+        customer_rows.append(
+            (
+                customer.id,
+                organization_id,
+                "DNI",
+                f"{10_000_000 + i}",
+                first,
+                last,
+                email.lower(),
+                f"+51 9{i:08d}",
+                random.choice(CITIES),
+                "Perú",
+                True,
+                "0",
+                0,
+                opened_at,
+                now,
+            )
+        )
+    _copy(cursor, "customers", CUSTOMER_COLUMNS, customer_rows)
+    return product_list, customer_list
+
+
+# Rows that break the invariants the generator keeps: stock is the sum of the
+# product's movements, sales add up their items and customer stats add up
+# their completed sales
+_CONSISTENCY_SQL = {
+    "products whose stock is not the sum of their movements": """
+        SELECT count(*) FROM products p
+        LEFT JOIN (
+            SELECT product_id, sum(quantity) AS total FROM inventory_movements
+            WHERE organization_id = :org GROUP BY product_id
+        ) m ON m.product_id = p.id
+        WHERE p.organization_id = :org
+            AND p.stock_quantity <> coalesce(m.total, 0)
+    """,
+    "sales whose subtotal is not the sum of their items": """
+        SELECT count(*) FROM sales s
+        WHERE s.organization_id = :org AND s.subtotal <> (
+            SELECT coalesce(sum(subtotal), 0) FROM sale_items
+            WHERE sale_id = s.id
+        )
+    """,
+    "customers whose stats differ from their completed sales": """
+        SELECT count(*) FROM customers c
+        LEFT JOIN (
+            SELECT customer_id, count(*) AS n, sum(total) AS total,
+                max(sale_date) AS last
+            FROM sales
+            WHERE organization_id = :org AND status = 'completed'
+            GROUP BY customer_id
+        ) s ON s.customer_id = c.id
+        WHERE c.organization_id = :org AND (
+            c.purchases_count <> coalesce(s.n, 0)
+            OR c.total_purchases <> coalesce(s.total, 0)
+            OR c.last_purchase_at IS DISTINCT FROM s.last
+        )
+    """,
+}
+
+
+def check_tenant(session: Session, organization_id: uuid.UUID) -> bool:
+    ok = True
+    for label, sql in _CONSISTENCY_SQL.items():
+        broken = session.execute(text(sql), {"org": organization_id}).scalar_one()
+        if broken:
+            logger.error(f"  {broken} {label}")
+            ok = False
+    return ok
+
+
+def seed_tenant(
+    session: Session,
+    *,
+    slug: str,
+    password_hash: str,
+    years: float,
+    sales_per_day: float,
+    products: int,
+    customers: int,
+    sellers: int,
+) -> Counter[str] | None:
+    """Generate one organization's history; None if ``slug`` already exists"""
+    if session.exec(select(Organization).where(Organization.slug == slug)).first():
+        logger.warning(f"Organization {slug} already exists, skipping it")
+        return None
+    admin_role = session.exec(select(Role).where(Role.name == "admin")).one()
+    seller_role = session.exec(select(Role).where(Role.name == "seller")).one()
+
+    now = datetime.now(timezone.utc)
+    first_day = (now - timedelta(days=round(years * 365))).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    org = Organization(
+        name=f"Demo {slug}", slug=slug, created_at=first_day, updated_at=first_day
+    )
+    session.add(org)
+    session.flush()
+    users = [
+        User(
+            organization_id=org.id,
+            role_id=admin_role.id if n == 0 else seller_role.id,
+            email=f"admin@{slug}.example.com"
+            if n == 0
+            else f"vendedor{n}@{slug}.example.com",
+            hashed_password=password_hash,
+            first_name=random.choice(FIRST_NAMES),
+            last_name=random.choice(LAST_NAMES),
+            is_active=True,
+            is_verified=True,
+            created_at=first_day,
+        )
+        for n in range(sellers + 1)
+    ]
+    session.add_all(users)
+    category_ids: dict[str, uuid.UUID] = {}
+    for cat_data in CATEGORIES:
+        parent = Category(
+            organization_id=org.id,
+            name=cat_data["name"],
+            description=cat_data["description"],
+        )
+        session.add(parent)
+        session.flush()
+        category_ids[parent.name] = parent.id
+        for child_data in cat_data.get("children", []):
+            child = Category(
+                organization_id=org.id,
+                name=child_data["name"],
+                description=child_data["description"],
+                parent_id=parent.id,
+            )
+            session.add(child)
+            category_ids[child.name] = child.id
+    session.flush()
+
+    # COPY on the session's own connection, inside its transaction
+    cursor = session.connection().connection.driver_connection.cursor()
+    product_list, customer_list = _bulk_catalog(
+        cursor,
+        organization_id=org.id,
+        category_ids=category_ids,
+        products=products,
+        customers=customers,
+        sales_per_day=sales_per_day,
+        opened_at=first_day,
+    )
+    history = TenantHistory(
+        cursor,
+        organization_id=org.id,
+        admin_id=users[0].id,
+        seller_ids=[u.id for u in users],
+        products=product_list,
+        customers=customer_list,
+    )
+    history.open(first_day + timedelta(hours=6))
+    day = first_day
+    while day <= now:
+        # sales_per_day is the average of the last year
+        years_ago = (now - day).days // 365
+        mean = (
+            sales_per_day
+            * MONTH_FACTORS[day.month - 1]
+            * WEEKDAY_FACTORS[day.weekday()]
+            / (1 + YEARLY_GROWTH) ** years_ago
+        )
+        history.trade_day(day, _poisson(mean), now)
+        day += timedelta(days=1)
+        if day.day == 1:
+            history.flush()
+    history.finish(now)
+    session.commit()
+
+    for table in BULK_TABLES:
+        session.execute(text(f"ANALYZE {table}"))
+    session.commit()
+    if not check_tenant(session, org.id):
+        raise SystemExit(f"Generated data for {slug} is inconsistent")
+    counts = history.counts
+    counts["products"] = len(product_list)
+    counts["customers"] = len(customer_list)
+    return counts
+
+
+BULK_TABLES = ["products", "customers", "sales", "sale_items", "inventory_movements"]
+
+
+def _init_bulk_worker() -> None:
+    # Forked workers must not share the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def _seed_bulk_tenant(
+    n: int, args: argparse.Namespace, password_hash: str
+) -> tuple[str, Counter[str] | None, float]:
+    slug = f"{args.slug_prefix}-{n:03d}"
+    # Seeded per organization, so the data does not depend on --jobs
+    random.seed(f"{args.seed}-{slug}")
+    started = time.perf_counter()
+    with Session(engine) as session:
+        counts = seed_tenant(
+            session,
+            slug=slug,
+            password_hash=password_hash,
+            years=args.years,
+            sales_per_day=args.sales_per_day,
+            products=args.products,
+            customers=args.customers,
+            sellers=args.sellers,
+        )
+    return slug, counts, time.perf_counter() - started
+
+
+def seed_bulk(args: argparse.Namespace) -> None:
+    # The consistency checks scan whole organizations
+    settings.DB_SLOW_QUERY_MS = None
+    # Every generated user shares one password; hashing it once saves a
+    # second of CPU per user
+    password_hash = get_password_hash(SELLER_PASSWORD)
+    started = time.perf_counter()
+    totals = Counter[str]()
+    tenants = range(1, args.tenants + 1)
+    with ProcessPoolExecutor(
+        max_workers=args.jobs, initializer=_init_bulk_worker
+    ) as pool:
+        results = pool.map(
+            _seed_bulk_tenant, tenants, repeat(args), repeat(password_hash)
+        )
+        for slug, counts, seconds in results:
+            if counts is None:
+                continue
+            totals.update(counts)
+            logger.info(
+                f"{slug}: {counts['sales']} sales, {counts['sale_items']} items, "
+                f"{counts['inventory_movements']} movements in {seconds:.0f} s"
+            )
+
+    logger.info("=" * 60)
+    logger.info(f"BULK SEED COMPLETE in {time.perf_counter() - started:.0f} s")
+    for table in BULK_TABLES:
+        logger.info(f"  {table + ':':<21}{totals[table]}")
+    logger.info(
+        f"  Login: admin@<slug>.example.com, vendedor<n>@<slug>.example.com "
+        f"/ {SELLER_PASSWORD}"
+    )
     logger.info("=" * 60)
 
 
 def main() -> None:
-    random.seed(42)  # Reproducible results
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--tenants",
+        type=int,
+        default=0,
+        help="generate this many organizations instead of the demo data",
+    )
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--sales-per-day", type=float, default=300)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--sellers", type=int, default=4)
+    parser.add_argument("--slug-prefix", default="demo")
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="organizations generated in parallel"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)  # Reproducible results
+    if args.tenants:
+        seed_bulk(args)
+        return
     with Session(engine) as session:
         seed(session)
 
@@ -5,7 +5,7 @@ from sqlmodel import Session
 
 from app.core.config import settings
 from tests.utils.category import create_random_category
-from tests.utils.utils import random_lower_string
+from tests.utils.utils import assert_max_queries, random_lower_string
 
 
 # ---------------------------------------------------------------------------
@@ -18,10 +18,11 @@ def test_read_categories(
 ) -> None:
     create_random_category(db)
     create_random_category(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/categories/",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/categories/",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -53,11 +54,12 @@ def test_create_category(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     name = f"Cat-{random_lower_string()[:16]}"
-    r = client.post(
-        f"{settings.API_V1_STR}/categories/",
-        headers=superuser_token_headers,
-        json={"name": name, "description": "A test category"},
-    )
+    with assert_max_queries(7):
+        r = client.post(
+            f"{settings.API_V1_STR}/categories/",
+            headers=superuser_token_headers,
+            json={"name": name, "description": "A test category"},
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["name"] == name
@@ -151,10 +153,11 @@ def test_read_category_by_id(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     category = create_random_category(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/categories/{category.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/categories/{category.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["id"] == str(category.id)
@@ -181,11 +184,12 @@ def test_update_category(
 ) -> None:
     category = create_random_category(db)
     new_name = f"Updated-{random_lower_string()[:16]}"
-    r = client.patch(
-        f"{settings.API_V1_STR}/categories/{category.id}",
-        headers=superuser_token_headers,
-        json={"name": new_name, "description": "Updated description"},
-    )
+    with assert_max_queries(8):
+        r = client.patch(
+            f"{settings.API_V1_STR}/categories/{category.id}",
+            headers=superuser_token_headers,
+            json={"name": new_name, "description": "Updated description"},
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["name"] == new_name
@@ -237,10 +241,11 @@ def test_delete_category(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     category = create_random_category(db)
-    r = client.delete(
-        f"{settings.API_V1_STR}/categories/{category.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(7):
+        r = client.delete(
+            f"{settings.API_V1_STR}/categories/{category.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     assert r.json()["message"] == "Category deleted successfully"
 
@@ -10,10 +10,10 @@ from tests.utils.user import (
     _get_role_id,
     user_authentication_headers,
 )
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 from app import crud
-from app.models import UserCreate
+from app.models import CustomerUpdate, UserCreate
 
 
 def _create_seller_headers(client: TestClient, db: Session) -> dict[str, str]:
@@ -43,10 +43,11 @@ def test_read_customers(
 ) -> None:
     create_random_customer(db)
     create_random_customer(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/customers/",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/customers/",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -78,18 +79,19 @@ def test_create_customer(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     doc_number = f"DOC-{random_lower_string()[:16]}"
-    r = client.post(
-        f"{settings.API_V1_STR}/customers/",
-        headers=superuser_token_headers,
-        json={
-            "document_type": "DNI",
-            "document_number": doc_number,
-            "first_name": "Juan",
-            "last_name": "Pérez",
-            "email": "juan@example.com",
-            "phone": "555-0100",
-        },
-    )
+    with assert_max_queries(7):
+        r = client.post(
+            f"{settings.API_V1_STR}/customers/",
+            headers=superuser_token_headers,
+            json={
+                "document_type": "DNI",
+                "document_number": doc_number,
+                "first_name": "Juan",
+                "last_name": "Pérez",
+                "email": "juan@example.com",
+                "phone": "555-0100",
+            },
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["document_number"] == doc_number
@@ -162,14 +164,49 @@ def test_read_customer_by_id(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     customer = create_random_customer(db)
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/customers/{customer.id}",
+            headers=superuser_token_headers,
+        )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["id"] == str(customer.id)
+    assert data["document_number"] == customer.document_number
+
+
+def test_read_customer_sparse_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    customer = create_random_customer(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers=superuser_token_headers,
+        params={"fields": "first_name,last_name", "search": customer.document_number},
+    )
+    assert r.status_code == 200
+    assert r.json()["data"] == [
+        {
+            "id": str(customer.id),
+            "first_name": customer.first_name,
+            "last_name": customer.last_name,
+        }
+    ]
+
     r = client.get(
         f"{settings.API_V1_STR}/customers/{customer.id}",
         headers=superuser_token_headers,
+        params={"fields": "email"},
     )
     assert r.status_code == 200
-    data = r.json()
-    assert data["id"] == str(customer.id)
-    assert data["document_number"] == customer.document_number
+    assert r.json() == {"id": str(customer.id), "email": customer.email}
+
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/{customer.id}",
+        headers=superuser_token_headers,
+        params={"fields": "password"},
+    )
+    assert r.status_code == 400
 
 
 def test_read_customer_not_found(
@@ -191,11 +228,12 @@ def test_update_customer(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     customer = create_random_customer(db)
-    r = client.patch(
-        f"{settings.API_V1_STR}/customers/{customer.id}",
-        headers=superuser_token_headers,
-        json={"first_name": "Updated", "last_name": "Name"},
-    )
+    with assert_max_queries(7):
+        r = client.patch(
+            f"{settings.API_V1_STR}/customers/{customer.id}",
+            headers=superuser_token_headers,
+            json={"first_name": "Updated", "last_name": "Name"},
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["first_name"] == "Updated"
@@ -262,10 +300,11 @@ def test_delete_customer(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     customer = create_random_customer(db)
-    r = client.delete(
-        f"{settings.API_V1_STR}/customers/{customer.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(7):
+        r = client.delete(
+            f"{settings.API_V1_STR}/customers/{customer.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     assert r.json()["message"] == "Customer deleted successfully"
 
@@ -309,3 +348,39 @@ def test_delete_customer_forbidden_seller(
         headers=headers,
     )
     assert r.status_code == 403
+
+
+# ---------------------------------------------------------------------------
+# GET /customers/search
+# ---------------------------------------------------------------------------
+
+
+def test_search_customers_by_full_name(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    customer = create_random_customer(db)
+    last_name = f"Search{random_lower_string()[:12]}"
+    crud.update_customer(
+        session=db,
+        db_customer=customer,
+        customer_in=CustomerUpdate(first_name="Ana María", last_name=last_name),
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/search",
+        headers=superuser_token_headers,
+        params={"q": f"maría  {last_name}"},
+    )
+    assert r.status_code == 200
+    assert [item["id"] for item in r.json()["data"]] == [str(customer.id)]
+
+
+def test_search_customers_by_document(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    customer = create_random_customer(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/search",
+        headers=superuser_token_headers,
+        params={"q": customer.document_number},
+    )
+    assert r.json()["data"][0]["id"] == str(customer.id)
@@ -11,7 +11,7 @@ from tests.utils.user import (
     _get_role_id,
     user_authentication_headers,
 )
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 
 def _create_seller_headers(client: TestClient, db: Session) -> dict[str, str]:
@@ -69,10 +69,11 @@ def test_read_dashboard_stats(
 ) -> None:
     """Admin can read dashboard stats."""
     create_random_sale(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/dashboard/stats",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(8):
+        r = client.get(
+            f"{settings.API_V1_STR}/dashboard/stats",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     # Verify top-level structure
@@ -206,14 +207,15 @@ def test_export_dashboard_excel_inventory_admin(
 ) -> None:
     create_random_product(db)
 
-    r = client.post(
-        f"{settings.API_V1_STR}/dashboard/export-excel",
-        headers=superuser_token_headers,
-        json={
-            "dataset": "inventory",
-            "timezone": "America/Bogota",
-        },
-    )
+    with assert_max_queries(5):
+        r = client.post(
+            f"{settings.API_V1_STR}/dashboard/export-excel",
+            headers=superuser_token_headers,
+            json={
+                "dataset": "inventory",
+                "timezone": "America/Bogota",
+            },
+        )
 
     assert r.status_code == 200
     assert r.headers["content-type"].startswith(
@@ -13,7 +13,7 @@ from tests.utils.user import (
     _get_role_id,
     user_authentication_headers,
 )
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 
 def _create_seller_headers(client: TestClient, db: Session) -> dict[str, str]:
@@ -42,10 +42,11 @@ def test_read_movements(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     create_random_movement(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/inventory-movements/",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/inventory-movements/",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -76,16 +77,17 @@ def test_create_movement_purchase(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     product = create_random_product(db, stock_quantity=50)
-    r = client.post(
-        f"{settings.API_V1_STR}/inventory-movements/",
-        headers=superuser_token_headers,
-        json={
-            "product_id": str(product.id),
-            "movement_type": "purchase",
-            "quantity": 20,
-            "reason": "Restocking from supplier",
-        },
-    )
+    with assert_max_queries(13):
+        r = client.post(
+            f"{settings.API_V1_STR}/inventory-movements/",
+            headers=superuser_token_headers,
+            json={
+                "product_id": str(product.id),
+                "movement_type": "purchase",
+                "quantity": 20,
+                "reason": "Restocking from supplier",
+            },
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["movement_type"] == "purchase"
@@ -255,10 +257,11 @@ def test_read_movement_by_id(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     movement = create_random_movement(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/inventory-movements/{movement.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/inventory-movements/{movement.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["id"] == str(movement.id)
@@ -288,10 +291,11 @@ def test_read_product_movements(
     create_random_movement(db, product_id=product.id, quantity=10)
     create_random_movement(db, product_id=product.id, quantity=-5)
 
-    r = client.get(
-        f"{settings.API_V1_STR}/products/{product.id}/movements",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(7):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/{product.id}/movements",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -299,6 +303,46 @@ def test_read_product_movements(
     assert data["count"] >= 2
 
 
+def test_read_product_movements_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    product = create_random_product(db, stock_quantity=100)
+    movements = [
+        create_random_movement(db, product_id=product.id, quantity=1)
+        for _ in range(3)
+    ]
+
+    seen: list[str] = []
+    cursor = None
+    for _ in range(3):
+        params: dict[str, str | int] = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get(
+            f"{settings.API_V1_STR}/products/{product.id}/movements",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        assert r.status_code == 200
+        data = r.json()
+        seen.extend(item["id"] for item in data["data"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [str(movement.id) for movement in reversed(movements)]
+
+
+def test_read_movements_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/inventory-movements/",
+        headers=superuser_token_headers,
+        params={"cursor": "e30"},
+    )
+    assert r.status_code == 400
+
+
 def test_read_product_movements_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -1,12 +1,17 @@
+import threading
 from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
+from httpx import Response
 from pwdlib.hashers.bcrypt import BcryptHasher
 from sqlmodel import Session
 
 from app import crud
 from app.core.config import settings
+from app.core.db import engine
 from app.core.security import get_password_hash, verify_password
+from app.core.throttle import MemoryTokenBucketStore, PostgresTokenBucketStore
 from app.crud import create_user
 from app.models import User, UserCreate
 from app.utils import generate_password_reset_token
@@ -215,3 +220,169 @@ def test_login_with_argon2_password_keeps_hash(client: TestClient, db: Session)
 
     assert user.hashed_password == original_hash
     assert user.hashed_password.startswith("$argon2")
+
+
+def _create_login_user(db: Session) -> tuple[User, str]:
+    password = random_lower_string()
+    user = create_user(
+        session=db,
+        user_create=UserCreate(
+            email=random_email(),
+            password=password,
+            first_name="Throttle",
+            last_name="User",
+            role_id=_get_role_id(db, "viewer"),
+        ),
+        organization_id=_get_default_org_id(db),
+    )
+    return user, password
+
+
+def _login(client: TestClient, email: str, password: str) -> Response:
+    return client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    )
+
+
+def test_login_locks_account_after_failures(client: TestClient, db: Session) -> None:
+    user, password = _create_login_user(db)
+    for _ in range(settings.LOGIN_LOCKOUT_THRESHOLD):
+        r = _login(client, user.email, "wrong-password")
+        assert r.status_code == 400
+
+    with patch(
+        "app.crud.verify_password_async", return_value=(False, None)
+    ) as verify:
+        r = _login(client, user.email, password)
+        # Only the dummy hash is checked, as for an unknown email
+        assert verify.call_args.args[1] != user.hashed_password
+    unknown = _login(client, random_email(), password)
+    # A locked account answers exactly like one that does not exist
+    assert (r.status_code, r.json()) == (unknown.status_code, unknown.json())
+    assert r.status_code == 400
+
+    db.refresh(user)
+    assert user.locked_until is not None
+    user.locked_until = None
+    db.add(user)
+    db.commit()
+    r = _login(client, user.email, password)
+    assert r.status_code == 200
+
+
+def test_concurrent_failed_logins_are_all_counted(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "LOGIN_LOCKOUT_THRESHOLD", 100)
+    user, _ = _create_login_user(db)
+    attempts = 8
+    barrier = threading.Barrier(attempts)
+
+    def fail() -> None:
+        with Session(engine) as session:
+            barrier.wait()
+            assert crud.authenticate(
+                session=session, email=user.email, password="wrong-password"
+            ) is None
+
+    threads = [threading.Thread(target=fail) for _ in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.refresh(user)
+    assert user.failed_login_attempts == attempts
+
+
+def test_login_success_resets_failed_attempts(client: TestClient, db: Session) -> None:
+    user, password = _create_login_user(db)
+    _login(client, user.email, "wrong-password")
+    db.refresh(user)
+    assert user.failed_login_attempts == 1
+    assert _login(client, user.email, password).status_code == 200
+    db.refresh(user)
+    assert user.failed_login_attempts == 0
+
+
+def test_login_throttled_per_email(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "LOGIN_EMAIL_PER_MINUTE", 0.01)
+    email = random_email()
+    with patch("app.crud.verify_password_async") as verify:
+        for _ in range(settings.LOGIN_EMAIL_BURST):
+            assert _login(client, email, "x").status_code == 400
+        calls = verify.call_count
+        r = _login(client, email, "x")
+        assert verify.call_count == calls
+    assert r.status_code == 429
+    # Another email from the same client still gets through
+    assert _login(client, random_email(), "x").status_code == 400
+
+
+def test_login_throttled_per_ip(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "LOGIN_IP_BURST", 3)
+    monkeypatch.setattr(settings, "LOGIN_IP_PER_MINUTE", 0.01)
+    for _ in range(settings.LOGIN_IP_BURST):
+        r = _login(client, random_email(), "x")
+        assert r.status_code == 400
+    assert _login(client, random_email(), "x").status_code == 429
+
+
+def test_login_throttle_uses_forwarded_ip_behind_trusted_proxy(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+    monkeypatch.setattr(settings, "LOGIN_IP_BURST", 2)
+    monkeypatch.setattr(settings, "LOGIN_IP_PER_MINUTE", 0.01)
+
+    def login_from(peer: str, forwarded_for: str) -> int:
+        r = TestClient(client.app, client=(peer, 50000)).post(
+            f"{settings.API_V1_STR}/login/access-token",
+            headers={"X-Forwarded-For": forwarded_for},
+            data={"username": random_email(), "password": "x"},
+        )
+        return r.status_code
+
+    proxy = "10.0.0.2"
+    assert [login_from(proxy, "203.0.113.7") for _ in range(3)] == [400, 400, 429]
+    # Another client behind the same proxy has its own bucket
+    assert login_from(proxy, "203.0.113.8") == 400
+    # An entry the client prepended does not get it a fresh bucket
+    assert login_from(proxy, "198.51.100.1, 203.0.113.7") == 429
+
+    # From a peer that is not a trusted proxy the header is ignored
+    direct = "192.0.2.10"
+    assert [login_from(direct, f"203.0.113.{n}") for n in range(20, 23)] == [
+        400,
+        400,
+        429,
+    ]
+
+
+def test_memory_token_bucket_refills() -> None:
+    now = [0.0]
+    store = MemoryTokenBucketStore(clock=lambda: now[0])
+    assert store.take("k", capacity=2, per_second=1) == 0
+    assert store.take("k", capacity=2, per_second=1) == 0
+    assert store.take("k", capacity=2, per_second=1) == pytest.approx(1)
+    now[0] = 0.5
+    assert store.take("k", capacity=2, per_second=1) == pytest.approx(0.5)
+    now[0] = 1.0
+    assert store.take("k", capacity=2, per_second=1) == 0
+
+
+def test_postgres_token_bucket_store() -> None:
+    store = PostgresTokenBucketStore(engine)
+    key = f"test:{random_lower_string()}"
+    assert store.take(key, capacity=2, per_second=0.001) == 0
+    assert store.take(key, capacity=2, per_second=0.001) == 0
+    retry_after = store.take(key, capacity=2, per_second=0.001)
+    assert 900 < retry_after <= 1000
+    # A rejected take does not spend a token
+    assert store.take(key, capacity=2, per_second=0.001) == pytest.approx(
+        retry_after, rel=0.01
+    )
@@ -1,7 +1,7 @@
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 
 def _signup_payload(**overrides: object) -> dict:
@@ -119,9 +119,10 @@ def test_signup_organization_slug_too_short_returns_422(client: TestClient) -> N
 def test_get_my_organization_superuser(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.get(
-        f"{settings.API_V1_STR}/organizations/me", headers=superuser_token_headers
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/organizations/me", headers=superuser_token_headers
+        )
     assert r.status_code == 200
     data = r.json()
     assert "id" in data
@@ -168,11 +169,12 @@ def test_update_organization_name_as_admin(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     new_name = f"Updated {random_lower_string()[:10]}"
-    r = client.patch(
-        f"{settings.API_V1_STR}/organizations/me",
-        headers=superuser_token_headers,
-        json={"name": new_name},
-    )
+    with assert_max_queries(8):
+        r = client.patch(
+            f"{settings.API_V1_STR}/organizations/me",
+            headers=superuser_token_headers,
+            json={"name": new_name},
+        )
     assert r.status_code == 200
     assert r.json()["name"] == new_name
 
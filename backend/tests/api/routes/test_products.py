@@ -1,6 +1,8 @@
 import uuid
+from datetime import timedelta
 from decimal import Decimal
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
@@ -12,10 +14,10 @@ from tests.utils.user import (
     _get_role_id,
     user_authentication_headers,
 )
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 from app import crud
-from app.models import UserCreate
+from app.models import ProductUpdate, UserCreate
 
 
 def _create_seller_headers(client: TestClient, db: Session) -> dict[str, str]:
@@ -45,10 +47,11 @@ def test_read_products(
 ) -> None:
     create_random_product(db)
     create_random_product(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/products/",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -57,6 +60,84 @@ def test_read_products(
     assert len(data["data"]) >= 2
 
 
+@pytest.mark.parametrize("count_mode", ["exact", "window"])
+def test_read_products_fast_json_matches_default(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    count_mode: str,
+) -> None:
+    for _ in range(4):
+        create_random_product(db)
+    params = {"limit": 3, "sort_by": "name", "count_mode": count_mode}
+    default = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params=params,
+    ).json()
+    monkeypatch.setattr(settings, "FAST_JSON_LIST_ENDPOINTS", True)
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params=params,
+    )
+    assert r.status_code == 200
+    fast = r.json()
+    assert fast == default
+    assert fast["next_cursor"] is not None
+
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params={**params, "cursor": fast["next_cursor"]},
+    )
+    assert r.status_code == 200
+    assert r.json()["data"][0]["id"] not in {p["id"] for p in fast["data"]}
+
+
+def test_read_products_sparse_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_product(db)
+    fields = "name,sku,sale_price,stock_quantity"
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params={"fields": fields, "limit": 2, "sort_by": "created_at"},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["count"] >= 3
+    assert all(
+        list(product) == ["id", "name", "sku", "sale_price", "stock_quantity"]
+        for product in data["data"]
+    )
+
+    # created_at is not returned but still drives the cursor
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params={"fields": fields, "limit": 2, "cursor": data["next_cursor"]},
+    )
+    assert r.status_code == 200
+    seen = {product["id"] for product in data["data"]}
+    assert not seen & {product["id"] for product in r.json()["data"]}
+
+
+def test_read_products_unknown_field(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params={"fields": "name,deleted_at"},
+    )
+    assert r.status_code == 400
+    assert "deleted_at" in r.json()["detail"]
+
+
 def test_read_products_normal_user(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -71,28 +152,432 @@ def test_read_products_normal_user(
     assert "count" in data
 
 
+def test_read_products_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    category = create_random_category(db)
+    for _ in range(5):
+        create_random_product(db, category_id=category.id)
+    params = {"category_id": str(category.id), "sort_by": "name"}
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params=params,
+    )
+    expected = [item["id"] for item in r.json()["data"]]
+    assert len(expected) == 5
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page_params = {**params, "limit": 2}
+        if cursor:
+            page_params["cursor"] = cursor
+        r = client.get(
+            f"{settings.API_V1_STR}/products/",
+            headers=superuser_token_headers,
+            params=page_params,
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["count"] == 5
+        seen.extend(item["id"] for item in data["data"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_read_products_count_modes(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    category = create_random_category(db)
+    for _ in range(3):
+        create_random_product(db, category_id=category.id)
+    url = f"{settings.API_V1_STR}/products/"
+    base = {"category_id": str(category.id), "limit": 2}
+
+    r = client.get(url, headers=superuser_token_headers, params=base)
+    assert r.json()["count"] == 3
+    assert r.json()["count_is_estimate"] is False
+
+    r = client.get(
+        url, headers=superuser_token_headers, params={**base, "include_count": False}
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] is None
+    assert len(r.json()["data"]) == 2
+
+    r = client.get(
+        url, headers=superuser_token_headers, params={**base, "count_mode": "window"}
+    )
+    assert r.json()["count"] == 3
+
+    # Past the last row the window total is recovered with an exact count
+    r = client.get(
+        url,
+        headers=superuser_token_headers,
+        params={**base, "count_mode": "window", "skip": 10},
+    )
+    assert r.json()["data"] == []
+    assert r.json()["count"] == 3
+
+    # Small result sets are always counted exactly
+    r = client.get(
+        url,
+        headers=superuser_token_headers,
+        params={**base, "count_mode": "estimated"},
+    )
+    assert r.json()["count"] == 3
+    assert r.json()["count_is_estimate"] is False
+
+
+def test_read_products_invalid_count_mode(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params={"count_mode": "approximate"},
+    )
+    assert r.status_code == 422
+
+
+def test_read_products_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/products/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
 # ---------------------------------------------------------------------------
-# POST /products/
+# GET /products/search
 # ---------------------------------------------------------------------------
 
 
-def test_create_product(
+def test_search_products(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    product = create_random_product(db)
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/search",
+            headers=superuser_token_headers,
+            params={"q": product.name[8:16]},
+        )
+    assert r.status_code == 200
+    assert [item["id"] for item in r.json()["data"]] == [str(product.id)]
+
+
+def test_search_products_exact_sku_first(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    product = create_random_product(db)
+    other = create_random_product(db)
+    crud.update_product(
+        session=db,
+        db_product=other,
+        product_in=ProductUpdate(name=f"Pack {product.sku}"),
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/products/search",
+        headers=superuser_token_headers,
+        params={"q": product.sku},
+    )
+    ids = [item["id"] for item in r.json()["data"]]
+    assert ids == [str(product.id), str(other.id)]
+
+
+def test_search_products_wildcards_are_literal(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    sku = f"SKU-{random_lower_string()[:16]}"
+    r = client.get(
+        f"{settings.API_V1_STR}/products/search",
+        headers=superuser_token_headers,
+        params={"q": "%%%", "limit": 500},
+    )
+    assert r.status_code == 200
+    assert r.json()["data"] == []
+
+
+# ---------------------------------------------------------------------------
+# GET /products/changes
+# ---------------------------------------------------------------------------
+
+
+def _signup_headers(client: TestClient) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/organizations/signup",
+        json={
+            "organization_name": f"Sync {random_lower_string()[:12]}",
+            "organization_slug": f"sync-{random_lower_string()[:10]}",
+            "admin_email": random_email(),
+            "admin_password": random_lower_string()[:16],
+            "admin_first_name": "Sync",
+            "admin_last_name": "Admin",
+        },
+    )
+    assert r.status_code == 201, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _create_product_via_api(client: TestClient, headers: dict[str, str]) -> str:
+    r = client.post(
+        f"{settings.API_V1_STR}/products/",
+        headers=headers,
+        json={"name": "Synced", "sku": f"SKU-{random_lower_string()[:12]}"},
+    )
+    assert r.status_code == 200, r.text
+    return str(r.json()["id"])
+
+
+def test_read_catalog_changes(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(crud, "SYNC_COMMIT_GRACE", timedelta(0))
+    headers = _signup_headers(client)
+    url = f"{settings.API_V1_STR}/products/changes"
+    category = client.post(
+        f"{settings.API_V1_STR}/categories/", headers=headers, json={"name": "Sync"}
+    ).json()
+    kept = _create_product_via_api(client, headers)
+    removed = _create_product_via_api(client, headers)
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert [p["id"] for p in data["products"]] == [kept, removed]
+    assert category["id"] in [c["id"] for c in data["categories"]]
+    assert data["has_more"] is False
+    token = data["next_token"]
+
+    client.patch(
+        f"{settings.API_V1_STR}/products/{kept}",
+        headers=headers,
+        json={"sale_price": "12.50"},
+    )
+    client.delete(f"{settings.API_V1_STR}/products/{removed}", headers=headers)
+    r = client.get(url, headers=headers, params={"since": token})
+    data = r.json()
+    assert [p["id"] for p in data["products"]] == [kept]
+    assert data["products"][0]["sale_price"] == "12.50"
+    assert data["deleted_product_ids"] == [removed]
+    assert data["categories"] == []
+
+    r = client.get(url, headers=headers, params={"since": data["next_token"]})
+    assert r.json()["products"] == []
+    assert r.json()["deleted_product_ids"] == []
+    assert r.json()["next_token"] == data["next_token"]
+
+
+def test_read_catalog_changes_pages_with_limit(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(crud, "SYNC_COMMIT_GRACE", timedelta(0))
+    headers = _signup_headers(client)
+    url = f"{settings.API_V1_STR}/products/changes"
+    created = [_create_product_via_api(client, headers) for _ in range(3)]
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        data = client.get(url, headers=headers, params=params).json()
+        seen.extend(p["id"] for p in data["products"])
+        params["since"] = data["next_token"]
+        if not data["has_more"]:
+            break
+    assert seen == created
+
+
+def test_read_catalog_changes_holds_back_recent_rows(client: TestClient) -> None:
+    headers = _signup_headers(client)
+    _create_product_via_api(client, headers)
+    r = client.get(f"{settings.API_V1_STR}/products/changes", headers=headers)
+    assert r.json()["products"] == []
+
+
+def test_read_catalog_changes_invalid_token(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/products/changes",
+        headers=superuser_token_headers,
+        params={"since": "bm90LWpzb24"},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid change token"
+
+
+# ---------------------------------------------------------------------------
+# GET/POST /products/batch
+# ---------------------------------------------------------------------------
+
+
+def test_read_products_batch_preserves_order(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    first = create_random_product(db)
+    second = create_random_product(db)
+    unknown = uuid.uuid4()
+    ids = [str(second.id), str(unknown), str(first.id)]
+
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/batch",
+            headers=superuser_token_headers,
+            params={"ids": ids},
+        )
+    assert r.status_code == 200
+    data = r.json()
+    assert [item["id"] for item in data["data"]] == [str(second.id), str(first.id)]
+    assert data["missing"] == [str(unknown)]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/products/batch",
+        headers=superuser_token_headers,
+        json={"ids": ids},
+    )
+    assert r.status_code == 200
+    assert r.json() == data
+
+
+def test_read_products_batch_too_many_ids(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/products/batch",
+        headers=superuser_token_headers,
+        json={"ids": [str(uuid.uuid4()) for _ in range(201)]},
+    )
+    assert r.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# GET/POST /products/lookup
+# ---------------------------------------------------------------------------
+
+
+def _create_product_with_barcode(db: Session) -> tuple[str, str]:
+    product = create_random_product(db)
+    barcode = f"779{random_lower_string()[:10]}"
+    crud.update_product(
+        session=db, db_product=product, product_in=ProductUpdate(barcode=barcode)
+    )
+    return str(product.id), barcode
+
+
+def test_lookup_product_by_barcode_and_sku(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    product_id, barcode = _create_product_with_barcode(db)
+    url = f"{settings.API_V1_STR}/products/lookup"
+    with assert_max_queries(3):
+        r = client.get(
+            url, headers=superuser_token_headers, params={"barcode": barcode}
+        )
+    assert r.status_code == 200
+    assert r.json()["id"] == product_id
+
+    sku = r.json()["sku"]
+    r = client.get(url, headers=superuser_token_headers, params={"sku": sku})
+    assert r.json()["id"] == product_id
+
+    r = client.get(url, headers=superuser_token_headers, params={"barcode": "nope"})
+    assert r.status_code == 404
+
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 400
+    r = client.get(
+        url, headers=superuser_token_headers, params={"barcode": barcode, "sku": sku}
+    )
+    assert r.status_code == 400
+
+
+def test_lookup_product_cache_sees_updates(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    product_id, barcode = _create_product_with_barcode(db)
+    url = f"{settings.API_V1_STR}/products/lookup"
+    r = client.get(url, headers=superuser_token_headers, params={"barcode": barcode})
+    assert r.json()["sale_price"] == "25.00"
+
+    client.patch(
+        f"{settings.API_V1_STR}/products/{product_id}",
+        headers=superuser_token_headers,
+        json={"sale_price": "30.00"},
+    )
+    r = client.get(url, headers=superuser_token_headers, params={"barcode": barcode})
+    assert r.json()["sale_price"] == "30.00"
+
+    client.delete(
+        f"{settings.API_V1_STR}/products/{product_id}",
+        headers=superuser_token_headers,
+    )
+    r = client.get(url, headers=superuser_token_headers, params={"barcode": barcode})
+    assert r.status_code == 404
+
+
+def test_lookup_products_batch(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    first_id, barcode = _create_product_with_barcode(db)
+    second = create_random_product(db)
+    r = client.post(
+        f"{settings.API_V1_STR}/products/lookup",
+        headers=superuser_token_headers,
+        json={"codes": [barcode, second.sku, "unknown-code", barcode]},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["data"][barcode]["id"] == first_id
+    assert data["data"][second.sku]["id"] == str(second.id)
+    assert data["missing"] == ["unknown-code"]
+
+
+def test_create_product_duplicate_barcode(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    _, barcode = _create_product_with_barcode(db)
     r = client.post(
         f"{settings.API_V1_STR}/products/",
         headers=superuser_token_headers,
         json={
-            "name": "Test Product",
-            "sku": sku,
-            "description": "A test product",
-            "cost_price": "10.00",
-            "sale_price": "25.50",
-            "stock_quantity": 100,
-            "stock_min": 10,
+            "name": "Duplicate barcode",
+            "sku": f"SKU-{random_lower_string()[:16]}",
+            "barcode": barcode,
         },
     )
+    assert r.status_code == 409
+
+
+# ---------------------------------------------------------------------------
+# POST /products/
+# ---------------------------------------------------------------------------
+
+
+def test_create_product(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    sku = f"SKU-{random_lower_string()[:16]}"
+    with assert_max_queries(8):
+        r = client.post(
+            f"{settings.API_V1_STR}/products/",
+            headers=superuser_token_headers,
+            json={
+                "name": "Test Product",
+                "sku": sku,
+                "description": "A test product",
+                "cost_price": "10.00",
+                "sale_price": "25.50",
+                "stock_quantity": 100,
+                "stock_min": 10,
+            },
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["name"] == "Test Product"
@@ -202,10 +687,11 @@ def test_read_low_stock_products(
 ) -> None:
     # Create a low-stock product
     create_random_product(db, stock_quantity=2, stock_min=10)
-    r = client.get(
-        f"{settings.API_V1_STR}/products/low-stock",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/low-stock",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -224,10 +710,11 @@ def test_read_product_by_id(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     product = create_random_product(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/products/{product.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/{product.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["id"] == str(product.id)
@@ -235,6 +722,30 @@ def test_read_product_by_id(
     assert data["sku"] == product.sku
 
 
+def test_read_product_sparse_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    product = create_random_product(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/products/{product.id}",
+        headers=superuser_token_headers,
+        params={"fields": "sku,sale_price"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {
+        "id": str(product.id),
+        "sku": product.sku,
+        "sale_price": str(product.sale_price),
+    }
+
+    r = client.get(
+        f"{settings.API_V1_STR}/products/{uuid.uuid4()}",
+        headers=superuser_token_headers,
+        params={"fields": "sku"},
+    )
+    assert r.status_code == 404
+
+
 def test_read_product_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -255,11 +766,12 @@ def test_update_product(
 ) -> None:
     product = create_random_product(db)
     new_name = f"Updated-{random_lower_string()[:16]}"
-    r = client.patch(
-        f"{settings.API_V1_STR}/products/{product.id}",
-        headers=superuser_token_headers,
-        json={"name": new_name, "description": "Updated description"},
-    )
+    with assert_max_queries(8):
+        r = client.patch(
+            f"{settings.API_V1_STR}/products/{product.id}",
+            headers=superuser_token_headers,
+            json={"name": new_name, "description": "Updated description"},
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["name"] == new_name
@@ -339,10 +851,11 @@ def test_delete_product(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     product = create_random_product(db)
-    r = client.delete(
-        f"{settings.API_V1_STR}/products/{product.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(8):
+        r = client.delete(
+            f"{settings.API_V1_STR}/products/{product.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     assert r.json()["message"] == "Product deleted successfully"
 
@@ -397,11 +910,12 @@ def test_adjust_stock_add(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     product = create_random_product(db, stock_quantity=50)
-    r = client.post(
-        f"{settings.API_V1_STR}/products/{product.id}/adjust-stock",
-        headers=superuser_token_headers,
-        json={"quantity": 20, "reason": "Restocking"},
-    )
+    with assert_max_queries(14):
+        r = client.post(
+            f"{settings.API_V1_STR}/products/{product.id}/adjust-stock",
+            headers=superuser_token_headers,
+            json={"quantity": 20, "reason": "Restocking"},
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["stock_quantity"] == 70
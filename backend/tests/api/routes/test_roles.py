@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
+from tests.utils.utils import assert_max_queries
 
 EXPECTED_ROLES = {"admin", "seller", "viewer"}
 
@@ -13,7 +14,8 @@ EXPECTED_ROLES = {"admin", "seller", "viewer"}
 def test_list_roles_superuser(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.get(f"{settings.API_V1_STR}/roles/", headers=superuser_token_headers)
+    with assert_max_queries(4):
+        r = client.get(f"{settings.API_V1_STR}/roles/", headers=superuser_token_headers)
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
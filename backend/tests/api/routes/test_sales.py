@@ -1,5 +1,6 @@
 import uuid
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
@@ -14,7 +15,7 @@ from tests.utils.user import (
     _get_role_id,
     user_authentication_headers,
 )
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 
 def _create_seller_headers(client: TestClient, db: Session) -> dict[str, str]:
@@ -43,10 +44,11 @@ def test_read_sales(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     create_random_sale(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/sales/",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(6):
+        r = client.get(
+            f"{settings.API_V1_STR}/sales/",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -54,6 +56,31 @@ def test_read_sales(
     assert data["count"] >= 1
 
 
+def test_read_sales_fast_json_matches_default(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    create_random_sale(db, num_items=3)
+    create_random_sale(db, with_customer=False)
+    params = {"limit": 20, "sort_by": "created_at", "sort_order": "desc"}
+    default = client.get(
+        f"{settings.API_V1_STR}/sales/", headers=superuser_token_headers, params=params
+    ).json()
+    monkeypatch.setattr(settings, "FAST_JSON_LIST_ENDPOINTS", True)
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/", headers=superuser_token_headers, params=params
+    )
+    assert r.status_code == 200
+    fast = r.json()
+    for page in (default, fast):
+        for sale in page["data"]:
+            sale["items"].sort(key=lambda item: item["id"])
+    assert fast == default
+    assert any(len(sale["items"]) == 3 for sale in fast["data"])
+
+
 def test_read_sales_normal_user(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -78,20 +105,21 @@ def test_create_sale(
 ) -> None:
     product = create_random_product(db, stock_quantity=50)
     customer = create_random_customer(db)
-    r = client.post(
-        f"{settings.API_V1_STR}/sales/",
-        headers=superuser_token_headers,
-        json={
-            "customer_id": str(customer.id),
-            "payment_method": "cash",
-            "discount": "0.00",
-            "tax": "0.00",
-            "notes": "Test sale via API",
-            "items": [
-                {"product_id": str(product.id), "quantity": 2},
-            ],
-        },
-    )
+    with assert_max_queries(15):
+        r = client.post(
+            f"{settings.API_V1_STR}/sales/",
+            headers=superuser_token_headers,
+            json={
+                "customer_id": str(customer.id),
+                "payment_method": "cash",
+                "discount": "0.00",
+                "tax": "0.00",
+                "notes": "Test sale via API",
+                "items": [
+                    {"product_id": str(product.id), "quantity": 2},
+                ],
+            },
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["status"] == "completed"
@@ -135,17 +163,18 @@ def test_create_sale_multiple_items(
 ) -> None:
     product1 = create_random_product(db, stock_quantity=50)
     product2 = create_random_product(db, stock_quantity=30)
-    r = client.post(
-        f"{settings.API_V1_STR}/sales/",
-        headers=superuser_token_headers,
-        json={
-            "payment_method": "transfer",
-            "items": [
-                {"product_id": str(product1.id), "quantity": 3},
-                {"product_id": str(product2.id), "quantity": 1},
-            ],
-        },
-    )
+    with assert_max_queries(13):
+        r = client.post(
+            f"{settings.API_V1_STR}/sales/",
+            headers=superuser_token_headers,
+            json={
+                "payment_method": "transfer",
+                "items": [
+                    {"product_id": str(product1.id), "quantity": 3},
+                    {"product_id": str(product2.id), "quantity": 1},
+                ],
+            },
+        )
     assert r.status_code == 200
     data = r.json()
     assert len(data["items"]) == 2
@@ -484,10 +513,11 @@ def test_read_sale_by_id(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     sale = create_random_sale(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/sales/{sale.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/sales/{sale.id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["id"] == str(sale.id)
@@ -527,11 +557,12 @@ def test_cancel_sale(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     sale = create_random_sale(db)
-    r = client.post(
-        f"{settings.API_V1_STR}/sales/{sale.id}/cancel",
-        headers=superuser_token_headers,
-        json={"reason": "Customer requested refund"},
-    )
+    with assert_max_queries(16):
+        r = client.post(
+            f"{settings.API_V1_STR}/sales/{sale.id}/cancel",
+            headers=superuser_token_headers,
+            json={"reason": "Customer requested refund"},
+        )
     assert r.status_code == 200
     data = r.json()
     assert data["status"] == "cancelled"
@@ -746,10 +777,11 @@ def test_read_customer_sales(
     customer = create_random_customer(db)
     create_random_sale(db, customer_id=customer.id)
     create_random_sale(db, customer_id=customer.id)
-    r = client.get(
-        f"{settings.API_V1_STR}/customers/{customer.id}/sales",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(7):
+        r = client.get(
+            f"{settings.API_V1_STR}/customers/{customer.id}/sales",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     data = r.json()
     assert "data" in data
@@ -757,6 +789,57 @@ def test_read_customer_sales(
     assert data["count"] >= 2
 
 
+def test_read_customer_sales_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    customer = create_random_customer(db)
+    sales = [create_random_sale(db, customer_id=customer.id) for _ in range(3)]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/{customer.id}/sales",
+        headers=superuser_token_headers,
+        params={"limit": 2},
+    )
+    assert r.status_code == 200
+    first_page = r.json()
+    assert len(first_page["data"]) == 2
+    assert first_page["next_cursor"] is not None
+
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/{customer.id}/sales",
+        headers=superuser_token_headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    assert r.status_code == 200
+    second_page = r.json()
+    assert len(second_page["data"]) == 1
+    assert second_page["next_cursor"] is None
+
+    # Most recent first, no overlap between pages
+    ids = [item["id"] for item in first_page["data"] + second_page["data"]]
+    assert ids == [str(sale.id) for sale in reversed(sales)]
+
+
+def test_read_sales_cursor_sort_mismatch(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_sale(db)
+    create_random_sale(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/",
+        headers=superuser_token_headers,
+        params={"limit": 1},
+    )
+    cursor = r.json()["next_cursor"]
+    assert cursor is not None
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/",
+        headers=superuser_token_headers,
+        params={"limit": 1, "cursor": cursor, "sort_by": "total"},
+    )
+    assert r.status_code == 400
+
+
 def test_read_customer_sales_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -777,3 +860,23 @@ def test_read_customer_sales_normal_user(
         headers=normal_user_token_headers,
     )
     assert r.status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# GET /sales/search
+# ---------------------------------------------------------------------------
+
+
+def test_search_sales_by_invoice_number(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    sale = create_random_sale(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/search",
+        headers=superuser_token_headers,
+        params={"q": sale.invoice_number, "limit": 5},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["data"][0]["id"] == str(sale.id)
+    assert data["count"] == len(data["data"]) <= 5
@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import CustomerUpdate, ProductUpdate
+from tests.utils.customer import create_random_customer
+from tests.utils.product import create_random_product
+from tests.utils.utils import assert_max_queries, random_lower_string
+
+
+def test_search_ranks_products_ignoring_accents(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    token = random_lower_string()[:12]
+    in_description = create_random_product(db)
+    crud.update_product(
+        session=db,
+        db_product=in_description,
+        product_in=ProductUpdate(name=f"Filtro {token}", description="Para café"),
+    )
+    in_name = create_random_product(db)
+    crud.update_product(
+        session=db,
+        db_product=in_name,
+        product_in=ProductUpdate(name=f"Café molido {token}"),
+    )
+
+    r = client.get(
+        f"{settings.API_V1_STR}/search/",
+        headers=superuser_token_headers,
+        params={"q": f"cafe {token}"},
+    )
+    assert r.status_code == 200
+    hits = r.json()["products"]
+    assert [hit["id"] for hit in hits] == [str(in_name.id), str(in_description.id)]
+    assert hits[0]["rank"] > hits[1]["rank"]
+
+
+def test_search_groups_by_entity_type(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    token = random_lower_string()[:12]
+    customer = create_random_customer(db)
+    crud.update_customer(
+        session=db,
+        db_customer=customer,
+        customer_in=CustomerUpdate(first_name="José", last_name=token),
+    )
+
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/search/",
+            headers=superuser_token_headers,
+            params={"q": f"jose {token}"},
+        )
+    data = r.json()
+    assert data["products"] == []
+    assert [hit["id"] for hit in data["customers"]] == [str(customer.id)]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/search/",
+        headers=superuser_token_headers,
+        params={"q": f"jose {token}", "entity_type": "product"},
+    )
+    assert r.json()["customers"] == []
+
+
+def test_search_requires_auth(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/search/", params={"q": "cafe"})
+    assert r.status_code == 401
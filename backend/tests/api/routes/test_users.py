@@ -9,7 +9,7 @@ from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate
 from tests.utils.user import create_random_user, _get_default_org_id, _get_role_id
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import assert_max_queries, random_email, random_lower_string
 
 
 # ---------------------------------------------------------------------------
@@ -49,7 +49,10 @@ def _create_user(
 def test_get_users_superuser_me(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    with assert_max_queries(4):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+        )
     current_user = r.json()
     assert current_user
     assert current_user["is_active"] is True
@@ -154,7 +157,8 @@ def test_retrieve_users(
     _create_user(db)
     _create_user(db)
 
-    r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
+    with assert_max_queries(6):
+        r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
     all_users = r.json()
 
     assert len(all_users["data"]) > 1
@@ -172,10 +176,11 @@ def test_get_existing_user_as_superuser(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     user, _ = _create_user(db)
-    r = client.get(
-        f"{settings.API_V1_STR}/users/{user.id}",
-        headers=superuser_token_headers,
-    )
+    with assert_max_queries(5):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/{user.id}",
+            headers=superuser_token_headers,
+        )
     assert 200 <= r.status_code < 300
     api_user = r.json()
     assert api_user["email"] == user.email
@@ -378,11 +383,12 @@ def test_update_user(
     user, _ = _create_user(db)
 
     data = {"first_name": "UpdatedFirst", "last_name": "UpdatedLast"}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/{user.id}",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with assert_max_queries(9):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/{user.id}",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 200
     updated_user = r.json()
 
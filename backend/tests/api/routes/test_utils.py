@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import PoolMetrics, make_engine
+
+# ---------------------------------------------------------------------------
+# GET /utils/db-pool/
+# ---------------------------------------------------------------------------
+
+
+def test_read_db_pool_stats_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["pool_size"] == settings.DB_POOL_SIZE
+    # The request's own session holds a connection
+    assert data["checked_out"] >= 1
+    assert data["checkouts"] >= data["connects"] >= 1
+    assert 0 < data["saturation"] <= 1
+    async_pool = data["async_pool"]
+    assert async_pool["pool_size"] == settings.DB_ASYNC_POOL_SIZE
+    assert async_pool["max_overflow"] == settings.DB_ASYNC_MAX_OVERFLOW
+    # Authentication checked the token's user out of the async pool
+    assert async_pool["checkouts"] >= 1
+
+
+def test_read_db_pool_stats_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_pool_metrics_track_saturation() -> None:
+    engine: Engine = make_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    metrics = PoolMetrics(engine)
+    try:
+        with engine.connect(), engine.connect():
+            stats = metrics.snapshot()
+            assert stats.checked_out == 2
+            assert stats.peak_checked_out == 2
+        with Session(engine) as session:
+            session.connection()
+        stats = metrics.snapshot()
+        assert stats.checked_out == 0
+        assert stats.checked_in == 2
+        assert stats.connects == 2
+        assert stats.checkouts == 3
+    finally:
+        engine.dispose()
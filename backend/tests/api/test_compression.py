@@ -0,0 +1,150 @@
+import asyncio
+import gzip
+import zlib
+from typing import Any
+
+import brotli
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.core.config import settings
+from tests.utils.product import create_random_product
+
+
+def test_choose_encoding_prefers_brotli() -> None:
+    assert choose_encoding("gzip, deflate, br", brotli_enabled=True) == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_enabled=False) == "gzip"
+    assert choose_encoding("br;q=0, gzip", brotli_enabled=True) == "gzip"
+    assert choose_encoding("*", brotli_enabled=True) == "br"
+    assert choose_encoding("identity", brotli_enabled=True) is None
+    assert choose_encoding("", brotli_enabled=True) is None
+
+
+def test_large_json_response_is_compressed(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(10):
+        create_random_product(db)
+    with client.stream(
+        "GET",
+        f"{settings.API_V1_STR}/products/",
+        headers={**superuser_token_headers, "Accept-Encoding": "gzip"},
+        params={"limit": 100},
+    ) as r:
+        raw = b"".join(r.iter_raw())
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert int(r.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw).startswith(b'{"data":')
+
+
+def test_brotli_when_accepted(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/openapi.json",
+        headers={**superuser_token_headers, "Accept-Encoding": "br, gzip"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "br"
+    assert "paths" in r.json()
+
+
+def test_small_response_is_not_compressed(client: TestClient) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/health-check/",
+        headers={"Accept-Encoding": "gzip, br"},
+    )
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert r.json() is True
+
+
+def test_disallowed_content_type_is_not_compressed(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_product(db)
+    r = client.post(
+        f"{settings.API_V1_STR}/dashboard/export-excel",
+        headers={**superuser_token_headers, "Accept-Encoding": "gzip, br"},
+        json={"dataset": "inventory", "timezone": "UTC"},
+    )
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert r.content[:2] == b"PK"
+
+
+def _streaming_app(chunks: list[bytes]) -> CompressionMiddleware:
+    async def stream(_request: Request) -> Response:
+        async def body() -> Any:
+            for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(body(), media_type="text/csv")
+
+    return CompressionMiddleware(
+        Starlette(routes=[Route("/", stream)]), minimum_size=1024
+    )
+
+
+def _run(app: CompressionMiddleware, accept_encoding: str) -> list[dict[str, Any]]:
+    sent: list[dict[str, Any]] = []
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "http_version": "1.1",
+    }
+
+    async def receive() -> dict[str, Any]:
+        # The client never disconnects; the stream ends on its own
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def test_streaming_response_is_compressed_incrementally() -> None:
+    # Small chunks are still compressed: the total size of a stream is unknown
+    chunks = [b"sku,name,stock\n"] + [
+        f"SKU-{i},Item {i},{i}\n".encode() for i in range(50)
+    ]
+    sent = _run(_streaming_app(chunks), "gzip")
+
+    start = sent[0]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    decoder = zlib.decompressobj(31)
+    bodies = [m for m in sent[1:] if m["type"] == "http.response.body"]
+    # Every chunk decodes on arrival, before the stream has ended
+    for message, chunk in zip(bodies, chunks, strict=False):
+        assert decoder.decompress(message["body"]) == chunk
+    assert b"".join(decoder.decompress(m["body"]) for m in bodies[len(chunks) :]) == b""
+    assert bodies[-1]["more_body"] is False
+
+
+def test_streaming_response_brotli() -> None:
+    chunks = [b"a" * 2000, b"b" * 2000]
+    sent = _run(_streaming_app(chunks), "br")
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"br"
+    raw = b"".join(m["body"] for m in sent[1:] if m["type"] == "http.response.body")
+    assert brotli.decompress(raw) == b"".join(chunks)
@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlmodel import Session
+
+from app.core.config import settings
+from tests.utils.product import create_random_product
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_cover_routes_queries_pool_and_sales(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-token")
+    route = f"{settings.API_V1_STR}/sales/"
+    requests_before = _sample(
+        "http_request_duration_seconds_count", method="POST", route=route, status="200"
+    )
+    queries_before = _sample("db_query_duration_seconds_count", route=route)
+    sales_before = _sample("sales_created_total")
+
+    product = create_random_product(db, stock_quantity=5)
+    r = client.post(
+        route,
+        headers=superuser_token_headers,
+        json={"items": [{"product_id": str(product.id), "quantity": 1}]},
+    )
+    assert r.status_code == 200
+
+    assert (
+        _sample(
+            "http_request_duration_seconds_count",
+            method="POST",
+            route=route,
+            status="200",
+        )
+        == requests_before + 1
+    )
+    assert _sample("db_query_duration_seconds_count", route=route) > queries_before
+    assert _sample("sales_created_total") == sales_before + 1
+
+    r = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'db_pool_checked_out{pool="primary"}' in r.text
+    assert 'db_pool_checked_out{pool="primary_async"}' in r.text
+    assert "http_requests_in_progress" in r.text
+
+
+def test_metrics_only_for_allowed_peers_or_token(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def scrape(peer: str, headers: dict[str, str] | None = None) -> int:
+        return (
+            TestClient(client.app, client=(peer, 50000))
+            .get("/metrics", headers=headers)
+            .status_code
+        )
+
+    public = "203.0.113.7"
+    assert scrape(public) == 404
+    assert scrape("127.0.0.1") == 200
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_IPS", ["10.1.0.0/16"])
+    assert scrape("10.1.2.3") == 200
+    assert scrape("127.0.0.1") == 404
+
+    # An unset (or empty) token never matches
+    assert scrape(public, {"Authorization": "Bearer "}) == 404
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-token")
+    assert scrape(public, {"Authorization": "Bearer wrong"}) == 404
+    assert scrape(public, {"Authorization": "Bearer scrape-token"}) == 200
+
+
+def test_unmatched_paths_share_a_route_label(client: TestClient) -> None:
+    before = _sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    )
+    client.get("/no-such-page")
+    assert (
+        _sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        == before + 1
+    )
+
+
+def test_worker_samples_are_aggregated(tmp_path: Path) -> None:
+    env = {
+        **os.environ,
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+        "PYTHONPATH": str(Path(__file__).parents[2]),
+    }
+
+    def run(code: str) -> str:
+        return subprocess.run(
+            [sys.executable, "-c", f"from app.core import metrics\n{code}"],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    # Two workers: one still serving a request, one that shut down cleanly
+    run("metrics.SALES_CREATED.inc(2)\nmetrics.REQUESTS_IN_PROGRESS.inc()")
+    run(
+        "metrics.SALES_CREATED.inc()\nmetrics.REQUESTS_IN_PROGRESS.inc()\n"
+        "metrics.mark_worker_stopped()"
+    )
+    text = run("print(metrics.render()[0].decode())")
+    assert "sales_created_total 3.0" in text
+    assert "http_requests_in_progress 1.0" in text
@@ -0,0 +1,148 @@
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, ProfilingMiddleware
+
+
+@pytest.fixture(scope="module")
+def client(client: TestClient) -> TestClient:
+    # PROFILING_ENABLED is off by default, so the app has no profiler; this
+    # client adds it, around the app the conftest client has started
+    return TestClient(ProfilingMiddleware(client.app))
+
+
+@pytest.fixture(autouse=True)
+def profile_settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 1)
+
+
+def _read_profile(
+    client: TestClient, headers: dict[str, str], profile_id: str
+) -> dict[str, Any]:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/{profile_id}", headers=headers
+    )
+    assert r.status_code == 200
+    return r.json()  # type: ignore[no-any-return]
+
+
+def test_sync_route_profile_has_stacks_and_sql(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    get_low_stock_products = crud.get_low_stock_products
+
+    def slow_low_stock(**kwargs: Any) -> Any:
+        time.sleep(0.05)
+        return get_low_stock_products(**kwargs)
+
+    monkeypatch.setattr(crud, "get_low_stock_products", slow_low_stock)
+    r = client.get(
+        f"{settings.API_V1_STR}/products/low-stock",
+        headers={**superuser_token_headers, PROFILE_HEADER: "1"},
+    )
+    assert r.status_code == 200
+
+    profile = _read_profile(
+        client, superuser_token_headers, r.headers[PROFILE_ID_HEADER]
+    )
+    assert profile["route"] == f"{settings.API_V1_STR}/products/low-stock"
+    assert profile["duration_ms"] >= 50
+    # The sleep ran in a threadpool worker, below the request's await
+    slow = [s for s in profile["stacks"] if "slow_low_stock" in s]
+    assert slow
+    assert slow[0].startswith("ProfilingMiddleware._profile")
+    assert "run_in_threadpool" in slow[0]
+    query = next(q for q in profile["queries"] if "FROM products" in q["statement"])
+    assert query["duration_ms"] >= 0
+    assert isinstance(query["parameters"], dict)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/{profile['id']}/flamegraph",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    for line in r.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+
+def test_async_route_profile_follows_greenlet(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    get_dashboard_stats = crud.get_dashboard_stats
+
+    def slow_stats(*, session: Session, organization_id: uuid.UUID) -> Any:
+        time.sleep(0.05)
+        return get_dashboard_stats(session=session, organization_id=organization_id)
+
+    monkeypatch.setattr(crud, "get_dashboard_stats", slow_stats)
+    r = client.get(
+        f"{settings.API_V1_STR}/dashboard/stats",
+        headers=superuser_token_headers,
+        params={"profile": "1"},
+    )
+    assert r.status_code == 200
+
+    profile = _read_profile(
+        client, superuser_token_headers, r.headers[PROFILE_ID_HEADER]
+    )
+    assert any("[greenlet]" in s and "slow_stats" in s for s in profile["stacks"])
+    assert profile["queries"]
+
+
+def test_profile_flag_needs_admin_and_a_free_profiler(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    url = f"{settings.API_V1_STR}/products/"
+    r = client.get(url, headers={**normal_user_token_headers, PROFILE_HEADER: "1"})
+    assert r.status_code == 200
+    assert PROFILE_ID_HEADER not in r.headers
+
+    # Another request is being profiled
+    with profiling._profiling:
+        r = client.get(url, headers={**superuser_token_headers, PROFILE_HEADER: "1"})
+    assert r.status_code == 200
+    assert PROFILE_ID_HEADER not in r.headers
+
+    r = client.get(url, headers={**superuser_token_headers, PROFILE_HEADER: "1"})
+    profile_id = r.headers[PROFILE_ID_HEADER]
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/{profile_id}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 403
+
+
+def test_only_newest_profiles_are_kept(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "PROFILE_KEEP", 1)
+    headers = {**superuser_token_headers, PROFILE_HEADER: "1"}
+    url = f"{settings.API_V1_STR}/products/"
+    first = client.get(url, headers=headers).headers[PROFILE_ID_HEADER]
+    second = client.get(url, headers=headers).headers[PROFILE_ID_HEADER]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/{first}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+    _read_profile(client, superuser_token_headers, second)
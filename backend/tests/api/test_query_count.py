@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import text
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.query_count import QUERY_COUNT_HEADER, QueryCountMiddleware
+from tests.utils.utils import assert_max_queries
+
+
+def test_response_reports_query_count(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with assert_max_queries(100) as counter:
+        r = client.get(
+            f"{settings.API_V1_STR}/products/", headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+    assert int(r.headers[QUERY_COUNT_HEADER]) == counter.count > 0
+
+
+def test_repeated_statement_is_reported(caplog: pytest.LogCaptureFixture) -> None:
+    def endpoint(_request: Request) -> PlainTextResponse:
+        with engine.connect() as conn:
+            for i in range(3):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return PlainTextResponse("ok")
+
+    app = QueryCountMiddleware(
+        Starlette(routes=[Route("/loop", endpoint)]), repeat_threshold=3
+    )
+    with caplog.at_level(logging.WARNING, logger="app.core.query_count"):
+        r = TestClient(app).get("/loop")
+    assert r.headers[QUERY_COUNT_HEADER] == "3"
+    [record] = caplog.records
+    assert "ran 3 times in GET /loop" in record.getMessage()
+
+
+def test_assert_max_queries_fails_over_budget() -> None:
+    with pytest.raises(AssertionError, match="at most 1 queries, ran 2"):
+        with assert_max_queries(1), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
@@ -0,0 +1,103 @@
+"""
+Read replica routing tests.
+
+The replica engine points at POSTGRES_REPLICA_SERVER when it is set (e.g. a
+second local instance streaming from the test database) and at the primary
+database otherwise, which is enough to check which engine serves a request.
+"""
+
+from collections.abc import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core import db as core_db
+from app.core.config import settings
+from app.core.db import PoolMetrics, engine, make_engine
+from app.core.replica import ReplicaRouter
+from tests.utils.utils import random_lower_string
+
+
+@pytest.fixture
+def router(monkeypatch: pytest.MonkeyPatch) -> Generator[ReplicaRouter, None, None]:
+    url = settings.SQLALCHEMY_REPLICA_DATABASE_URI or settings.SQLALCHEMY_DATABASE_URI
+    replica = make_engine(str(url))
+    router = ReplicaRouter(
+        primary=engine,
+        replica=replica,
+        max_lag=5,
+        read_your_writes=60,
+        lag_check_interval=60,
+    )
+    monkeypatch.setattr(deps, "replica_router", router)
+    monkeypatch.setattr(core_db, "replica_router", router)
+    yield router
+    replica.dispose()
+
+
+def test_reads_go_to_replica(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    router: ReplicaRouter,
+) -> None:
+    replica_metrics = PoolMetrics(router.replica)
+    r = client.get(f"{settings.API_V1_STR}/products/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    # One checkout for the lag check, one for the request
+    assert replica_metrics.checkouts == 2
+
+
+def test_reads_after_write_go_to_primary(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    router: ReplicaRouter,
+) -> None:
+    replica_metrics = PoolMetrics(router.replica)
+    r = client.post(
+        f"{settings.API_V1_STR}/categories/",
+        headers=superuser_token_headers,
+        json={"name": f"Cat-{random_lower_string()[:16]}"},
+    )
+    assert r.status_code == 200
+    category_id = r.json()["id"]
+    r = client.get(
+        f"{settings.API_V1_STR}/categories/{category_id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert replica_metrics.checkouts == 0
+
+
+def test_lagging_replica_falls_back_to_primary(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    router: ReplicaRouter,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(router, "measure_lag", lambda: 30.0)
+    replica_metrics = PoolMetrics(router.replica)
+    r = client.get(f"{settings.API_V1_STR}/products/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert replica_metrics.checkouts == 0
+
+
+def test_router_rechecks_lag_after_interval() -> None:
+    now = [0.0]
+    lags: list[float | None] = [None, 0.5]
+    router = ReplicaRouter(
+        primary=engine,
+        replica=engine.execution_options(),
+        max_lag=5,
+        read_your_writes=10,
+        lag_check_interval=2,
+        clock=lambda: now[0],
+    )
+    router.measure_lag = lambda: lags.pop(0)  # type: ignore[method-assign]
+    # Unreachable replica
+    assert router.engine_for(None) is router.primary
+    now[0] = 1.0
+    assert router.engine_for(None) is router.primary
+    now[0] = 2.0
+    assert router.engine_for(None) is router.replica
+    assert lags == []
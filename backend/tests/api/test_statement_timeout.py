@@ -0,0 +1,100 @@
+import logging
+import uuid
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, text
+
+from app import crud
+from app.api.routes import dashboard
+from app.core.config import settings
+from app.core.db import engine
+
+
+def _show_statement_timeout(session: Session) -> str:
+    return str(session.exec(text("SHOW statement_timeout")).one()[0])  # type: ignore[call-overload]
+
+
+def test_routes_get_interactive_timeout_and_exports_long_one(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1234)
+    monkeypatch.setattr(settings, "DB_EXPORT_STATEMENT_TIMEOUT_MS", 4321)
+    seen: list[str] = []
+    get_dashboard_stats = crud.get_dashboard_stats
+
+    def stats(*, session: Session, organization_id: uuid.UUID) -> Any:
+        seen.append(_show_statement_timeout(session))
+        return get_dashboard_stats(session=session, organization_id=organization_id)
+
+    def export(*, session: Session, **_kwargs: Any) -> Any:
+        seen.append(_show_statement_timeout(session))
+        return ["name"], []
+
+    monkeypatch.setattr(crud, "get_dashboard_stats", stats)
+    monkeypatch.setattr(dashboard, "_build_inventory_export", export)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/dashboard/stats", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    r = client.post(
+        f"{settings.API_V1_STR}/dashboard/export-excel",
+        headers=superuser_token_headers,
+        json={"dataset": "inventory"},
+    )
+    assert r.status_code == 200
+    assert seen == ["1234ms", "4321ms"]
+
+    # Nothing is set outside requests
+    with Session(engine) as session:
+        assert _show_statement_timeout(session) == "0"
+
+
+def test_statement_timeout_returns_503_and_logs_query(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 50)
+
+    def stats(*, session: Session, **_kwargs: Any) -> Any:
+        session.exec(text("SELECT pg_sleep(:s)").bindparams(s=1))  # type: ignore[call-overload]
+
+    monkeypatch.setattr(crud, "get_dashboard_stats", stats)
+    with caplog.at_level(logging.WARNING, logger="app.core.db"):
+        r = client.get(
+            f"{settings.API_V1_STR}/dashboard/stats", headers=superuser_token_headers
+        )
+    assert r.status_code == 503
+    [record] = [r for r in caplog.records if "pg_sleep" in r.getMessage()]
+    assert record.canceled is True  # type: ignore[attr-defined]
+    assert record.route == f"{settings.API_V1_STR}/dashboard/stats"  # type: ignore[attr-defined]
+    assert record.organization_id is not None  # type: ignore[attr-defined]
+    assert record.parameters == {"s": "int"}  # type: ignore[attr-defined]
+
+
+def test_slow_query_log_has_parameter_shape_not_values(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.core.db"):
+        r = client.get(
+            f"{settings.API_V1_STR}/products/",
+            headers=superuser_token_headers,
+            params={"search": "secret-term"},
+        )
+    assert r.status_code == 200
+    records = [r for r in caplog.records if "FROM products" in r.sql]  # type: ignore[attr-defined]
+    assert records
+    for record in records:
+        assert record.route == f"{settings.API_V1_STR}/products/"  # type: ignore[attr-defined]
+        assert record.duration_ms >= 0  # type: ignore[attr-defined]
+        assert "secret-term" not in record.getMessage()
@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind
+from sqlmodel import Session
+
+from app.core import tracing
+from app.core.config import settings
+from tests.utils.product import create_random_product
+
+
+def _install(
+    monkeypatch: pytest.MonkeyPatch, ratio: float = 1.0
+) -> InMemorySpanExporter:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=ParentBased(TraceIdRatioBased(ratio)))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+    return exporter
+
+
+@pytest.fixture
+def traced_client(client: TestClient) -> TestClient:
+    # ``client`` has run the lifespan; this one only adds the middleware
+    return TestClient(tracing.TracingMiddleware(client.app))
+
+
+def _span(spans: tuple[ReadableSpan, ...], name: str) -> ReadableSpan:
+    return next(s for s in spans if s.name == name)
+
+
+def test_sale_spans_carry_the_organization(
+    traced_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    product = create_random_product(db, stock_quantity=5)
+    exporter = _install(monkeypatch)
+    r = traced_client.post(
+        f"{settings.API_V1_STR}/sales/",
+        headers=superuser_token_headers,
+        json={"items": [{"product_id": str(product.id), "quantity": 1}]},
+    )
+    assert r.status_code == 200
+    spans = exporter.get_finished_spans()
+    organization_id = str(product.organization_id)
+
+    server = _span(spans, f"POST {settings.API_V1_STR}/sales/")
+    assert server.kind == SpanKind.SERVER
+    assert server.attributes is not None
+    assert server.attributes["http.response.status_code"] == 200
+    assert server.attributes[tracing.ORGANIZATION_ID] == organization_id
+
+    route = _span(spans, "sales.create_sale")
+    assert route.parent is not None
+    assert route.parent.span_id == server.context.span_id
+    assert _span(spans, "crud.create_sale").attributes == {
+        tracing.ORGANIZATION_ID: organization_id
+    }
+    insert = _span(spans, "INSERT sales")
+    assert insert.kind == SpanKind.CLIENT
+    assert insert.attributes is not None
+    assert insert.attributes["db.collection.name"] == "sales"
+    assert insert.attributes[tracing.ORGANIZATION_ID] == organization_id
+    assert {s.context.trace_id for s in spans} == {server.context.trace_id}
+
+
+def test_dashboard_and_export_spans(
+    traced_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    exporter = _install(monkeypatch)
+    r = traced_client.get(
+        f"{settings.API_V1_STR}/dashboard/stats", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    spans = exporter.get_finished_spans()
+    stats = _span(spans, "crud.get_dashboard_stats")
+    sales_stats = _span(spans, "crud.get_sales_stats")
+    assert sales_stats.parent is not None
+    assert sales_stats.parent.span_id == stats.context.span_id
+    assert any(
+        s.parent is not None
+        and s.parent.span_id == sales_stats.context.span_id
+        and s.kind == SpanKind.CLIENT
+        for s in spans
+    )
+
+    exporter.clear()
+    r = traced_client.post(
+        f"{settings.API_V1_STR}/dashboard/export-excel",
+        headers=superuser_token_headers,
+        json={"dataset": "sales"},
+    )
+    assert r.status_code == 200
+    names = {s.name for s in exporter.get_finished_spans()}
+    assert {"dashboard.build_sales_export", "dashboard.build_xlsx_bytes"} <= names
+
+
+def test_sampling_follows_the_callers_traceparent(
+    traced_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    exporter = _install(monkeypatch, ratio=0.0)
+    url = f"{settings.API_V1_STR}/dashboard/stats"
+    assert traced_client.get(url, headers=superuser_token_headers).status_code == 200
+    assert exporter.get_finished_spans() == ()
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    r = traced_client.get(
+        url,
+        headers={
+            **superuser_token_headers,
+            "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01",
+        },
+    )
+    assert r.status_code == 200
+    spans = exporter.get_finished_spans()
+    assert any(s.name == "crud.get_dashboard_stats" for s in spans)
+    assert {s.context.trace_id for s in spans} == {int(trace_id, 16)}
+
+
+def test_json_lines_exporter(tmp_path: Path) -> None:
+    provider = TracerProvider()
+    path = tmp_path / "traces.jsonl"
+    provider.add_span_processor(
+        SimpleSpanProcessor(tracing.JsonLinesSpanExporter(str(path)))
+    )
+    tracer = provider.get_tracer("test")
+    with tracer.start_as_current_span("outer"):
+        with tracer.start_as_current_span("inner"):
+            pass
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["inner", "outer"]
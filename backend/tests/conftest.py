@@ -4,6 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
+from app.api.routes.login import login_throttle
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
@@ -37,6 +38,12 @@ def db() -> Generator[Session, None, None]:
         session.commit()
 
 
+@pytest.fixture(autouse=True)
+def reset_login_throttle() -> None:
+    # The suite logs in far more often than any real client would
+    login_throttle.clear()
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
@@ -3,7 +3,8 @@ import uuid
 from sqlmodel import Session
 
 from app import crud
-from app.models import CustomerCreate, CustomerUpdate
+from app.core.pagination import next_cursor
+from app.models import CustomerCreate, CustomerUpdate, OrganizationCreate
 from tests.utils.customer import create_random_customer
 from tests.utils.user import _get_default_org_id
 from tests.utils.utils import random_lower_string
@@ -113,3 +114,47 @@ def test_soft_delete_customer(db: Session) -> None:
         organization_id=customer.organization_id,
     )
     assert fetched is None
+
+
+def test_get_customers_cursor_pagination_nullable_sort(db: Session) -> None:
+    org = crud.create_organization(
+        session=db,
+        organization_create=OrganizationCreate(
+            name="Cursor Org", slug=f"cursor-{random_lower_string()[:12]}"
+        ),
+    )
+    for email in ["b@test.com", None, "a@test.com", None, "c@test.com"]:
+        crud.create_customer(
+            session=db,
+            customer_create=CustomerCreate(
+                document_type="DNI",
+                document_number=f"DOC-{random_lower_string()[:16]}",
+                first_name="Cursor",
+                last_name="Customer",
+                email=email,
+            ),
+            organization_id=org.id,
+        )
+
+    for sort_order in ("asc", "desc"):
+        expected = crud.get_customers_by_organization(
+            session=db, organization_id=org.id, sort_by="email", sort_order=sort_order
+        )
+        sort = crud.get_customer_sort(sort_by="email", sort_order=sort_order)
+        seen = []
+        cursor = None
+        while True:
+            page = crud.get_customers_by_organization(
+                session=db,
+                organization_id=org.id,
+                limit=2,
+                sort_by="email",
+                sort_order=sort_order,
+                cursor=cursor,
+            )
+            seen.extend(page)
+            cursor = next_cursor(page, sort=sort, limit=2)
+            if cursor is None:
+                break
+        assert [c.id for c in seen] == [c.id for c in expected]
+        assert len(seen) == 5
@@ -1,8 +1,13 @@
+import asyncio
 from decimal import Decimal
+from typing import Any
 
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
+from app.core.config import settings
+from app.core.db import make_async_engine
 from tests.utils.product import create_random_product
 from tests.utils.sale import create_random_sale
 from tests.utils.user import _get_default_org_id
@@ -172,3 +177,25 @@ def test_get_dashboard_stats_average_ticket(db: Session) -> None:
     create_random_sale(db, organization_id=organization_id)
     stats = crud.get_dashboard_stats(session=db, organization_id=organization_id)
     assert stats["average_ticket"] >= Decimal("0")
+
+
+def test_get_dashboard_stats_async_matches_sync(db: Session) -> None:
+    """The async variant should return the same stats on the async engine."""
+    organization_id = _get_default_org_id(db)
+    create_random_sale(db, organization_id=organization_id)
+    db.commit()
+
+    async def load() -> dict[str, Any]:
+        engine = make_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        try:
+            async with AsyncSession(engine) as session:
+                return await crud.get_dashboard_stats_async(
+                    session=session, organization_id=organization_id
+                )
+        finally:
+            await engine.dispose()
+
+    stats = asyncio.run(load())
+    assert stats == crud.get_dashboard_stats(
+        session=db, organization_id=organization_id
+    )
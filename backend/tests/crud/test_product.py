@@ -1,10 +1,19 @@
+import json
+import threading
+import time
 import uuid
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
+import pytest
 from sqlmodel import Session
 
 from app import crud
-from app.models import ProductCreate, ProductUpdate
+from app.core import pagination
+from app.core.db import engine
+from app.core.notifications import NotificationListener
+from app.core.sync import ChangeToken
+from app.models import OrganizationCreate, Product, ProductCreate, ProductUpdate
 from tests.utils.category import create_random_category
 from tests.utils.product import create_random_product
 from tests.utils.user import _get_default_org_id
@@ -163,3 +172,135 @@ def test_soft_delete_product(db: Session) -> None:
         organization_id=product.organization_id,
     )
     assert fetched is None
+
+
+def test_get_products_page_estimated_count(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    organization_id = _get_default_org_id(db)
+    create_random_product(db)
+    monkeypatch.setattr(pagination, "ESTIMATE_EXACT_THRESHOLD", 0)
+
+    _, count, is_estimate = crud.get_products_page(
+        session=db, organization_id=organization_id, count_mode="estimated"
+    )
+    assert is_estimate is True
+    assert count is not None and count >= 0
+
+    # Search filters are not estimable and are counted exactly
+    _, count, is_estimate = crud.get_products_page(
+        session=db,
+        organization_id=organization_id,
+        search=random_lower_string(),
+        count_mode="estimated",
+    )
+    assert is_estimate is False
+    assert count == 0
+
+
+def test_search_products_short_term_matches_exact_sku_only(db: Session) -> None:
+    org = crud.create_organization(
+        session=db,
+        organization_create=OrganizationCreate(
+            name="Search Org", slug=f"search-{random_lower_string()[:12]}"
+        ),
+    )
+    product = create_random_product(db, organization_id=org.id)
+    crud.update_product(
+        session=db, db_product=product, product_in=ProductUpdate(sku="Z9")
+    )
+    found = crud.search_products(session=db, organization_id=org.id, term=" Z9 ")
+    assert [p.id for p in found] == [product.id]
+    assert crud.search_products(session=db, organization_id=org.id, term="Z") == []
+    # Substring matching applies to list filters too once the term is long enough
+    assert crud.get_products_by_organization(
+        session=db, organization_id=org.id, search="Z"
+    ) == []
+    assert crud.count_products_by_organization(
+        session=db, organization_id=org.id, search=product.name[8:14]
+    ) == 1
+
+
+def test_product_lookup_invalidation_reaches_other_workers(db: Session) -> None:
+    product = create_random_product(db)
+    organization_id = product.organization_id
+    received: list[str] = []
+    listener = NotificationListener(
+        engine.url, crud.PRODUCT_LOOKUP_CHANNEL, on_message=received.append
+    )
+    connected = threading.Event()
+    listener.on_connect = connected.set
+    listener.start()
+    try:
+        assert connected.wait(10)
+        # Two changes in one transaction are announced once
+        crud.adjust_product_stock(
+            session=db, db_product=product, quantity=-1, commit=False
+        )
+        crud.adjust_product_stock(
+            session=db, db_product=product, quantity=-1, commit=False
+        )
+        db.commit()
+        deadline = time.monotonic() + 10
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.2)
+    finally:
+        listener.stop()
+    ours = [
+        json.loads(payload)
+        for payload in received
+        if product.sku in json.loads(payload)["codes"]
+    ]
+    assert ours == [{"organization_id": str(organization_id), "codes": [product.sku]}]
+
+    # Another worker holding the old snapshot drops it on the message
+    cache = crud.product_lookup_cache.for_tenant(organization_id)
+    crud.lookup_product(session=db, organization_id=organization_id, sku=product.sku)
+    assert cache.get(("sku", product.sku)) is not None
+    crud.handle_product_lookup_notification(json.dumps(ours[0]))
+    assert cache.get(("sku", product.sku)) is None
+
+
+def test_product_lookup_cache_dropped_on_commit_not_rollback(db: Session) -> None:
+    product = create_random_product(db)
+    organization_id = product.organization_id
+    cache = crud.product_lookup_cache.for_tenant(organization_id)
+    crud.lookup_product(session=db, organization_id=organization_id, sku=product.sku)
+    crud.adjust_product_stock(session=db, db_product=product, quantity=1, commit=False)
+    db.rollback()
+    assert cache.get(("sku", product.sku)) is not None
+    crud.adjust_product_stock(session=db, db_product=product, quantity=1)
+    assert cache.get(("sku", product.sku)) is None
+
+
+def test_catalog_changes_wait_for_open_write_transactions(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(crud, "SYNC_COMMIT_GRACE", timedelta(0))
+    org = crud.create_organization(
+        session=db,
+        organization_create=OrganizationCreate(
+            name="Sync Org", slug=f"sync-{random_lower_string()[:12]}"
+        ),
+    )
+    slow = create_random_product(db, organization_id=org.id)
+    with Session(engine) as other:
+        # A write stamped now that commits only after a newer row is visible
+        row = other.get(Product, slow.id)
+        assert row is not None
+        row.name = "Updated slowly"
+        row.updated_at = datetime.now(timezone.utc)
+        other.add(row)
+        other.flush()
+        fast = create_random_product(db, organization_id=org.id)
+        products, _, token, _ = crud.get_catalog_changes(
+            session=db, organization_id=org.id, since=ChangeToken()
+        )
+        assert fast.id not in [p.id for p in products]
+        other.commit()
+
+    products, _, _, _ = crud.get_catalog_changes(
+        session=db, organization_id=org.id, since=token
+    )
+    assert [p.id for p in products] == [slow.id, fast.id]
@@ -93,3 +93,23 @@ def test_roles_have_unique_ids(db: Session) -> None:
     roles = crud.get_roles(session=db)
     ids = [r.id for r in roles]
     assert len(ids) == len(set(ids)), "Role IDs must be unique"
+
+
+# ---------------------------------------------------------------------------
+# get_cached_role
+# ---------------------------------------------------------------------------
+
+
+def test_get_cached_role_after_preload(db: Session) -> None:
+    crud.role_cache.clear()
+    crud.preload_roles(session=db)
+    admin = crud.get_role_by_name(session=db, name="admin")
+    assert admin is not None
+    cached = crud.get_cached_role(session=db, role_id=admin.id)
+    assert cached is not None
+    assert cached.name == "admin"
+    assert cached is not admin
+
+
+def test_get_cached_role_not_found(db: Session) -> None:
+    assert crud.get_cached_role(session=db, role_id=999999) is None
@@ -1,11 +1,16 @@
+import threading
+import time
+
 from fastapi.encoders import jsonable_encoder
 from pwdlib.hashers.bcrypt import BcryptHasher
 from sqlmodel import Session
 
 from app import crud
+from app.core.db import engine
+from app.core.notifications import NotificationListener, notify
 from app.core.security import verify_password
 from app.models import User, UserCreate, UserUpdate
-from tests.utils.user import _get_default_org_id, _get_role_id
+from tests.utils.user import _get_default_org_id, _get_role_id, create_random_user
 from tests.utils.utils import random_email, random_lower_string
 
 
@@ -224,3 +229,52 @@ def test_authenticate_user_with_bcrypt_upgrades_to_argon2(db: Session) -> None:
     assert verified
     # Should not need another update since it's already argon2
     assert updated_hash is None
+
+
+def test_user_auth_record_cached_until_update(db: Session) -> None:
+    user = create_random_user(db)
+    record = crud.get_user_auth_record(session=db, user_id=user.id)
+    assert record is not None
+    assert record.is_active
+    assert crud.user_auth_cache.get(user.id) == record
+
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_active=False))
+    assert crud.user_auth_cache.get(user.id) is None
+    record = crud.get_user_auth_record(session=db, user_id=user.id)
+    assert record is not None
+    assert not record.is_active
+    # Inactive users are not cached
+    assert crud.user_auth_cache.get(user.id) is None
+
+
+def test_user_auth_record_of_deleted_user(db: Session) -> None:
+    user = create_random_user(db)
+    crud.get_user_auth_record(session=db, user_id=user.id)
+    crud.soft_delete_user(session=db, db_user=user)
+    assert crud.get_user_auth_record(session=db, user_id=user.id) is None
+
+
+def test_user_auth_notification_reaches_listener(db: Session) -> None:
+    user = create_random_user(db)
+    crud.get_user_auth_record(session=db, user_id=user.id)
+    received: list[str] = []
+    listener = NotificationListener(
+        engine.url, crud.USER_AUTH_CHANNEL, on_message=received.append
+    )
+    connected = threading.Event()
+    listener.on_connect = connected.set
+    listener.start()
+    try:
+        assert connected.wait(10)
+        # Another worker's write: this process only hears about it via NOTIFY
+        with Session(engine) as other:
+            notify(other, crud.USER_AUTH_CHANNEL, str(user.id))
+            other.commit()
+        deadline = time.monotonic() + 10
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        listener.stop()
+    assert received == [str(user.id)]
+    crud.handle_user_auth_notification(received[0])
+    assert crud.user_auth_cache.get(user.id) is None
@@ -0,0 +1,77 @@
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.db import engine
+from tests.utils.product import create_random_product
+from tests.utils.user import _get_default_org_id
+
+MIGRATION = (
+    Path(__file__).parents[2]
+    / "app"
+    / "alembic"
+    / "versions"
+    / "011_product_barcode_index.py"
+)
+
+
+def _load_migration() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("migration_011", MIGRATION)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_upgrade_clears_duplicate_barcodes_before_indexing() -> None:
+    migration = _load_migration()
+    # DDL is transactional in Postgres: the whole run is rolled back
+    with engine.connect() as conn, conn.begin() as transaction:
+        conn.execute(text("DROP INDEX idx_products_organization_barcode"))
+        session = Session(bind=conn)
+        organization_id = _get_default_org_id(session)
+        oldest, newer, deleted, blank = (
+            create_random_product(session, organization_id=organization_id)
+            for _ in range(4)
+        )
+        rows = [
+            (oldest.id, "7790001", "2024-01-01", None),
+            (newer.id, "7790001", "2025-01-01", None),
+            (deleted.id, "7790001", "2023-01-01", "2025-06-01"),
+            (blank.id, "  ", "2025-01-01", None),
+        ]
+        for product_id, barcode, created_at, deleted_at in rows:
+            conn.execute(
+                text(
+                    "UPDATE products SET barcode = :barcode, "
+                    "created_at = :created_at, deleted_at = :deleted_at "
+                    "WHERE id = :id"
+                ),
+                {
+                    "id": product_id,
+                    "barcode": barcode,
+                    "created_at": created_at,
+                    "deleted_at": deleted_at,
+                },
+            )
+
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+        result = conn.execute(
+            text("SELECT id, barcode FROM products WHERE id = ANY(:ids)"),
+            {"ids": [oldest.id, newer.id, deleted.id, blank.id]},
+        )
+        barcodes = {row.id: row.barcode for row in result}
+        assert barcodes == {
+            oldest.id: "7790001",
+            newer.id: None,
+            deleted.id: "7790001",
+            blank.id: None,
+        }
+        transaction.rollback()
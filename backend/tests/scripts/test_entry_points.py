@@ -0,0 +1,27 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "app.core.db",
+        "app.core.tracing",
+        "app.initial_data",
+        "app.backend_pre_start",
+        "app.tests_pre_start",
+    ],
+)
+def test_entry_point_imports_in_a_fresh_interpreter(module: str) -> None:
+    # conftest imports the API first, which hides import cycles that only
+    # show when a script starts from one of these modules
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -214,6 +214,18 @@ def test_product_stock_adjust_cross_org_returns_404(
     assert r.status_code == 404
 
 
+def test_product_batch_cross_org_reports_missing(
+    client: TestClient, org_a: dict, org_b_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        _api("/products/batch"),
+        headers=org_b_headers,
+        json={"ids": [org_a["product_id"]]},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"data": [], "missing": [org_a["product_id"]]}
+
+
 # ---------------------------------------------------------------------------
 # Customer isolation
 # ---------------------------------------------------------------------------
@@ -0,0 +1,117 @@
+"""
+Password hashing pool tests.
+
+Hashing runs in a bounded process pool; when every slot is taken callers are
+turned away with a 503 instead of queueing without limit.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core import security
+from app.core.config import settings
+from app.core.process_pool import BoundedProcessPool, PoolBusyError
+
+
+def _sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+def test_hash_and_verify_through_pool() -> None:
+    assert security.hash_pool is not None
+    queued = "process_pool_queue_duration_seconds_count"
+    completed = _sample(queued, "password_hash")
+    hashed = security.get_password_hash("correct horse")
+    assert hashed.startswith("$argon2id$")
+    assert f"m={settings.ARGON2_MEMORY_COST}" in hashed
+    assert security.verify_password("correct horse", hashed) == (True, None)
+    assert security.verify_password("wrong horse", hashed)[0] is False
+    assert asyncio.run(security.verify_password_async("correct horse", hashed)) == (
+        True,
+        None,
+    )
+    assert asyncio.run(security.get_password_hash_async("x")).startswith("$argon2id$")
+    assert _sample(queued, "password_hash") == completed + 5
+    assert security.hash_pool.pending == 0
+
+
+def test_pool_rejects_when_full() -> None:
+    pool = BoundedProcessPool(
+        name="test_full", max_workers=1, max_pending=1, queue_timeout=0.05
+    )
+    rejected = _sample("process_pool_rejected_total", "test_full")
+    completed = _sample("process_pool_run_duration_seconds_count", "test_full")
+    try:
+        slow = threading.Thread(target=pool.run, args=(time.sleep, 1.0))
+        slow.start()
+        deadline = time.monotonic() + 5
+        while pool.pending == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(PoolBusyError):
+            pool.run(time.sleep, 0)
+        slow.join()
+        assert _sample("process_pool_rejected_total", "test_full") == rejected + 1
+        run = "process_pool_run_duration_seconds"
+        assert _sample(f"{run}_count", "test_full") == completed + 1
+        assert _sample(f"{run}_sum", "test_full") >= 1.0
+        pool.run(time.sleep, 0)
+        assert _sample(f"{run}_count", "test_full") == completed + 2
+    finally:
+        pool.shutdown()
+
+
+def test_run_async_waits_without_blocking_the_loop() -> None:
+    pool = BoundedProcessPool(
+        name="test_async", max_workers=1, max_pending=1, queue_timeout=0.2
+    )
+    rejected = _sample("process_pool_rejected_total", "test_async")
+
+    async def main() -> int:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        slow = asyncio.ensure_future(pool.run_async(time.sleep, 0.5))
+        await asyncio.sleep(0.05)
+        assert pool.pending == 1
+        with pytest.raises(PoolBusyError):
+            await pool.run_async(time.sleep, 0)
+        await slow
+        # A waiter gets the slot once it is free
+        await pool.run_async(time.sleep, 0)
+        ticker.cancel()
+        return ticks
+
+    try:
+        # The loop kept running while both calls waited
+        assert asyncio.run(main()) >= 20
+        assert pool.pending == 0
+        assert _sample("process_pool_rejected_total", "test_async") == rejected + 1
+    finally:
+        pool.shutdown()
+
+
+def test_login_returns_503_when_pool_busy(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def busy(*_args: object) -> None:
+        raise PoolBusyError("full")
+
+    assert security.hash_pool is not None
+    monkeypatch.setattr(security.hash_pool, "run_async", busy)
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": settings.FIRST_SUPERUSER, "password": "whatever"},
+    )
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
@@ -0,0 +1,124 @@
+"""
+Stateless (claims-based) authentication tests.
+
+With AUTH_STATELESS_CLAIMS on, requests are authorized from the signed token
+claims; deactivation, deletion and role changes must still reject tokens
+issued before them, through the revocation list.
+"""
+
+import uuid
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.revocation import RevocationList
+from app.models import User, UserUpdate
+from tests.utils.user import _get_role_id, create_random_user
+from tests.utils.utils import random_lower_string
+
+
+@pytest.fixture
+def stateless(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    monkeypatch.setattr(settings, "AUTH_STATELESS_CLAIMS", True)
+    crud.token_revocations.clear()
+    yield
+    crud.token_revocations.clear()
+
+
+def _login(client: TestClient, db: Session, role_name: str) -> tuple[User, dict]:
+    user = create_random_user(db, role_name=role_name)
+    password = random_lower_string()
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(password=password))
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": user.email, "password": password},
+    )
+    assert r.status_code == 200, r.text
+    return user, {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_stateless_request_uses_claims(
+    client: TestClient,
+    db: Session,
+    stateless: None,  # noqa: ARG001
+) -> None:
+    _, headers = _login(client, db, "seller")
+    r = client.get(f"{settings.API_V1_STR}/products/", headers=headers)
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+
+
+def test_stateless_rejects_deactivated_user(
+    client: TestClient,
+    db: Session,
+    stateless: None,  # noqa: ARG001
+) -> None:
+    user, headers = _login(client, db, "seller")
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_active=False))
+    r = client.get(f"{settings.API_V1_STR}/products/", headers=headers)
+    assert r.status_code == 403
+
+
+def test_stateless_rejects_revocation_from_other_worker(
+    client: TestClient,
+    db: Session,
+    stateless: None,  # noqa: ARG001
+) -> None:
+    user, headers = _login(client, db, "seller")
+    crud.soft_delete_user(session=db, db_user=user)
+    # Forget the local revocation, as a worker that did not handle the delete
+    crud.token_revocations.clear()
+    r = client.get(f"{settings.API_V1_STR}/products/", headers=headers)
+    assert r.status_code == 403
+
+
+def test_stateless_rejects_token_after_role_change(
+    client: TestClient,
+    db: Session,
+    stateless: None,  # noqa: ARG001
+) -> None:
+    user, headers = _login(client, db, "admin")
+    crud.update_user(
+        session=db, db_user=user, user_in=UserUpdate(role_id=_get_role_id(db))
+    )
+    r = client.get(f"{settings.API_V1_STR}/users/", headers=headers)
+    assert r.status_code == 403
+    assert r.json()["detail"] == "Could not validate credentials"
+
+
+def test_database_auth_rejects_token_issued_before_revocation(
+    client: TestClient, db: Session
+) -> None:
+    user, headers = _login(client, db, "seller")
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_active=False))
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_active=True))
+    r = client.get(f"{settings.API_V1_STR}/products/", headers=headers)
+    assert r.status_code == 403
+    crud.token_revocations.clear()
+
+
+def test_revocation_list_expires_entries() -> None:
+    now = [0.0]
+    revocations = RevocationList(
+        refresh_interval=30, window=timedelta(minutes=5), clock=lambda: now[0]
+    )
+    assert revocations.is_stale()
+    user_id = uuid.uuid4()
+    recent = datetime.now(timezone.utc)
+    loaded = {user_id: recent, uuid.uuid4(): recent - timedelta(hours=1)}
+    revocations.refresh(loaded, since=revocations.window_start())
+    assert not revocations.is_stale()
+    assert len(revocations) == 1
+    assert revocations.is_revoked(user_id, (recent - timedelta(seconds=1)).timestamp())
+    assert not revocations.is_revoked(
+        user_id, (recent + timedelta(seconds=1)).timestamp()
+    )
+    assert revocations.is_revoked(user_id, None)
+    now[0] = 31.0
+    assert revocations.is_stale()
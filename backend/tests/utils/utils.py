@@ -1,9 +1,13 @@
 import random
 import string
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 from fastapi.testclient import TestClient
 
+from app import crud
 from app.core.config import settings
+from app.core.query_count import QueryCounter, count_queries
 
 
 def random_lower_string() -> str:
@@ -24,3 +28,24 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+@contextmanager
+def assert_max_queries(n: int) -> Iterator[QueryCounter]:
+    """
+    Fail if the block runs more than n queries, counting the app's and the
+    test's own. Guards endpoints against N+1 regressions. The user auth
+    cache is emptied first so budgets do not depend on test order; they
+    include the token's user lookup.
+    """
+    crud.user_auth_cache.clear()
+    with count_queries() as counter:
+        yield counter
+    if counter.count > n:
+        statements = "\n".join(
+            f"  {times}x {' '.join(statement.split())[:200]}"
+            for statement, times in counter.statements.most_common()
+        )
+        raise AssertionError(
+            f"Expected at most {n} queries, ran {counter.count}:\n{statements}"
+        )